@@ -0,0 +1,97 @@
+"""
+グラフ用データの作成時間と、ブラウザに送るグラフのデータ量を計測するベンチマーク
+
+使い方:
+    python benchmarks/bench_chart_data.py [--scales 1 10 100] [--number 20] [--max-kb 256]
+
+1x/10x/100xの合成データ（100xは複数シーズン分の選手数に相当）で、グラフ用データの作成時間（データのバージョンごとに1回）、
+作成済みデータの取得時間（再実行ごと）、点数、Vega-Liteの仕様（データを含むJSON）のサイズを計測する。
+選手の散布図は間引かない場合のデータ量も併記する。
+いずれかのグラフのデータ量が--max-kbを超えた場合、または散布図の点数が上限を超えた場合は終了コード1を返す。
+"""
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import altair as alt
+
+from synthetic import SCALES, write_dataset
+import chart_data
+from nba_data_static import NBADataManager
+
+
+def payload_kb(chart):
+    """データを含むVega-Liteの仕様のサイズ（KB）"""
+    return len(json.dumps(chart.to_dict(), ensure_ascii=False).encode()) / 1024
+
+
+def charts(manager):
+    """画面と同じ構成のグラフ（名前, グラフ）"""
+    teams = manager.get_chart_data('team_scatter')
+    players = manager.get_chart_data('player_scatter')
+    distribution = manager.get_chart_data('roster_distribution').reset_index()
+    table = manager.get_chart_data('comparison')
+    comparison = chart_data.compare_players(table, table[('WS', 'value')].nlargest(10).index.tolist())
+    return [
+        ('team_scatter', alt.Chart(teams).mark_circle().encode(x='ORtg', y='DRtg', tooltip=list(teams.columns))),
+        ('player_scatter', alt.Chart(players).mark_circle().encode(x='OWS', y='DWS', size='人数',
+                                                                   tooltip=list(players.columns))),
+        ('roster_distribution', alt.Chart(distribution).mark_bar().encode(y='TEAM_ID:N', x='Q1:Q', x2='Q3:Q')),
+        ('comparison', alt.Chart(comparison).mark_line().encode(x='指標:N', y='パーセンタイル:Q', color='選手:N')),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--number', type=int, default=20)
+    parser.add_argument('--max-kb', type=float, default=256)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scale':>5} {'chart':<20} {'build_ms':>9} {'cached_us':>10} {'points':>7} {'payload_kb':>11}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale)
+            manager = NBADataManager(data_dir=data_dir, raise_errors=True)
+
+            # 作成（データのバージョンごとに1回）と、作成済みデータの取得（再実行ごと）
+            rows = {}
+            for name in ('team_scatter', 'player_scatter', 'roster_distribution', 'comparison'):
+                start = time.perf_counter()
+                rows[name] = len(manager.get_chart_data(name))
+                build_ms = (time.perf_counter() - start) * 1000
+                timings = []
+                for _ in range(args.number):
+                    start = time.perf_counter()
+                    manager.get_chart_data(name)
+                    timings.append(time.perf_counter() - start)
+                rows[name] = (rows[name], build_ms, statistics.median(timings) * 1e6)
+
+            # 画面と同じ構成のグラフの仕様のサイズ（比較はWS上位10人）
+            for name, chart in charts(manager):
+                size = payload_kb(chart)
+                points, build_ms, cached_us = rows[name]
+                print(f"{scale:>5} {name:<20} {build_ms:>9.1f} {cached_us:>10.1f} {points:>7} {size:>11.1f}")
+                if size > args.max_kb:
+                    failures.append(f"x{scale} {name}: データ量が上限を超えました（{size:.1f}KB > {args.max_kb}KB）")
+
+            # 間引かない場合の選手の散布図のデータ量（altairの既定の行数上限を超えるためJSONを直接計算）
+            players = chart_data.player_scatter(manager.player_ratings_cache, max_points=len(manager.player_ratings_cache))
+            raw_kb = len(players.to_json(orient='records', force_ascii=False).encode()) / 1024
+            print(f"{scale:>5} {'player_scatter(raw)':<20} {'':>9} {'':>10} {len(players):>7} {raw_kb:>11.1f}")
+            points = len(manager.get_chart_data('player_scatter'))
+            if points > chart_data.MAX_SCATTER_POINTS:
+                failures.append(f"x{scale} player_scatter: 点数が上限を超えました（{points}）")
+
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+データの取得元（csv / snapshot / shared / live）の読み込み時間・応答時間・鮮度を比較するベンチマーク
+
+使い方:
+    python benchmarks/bench_data_sources.py [--scale 10] [--number 50] [--sources csv snapshot shared live]
+
+csv・snapshot・sharedは合成データ（sharedは共有ディレクトリに公開したもの）、liveはローカルの偽stats.nba.comエンドポイントを使い、ネットワークなしで実行できる。
+鮮度はデータを更新してから共有マネージャーが新しいデータに切り替わるまでの時間（sharedはローダーの公開を含む）。
+いずれかの取得元でデータが読み込めない・切り替わらない場合は終了コード1を返す。
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from synthetic import write_dataset
+from fake_stats import FakeStatsServer
+import shared_dataset
+from data_sources import DATA_SOURCES, LiveApiSource
+from live_stats import LiveStatsClient
+from nba_data_static import PLAYER_COLUMNS, NBADataManager, SharedDataManager
+from seasons import DEFAULT_SEASON
+
+# 変更の確認間隔とライブデータの有効期限（秒、計測用に短くする）
+WATCH_INTERVAL = 0.05
+LIVE_TTL = 0.2
+FRESHNESS_TIMEOUT = 10
+
+
+def read_latency_us(manager, number):
+    """1回の画面表示相当の読み出し（全選手・チーム別選手・チーム・検索）の応答時間の中央値（us）"""
+    team_name = manager._teams[0]['full_name']
+    timings = []
+    for _ in range(number):
+        start = time.perf_counter()
+        manager.get_player_ratings(min_games=20)
+        manager.get_player_ratings(team_name=team_name)
+        manager.get_team_ratings()
+        manager.search_players(['james'])
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1e6
+
+
+def wait_until(predicate):
+    """条件を満たすまで待ち、かかった時間（ms）を返す（タイムアウト時はNone）"""
+    start = time.perf_counter()
+    while time.perf_counter() - start < FRESHNESS_TIMEOUT:
+        if predicate():
+            return (time.perf_counter() - start) * 1000
+        time.sleep(0.005)
+    return None
+
+
+def bench_file_source(name, root, scale, number):
+    data_dir = os.path.join(root, name)
+    write_dataset(data_dir, scale)
+    start = time.perf_counter()
+    shared = SharedDataManager(season=DEFAULT_SEASON, data_dir=data_dir, interval=WATCH_INTERVAL, source=name)
+    load_ms = (time.perf_counter() - start) * 1000
+    manager = shared.get()
+    read_us = read_latency_us(manager, number)
+
+    # データを更新し、新しいデータに切り替わるまでの時間を計測
+    write_dataset(data_dir, scale, seed=1)
+    freshness_ms = wait_until(lambda: shared.get() is not manager)
+    shared.stop()
+    return manager, load_ms, read_us, freshness_ms
+
+
+def bench_shared_source(root, scale, number):
+    """ローダーの公開（shared_dataset.publish）を同じプロセスで行い、ワーカーと同じ取得元で読み込む"""
+    data_dir = os.path.join(root, 'shared-data')
+    shared_dataset.SHARED_DIR = os.path.join(root, 'shared')
+    write_dataset(data_dir, scale)
+    shared_dataset.publish(NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True))
+    start = time.perf_counter()
+    shared = SharedDataManager(season=DEFAULT_SEASON, data_dir=data_dir, interval=WATCH_INTERVAL, source='shared')
+    load_ms = (time.perf_counter() - start) * 1000
+    manager = shared.get()
+    read_us = read_latency_us(manager, number)
+
+    start = time.perf_counter()
+    write_dataset(data_dir, scale, seed=1)
+    shared_dataset.publish(NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True))
+    published_ms = (time.perf_counter() - start) * 1000
+    freshness_ms = wait_until(lambda: shared.get() is not manager)
+    shared.stop()
+    return manager, load_ms, read_us, freshness_ms if freshness_ms is None else published_ms + freshness_ms
+
+
+def bench_live_source(scale, number):
+    server = FakeStatsServer(scale)
+    client = LiveStatsClient(base_url=server.base_url, ttl=LIVE_TTL)
+    try:
+        source = LiveApiSource(DEFAULT_SEASON, None, client=client)
+        start = time.perf_counter()
+        shared = SharedDataManager(season=DEFAULT_SEASON, interval=WATCH_INTERVAL, source=source)
+        load_ms = (time.perf_counter() - start) * 1000
+        manager = shared.get()
+        read_us = read_latency_us(manager, number)
+
+        # 上流のデータを更新し、更新後に取得したデータに切り替わるまでの時間を計測
+        server.version += 1
+        updated_at = time.time()
+        freshness_ms = wait_until(lambda: min(shared.get().signature) > updated_at)
+        shared.stop()
+        return manager, load_ms, read_us, freshness_ms
+    finally:
+        client.close()
+        server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--number', type=int, default=50)
+    parser.add_argument('--sources', nargs='+', default=list(DATA_SOURCES), choices=list(DATA_SOURCES))
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'source':<10} {'players':>8} {'load_ms':>9} {'read_us':>9} {'freshness_ms':>13}")
+    with tempfile.TemporaryDirectory() as root:
+        for name in args.sources:
+            if name == 'live':
+                manager, load_ms, read_us, freshness_ms = bench_live_source(args.scale, args.number)
+            elif name == 'shared':
+                manager, load_ms, read_us, freshness_ms = bench_shared_source(root, args.scale, args.number)
+            else:
+                manager, load_ms, read_us, freshness_ms = bench_file_source(name, root, args.scale, args.number)
+            players = manager.get_player_ratings(min_games=1)
+            freshness = f"{freshness_ms:.0f}" if freshness_ms is not None else "timeout"
+            print(f"{name:<10} {len(players):>8} {load_ms:>9.1f} {read_us:>9.1f} {freshness:>13}")
+
+            missing = [c for c in PLAYER_COLUMNS[:5] if c not in players.columns]
+            if players.empty or missing:
+                failures.append(f"{name}: 選手データを読み込めません（不足している列: {missing}）")
+            if freshness_ms is None:
+                failures.append(f"{name}: {FRESHNESS_TIMEOUT}秒以内に新しいデータに切り替わりませんでした")
+
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
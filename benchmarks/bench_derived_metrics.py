@@ -0,0 +1,90 @@
+"""
+派生指標（WS/G、パーセンタイル、チーム内zスコア、チーム集計）の計算コストを比較するベンチマーク
+
+使い方:
+    python benchmarks/bench_derived_metrics.py [--scales 1 10 100] [--number 20]
+
+pandasのgroupby/rankで画面ごとに計算する方式（pandas_ms）と、NumPyで一括計算する方式（numpy_ms）、
+計算済みの列を読み出すだけの方式（memoized_us）を比較し、両方式の結果が一致することを確認する。
+"""
+import argparse
+import tempfile
+import timeit
+
+import numpy as np
+
+from synthetic import SCALES, write_dataset
+from derived_metrics import (
+    WS_PCTL,
+    WS_PER_GAME,
+    WS_TEAM_Z,
+    add_player_metrics,
+    add_team_metrics,
+    team_aggregates
+)
+from nba_data_static import NBADataManager
+
+
+def pandas_metrics(season_totals, team_stints):
+    """pandasのgroupby/rankで派生指標を計算（画面ごとに計算していた場合の処理）"""
+    totals = season_totals.assign(WS_PER_GAME=season_totals['NET_RATING'] / season_totals['GP'])
+    totals['WS_PCTL'] = totals['NET_RATING'].rank(method='max', pct=True) * 100
+    stints = team_stints.assign(WS_PER_GAME=team_stints['NET_RATING'] / team_stints['GP'])
+    grouped = stints.groupby('TEAM_ID', observed=True)['NET_RATING']
+    std = grouped.transform(lambda s: s.std(ddof=0))
+    stints['WS_TEAM_Z'] = ((stints['NET_RATING'] - grouped.transform('mean')) / std).where(std > 1e-12, 0.0)
+    aggregates = stints.groupby('TEAM_ID', observed=True).agg(
+        PLAYERS=('PLAYER_NAME', 'size'),
+        OWS=('OFF_RATING', 'sum'),
+        DWS=('DEF_RATING', 'sum'),
+        WS=('NET_RATING', 'sum'),
+    )
+    return totals, stints, aggregates
+
+
+def numpy_metrics(season_totals, team_stints):
+    return add_player_metrics(season_totals), add_team_metrics(team_stints), team_aggregates(team_stints)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'rows':>8} {'pandas_ms':>10} {'numpy_ms':>9} {'speedup':>8} {'memoized_us':>12}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale)
+            manager = NBADataManager(use_static_data=True, data_dir=data_dir)
+            totals = manager.player_ratings_cache
+            stints = manager.player_stints_cache
+
+            # 計算結果が一致することを確認
+            expected_totals, expected_stints, expected_aggregates = pandas_metrics(totals, stints)
+            actual_totals, actual_stints, actual_aggregates = numpy_metrics(totals, stints)
+            valid = totals['NET_RATING'].notna().to_numpy()
+            for col in (WS_PER_GAME, WS_PCTL):
+                np.testing.assert_allclose(actual_totals[col].to_numpy()[valid],
+                                           expected_totals[col].to_numpy()[valid], rtol=1e-5)
+            for col in (WS_PER_GAME, WS_TEAM_Z):
+                np.testing.assert_allclose(actual_stints[col].to_numpy(), expected_stints[col].to_numpy(),
+                                           rtol=1e-4, atol=1e-6)
+            expected_aggregates = expected_aggregates.reindex(actual_aggregates.index)
+            for col in ('PLAYERS', 'OWS', 'DWS', 'WS'):
+                np.testing.assert_allclose(actual_aggregates[col].to_numpy(dtype='float64'),
+                                           expected_aggregates[col].to_numpy(dtype='float64'), rtol=1e-4)
+
+            pandas_ms = timeit.timeit(lambda: pandas_metrics(totals, stints), number=args.number) / args.number * 1000
+            numpy_ms = timeit.timeit(lambda: numpy_metrics(totals, stints), number=args.number) / args.number * 1000
+            manager.get_team_aggregates()
+            memoized_us = timeit.timeit(
+                lambda: (manager.get_player_ratings(min_games=20), manager.get_team_aggregates()),
+                number=args.number * 10
+            ) / (args.number * 10) * 1e6
+        print(f"{scale:>5}x {len(totals) + len(stints):>8} {pandas_ms:>10.2f} {numpy_ms:>9.2f} "
+              f"{pandas_ms / numpy_ms:>7.1f}x {memoized_us:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+pd.read_htmlによるページ全体の解析と、目的のテーブルだけを抽出するhtml_tables.extract_tableを比較するベンチマーク
+解析時間とピークメモリ（RSSの増加量）を計測する
+
+使い方:
+    python benchmarks/bench_html_extract.py [--scales 1 10] [--repeat 3]
+    python benchmarks/bench_html_extract.py --team-page NBA_2026.html --player-page NBA_2026_advanced.html
+
+保存済みのページを指定しない場合は合成したフィクスチャページを使用する。
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import REPO_ROOT, current_rss_mb, make_bref_pages
+
+
+def _peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _child(method, team_path, player_path, repeat):
+    """サブプロセス側: 指定方式で2ページを解析し、時間とピークメモリをJSONで出力"""
+    from io import StringIO
+
+    import pandas as pd
+
+    import fetch_data
+    from html_tables import extract_table
+
+    with open(team_path, encoding='utf-8') as f:
+        team_html = f.read()
+    with open(player_path, encoding='utf-8') as f:
+        player_html = f.read()
+
+    def parse():
+        if method == 'read_html':
+            team_df = fetch_data.find_advanced_team_table(team_html)
+            player_df = pd.read_html(StringIO(player_html))[0]
+        else:
+            team_df = extract_table(team_html, fetch_data.TEAM_TABLE_ID)
+            player_df = extract_table(player_html, fetch_data.PLAYER_TABLE_IDS)
+        return len(team_df), len(player_df)
+
+    rss_before = current_rss_mb()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = parse()
+        timings.append(time.perf_counter() - start)
+    print(json.dumps({
+        'method': method,
+        'team_rows': rows[0],
+        'player_rows': rows[1],
+        'parse_ms': min(timings) * 1000,
+        'peak_delta_mb': _peak_rss_mb() - rss_before,
+    }))
+
+
+def _run(label, team_path, player_path, repeat):
+    for method in ('read_html', 'extract'):
+        output = subprocess.run(
+            [sys.executable, __file__, '--repeat', str(repeat), '--child', method, team_path, player_path],
+            check=True, capture_output=True, text=True, cwd=REPO_ROOT
+        ).stdout
+        result = json.loads(output)
+        print(f"{label:>8} {method:>10} {result['team_rows']:>6} {result['player_rows']:>8} "
+              f"{result['parse_ms']:>10.1f} {result['peak_delta_mb']:>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--team-page', help="保存済みのリーグページ（NBA_YYYY.html）")
+    parser.add_argument('--player-page', help="保存済みの選手Advancedページ（NBA_YYYY_advanced.html）")
+    parser.add_argument('--child', nargs=3, metavar=('METHOD', 'TEAM', 'PLAYER'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child, args.repeat)
+        return
+
+    print(f"{'pages':>8} {'method':>10} {'teams':>6} {'players':>8} {'parse_ms':>10} {'peak_mb':>9}")
+    if args.team_page and args.player_page:
+        _run('saved', args.team_page, args.player_page, args.repeat)
+        return
+
+    for scale in args.scales:
+        team_html, player_html = make_bref_pages(scale)
+        with tempfile.TemporaryDirectory() as tmp:
+            team_path = os.path.join(tmp, 'team.html')
+            player_path = os.path.join(tmp, 'player.html')
+            with open(team_path, 'w', encoding='utf-8') as f:
+                f.write(team_html)
+            with open(player_path, 'w', encoding='utf-8') as f:
+                f.write(player_html)
+            _run(f"{scale}x", team_path, player_path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+ライブモードの取得レイヤー（LiveStatsClient）をローカルの偽stats.nba.comエンドポイントで確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_live_fetch.py [--sessions 20] [--delay 0.3]
+
+同時アクセス時の取得回数（single-flight）、期限切れ時の応答時間（stale-while-revalidate）、
+一時的なエラーからの回復（バックオフ付き再試行）を計測し、期待通りでない場合は終了コード1を返す。
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_stats import FakeStatsServer
+from live_stats import LiveStatsClient, StatsRequestError
+
+
+PARAMETERS = {'Season': '2025-26', 'MeasureType': 'Advanced'}
+
+
+def concurrent_calls(client, sessions):
+    """sessions個のセッションが同時に同じデータを要求し、(結果, 所要時間)を返す"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        frames = list(pool.map(lambda _: client.get_frame('leaguedashteamstats', PARAMETERS), range(sessions)))
+    return frames, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--delay', type=float, default=0.3)
+    args = parser.parse_args()
+
+    server = FakeStatsServer()
+    failures = []
+
+    def check(condition, message):
+        print(f"{'✓' if condition else '✗'} {message}")
+        if not condition:
+            failures.append(message)
+
+    # 1. 初回の同時アクセス: 上流へのリクエストは1回にまとまる
+    server.delay = args.delay
+    client = LiveStatsClient(base_url=server.base_url, ttl=0.5, backoff_base=0.05, backoff_max=0.2)
+    frames, elapsed = concurrent_calls(client, args.sessions)
+    check(server.requests == 1 and all(len(f) == 30 for f in frames),
+          f"同時{args.sessions}セッション（初回）: 上流リクエスト{server.requests}回, {elapsed * 1000:.0f}ms")
+
+    # 2. 期限切れ後: 上流が遅くても前回のデータを即座に返し、再取得は1回だけ
+    time.sleep(0.6)
+    server.delay = args.delay * 5
+    server.version = 1
+    requests_before = server.requests
+    frames, elapsed = concurrent_calls(client, args.sessions)
+    check(elapsed < args.delay and all(f['VERSION'].iloc[0] == 0 for f in frames),
+          f"同時{args.sessions}セッション（期限切れ）: 前回のデータを{elapsed * 1000:.1f}msで応答")
+    time.sleep(args.delay * 5 + 0.2)
+    frame = client.get_frame('leaguedashteamstats', PARAMETERS)
+    check(server.requests - requests_before == 1 and frame['VERSION'].iloc[0] == 1,
+          f"裏での再取得: 上流リクエスト{server.requests - requests_before}回、取得後は新しいデータを応答")
+
+    # 3. 一時的なエラー: バックオフ付きで再試行して回復する
+    server.delay = 0.0
+    server.fail_next = 2
+    requests_before = server.requests
+    start = time.perf_counter()
+    frame = client.get_frame('leaguedashteamstats', dict(PARAMETERS, Season='2024-25'))
+    elapsed = time.perf_counter() - start
+    check(len(frame) == 30 and server.requests - requests_before == 3,
+          f"500エラー2回の後に回復: 上流リクエスト{server.requests - requests_before}回, {elapsed * 1000:.0f}ms")
+
+    # 4. 上流が落ちている場合: キャッシュがあれば前回のデータ、なければエラー
+    time.sleep(0.6)
+    server.fail_next = 100
+    frame = client.get_frame('leaguedashteamstats', PARAMETERS)
+    check(len(frame) == 30, "上流の障害中も期限切れのデータで応答")
+    try:
+        client.get_frame('leaguedashteamstats', dict(PARAMETERS, Season='2023-24'))
+        check(False, "キャッシュがない場合はStatsRequestErrorを送出")
+    except StatsRequestError:
+        check(True, "キャッシュがない場合はStatsRequestErrorを送出")
+
+    print(f"stats={client.stats}")
+    client.close()
+    server.close()
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
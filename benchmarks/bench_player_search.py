@@ -0,0 +1,62 @@
+"""
+選手名検索（search_players）の旧実装（str.containsによる全件走査）とインデックス版を比較するベンチマーク
+
+使い方:
+    python benchmarks/bench_player_search.py [--scales 1 10 100] [--number 20]
+"""
+import argparse
+import tempfile
+import time
+import timeit
+
+import pandas as pd
+
+from synthetic import SCALES, write_dataset
+from nba_data_static import NBADataManager
+
+QUERIES = ['jokic', 'james', 'gilgeous', 'zz']
+FUZZY_QUERIES = ['lebron jams', 'antetokoumpo']
+
+
+def legacy_search_players(manager, player_names):
+    """インデックス導入前の実装"""
+    all_players = manager.player_ratings_cache.copy()
+    all_players = all_players[all_players['GP'] >= 1]
+    all_players = all_players[['PLAYER_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']]
+    matched_dfs = [
+        all_players[all_players['PLAYER_NAME'].str.contains(name, case=False, na=False)]
+        for name in player_names if name
+    ]
+    return pd.concat(matched_dfs).drop_duplicates()
+
+
+def _per_query_us(func, number):
+    return min(timeit.repeat(func, number=number, repeat=3)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--number', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'scale':>6} {'rows':>8} {'index_ms':>9} {'legacy_us':>10} "
+          f"{'substr_us':>10} {'prefix_us':>10} {'fuzzy_us':>10}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale, with_snapshot=False)
+            manager = NBADataManager(use_static_data=True, data_dir=data_dir)
+        start = time.perf_counter()
+        manager.memoize('search_index', manager._build_search_index)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        legacy = _per_query_us(lambda: legacy_search_players(manager, QUERIES), args.number)
+        substring = _per_query_us(lambda: manager.search_players(QUERIES, mode='substring'), args.number)
+        prefix = _per_query_us(lambda: manager.search_players(QUERIES, mode='prefix'), args.number)
+        fuzzy = _per_query_us(lambda: manager.search_players(FUZZY_QUERIES, mode='fuzzy'), args.number)
+        print(f"{scale:>5}x {len(manager.player_ratings_cache):>8} {build_ms:>9.1f} {legacy:>10.1f} "
+              f"{substring:>10.1f} {prefix:>10.1f} {fuzzy:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+表示用の表のプロセス共有キャッシュ（result_cache.py）の効果と上限・無効化を確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_result_cache.py [--scales 1 10] [--requests 5000] [--max-kb 512]
+
+多数の閲覧者が人気に偏りのある表示条件（チーム・並び替え列・ページ）を選ぶ想定で、
+キャッシュなし（毎回並び替え・行の取り出し・行番号付け）とキャッシュありの1リクエストあたりの時間、
+ヒット率を比較する。あわせて、データ量の上限を超えないこと、データ更新後に更新前の表が解放され
+表示されないことを確認し、問題があれば終了コード1を返す。
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from synthetic import write_dataset
+from nba_data_static import NBADataManager, SharedDataManager
+from result_cache import ResultCache, results
+from table_format import PLAYER_COLUMN_LABELS, TEAM_COLUMN_LABELS, DisplayTable, numbered
+
+PAGE_SIZE = 50
+
+
+def make_views(manager):
+    """画面で選択できる表示条件と、その表を作成する関数の組のリスト（components.pyと同じ処理）"""
+    team_ratings = DisplayTable(manager.get_team_ratings(), TEAM_COLUMN_LABELS)
+    all_players = DisplayTable(manager.get_player_ratings(min_games=20), PLAYER_COLUMN_LABELS)
+    team_tables = {team['abbreviation']: DisplayTable(manager.get_player_ratings(team_name=team['full_name']),
+                                                      PLAYER_COLUMN_LABELS)
+                   for team in manager._teams}
+
+    def sorted_rows(table, column, ascending, offset=0, end=None):
+        return lambda: numbered(table.rows(table.order(column, ascending=ascending)[offset:end]), offset + 1)
+
+    views = []
+    for ascending in (False, True):
+        for column in team_ratings.values.columns:
+            views.append((('team_ratings', column, ascending), sorted_rows(team_ratings, column, ascending)))
+        for team_id, table in team_tables.items():
+            for column in table.values.columns:
+                views.append((('team_players', team_id, column, ascending), sorted_rows(table, column, ascending)))
+        for column in all_players.values.columns:
+            for offset in range(0, len(all_players.values), PAGE_SIZE):
+                end = min(offset + PAGE_SIZE, len(all_players.values))
+                views.append((('all_players', column, ascending, offset, end),
+                              sorted_rows(all_players, column, ascending, offset, end)))
+    return views
+
+
+def simulate(manager, requests, seed=0):
+    """人気に偏りのある表示条件のリクエストを、キャッシュなし・ありで処理した時間とキャッシュの統計を返す"""
+    views = make_views(manager)
+    rng = random.Random(seed)
+    # 人気順に並べた表示条件の選ばれやすさは順位に反比例する（多くの閲覧者は少数の表示条件に集中する）
+    rng.shuffle(views)
+    chosen = rng.choices(views, weights=[1 / (rank + 1) for rank in range(len(views))], k=requests)
+
+    start = time.perf_counter()
+    for _, build in chosen:
+        build()
+    uncached = time.perf_counter() - start
+
+    cache = ResultCache()
+    start = time.perf_counter()
+    for view, build in chosen:
+        cache.get_or_compute(manager.data_dir, manager.signature, view, build)
+    cached = time.perf_counter() - start
+
+    # 一度キャッシュした後（全表示条件が保持済み）のヒット時の時間
+    hit_timings = []
+    for view, build in chosen[:1000]:
+        start = time.perf_counter()
+        cache.get_or_compute(manager.data_dir, manager.signature, view, build)
+        hit_timings.append(time.perf_counter() - start)
+    return len(views), uncached, cached, statistics.median(hit_timings), cache.stats()
+
+
+def check_limits(manager, max_kb):
+    """データ量の上限を超えないことを確認（問題点のリストを返す）"""
+    failures = []
+    cache = ResultCache(max_bytes=max_kb * 1024)
+    for view, build in make_views(manager):
+        cache.get_or_compute(manager.data_dir, manager.signature, view, build)
+        if cache.bytes > cache.max_bytes:
+            failures.append(f"データ量が上限を超えました（{cache.bytes} > {cache.max_bytes}）")
+            break
+    stats = cache.stats()
+    print(f"上限{max_kb}KB: 保持 {stats['entries']}表 / {stats['bytes'] / 1024:.1f}KB、解放 {stats['evictions']}回")
+    if not stats['evictions']:
+        failures.append("上限を超える表を作成しても解放されませんでした")
+    return failures
+
+
+def check_invalidation():
+    """データ更新後に更新前の表が解放され、更新後の表が表示されることを確認（問題点のリストを返す）"""
+    failures = []
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, 1, with_snapshot=False)
+        shared = SharedDataManager(data_dir=data_dir, interval=3600, source='csv')
+        shared.stop()
+        manager = shared.get()
+        view = ('all_players', 'OWS', False, 0, None)
+
+        def lookup(manager):
+            table = DisplayTable(manager.get_player_ratings(min_games=20), PLAYER_COLUMN_LABELS)
+            return results.get_or_compute(manager.data_dir, manager.signature, view,
+                                          lambda: numbered(table.rows(table.order('OWS', ascending=False))))
+
+        before = lookup(manager)
+        lookup(manager)
+        stats = results.stats()
+        if stats['hits'] < 1:
+            failures.append("同じ表示条件の2回目の表示がキャッシュから取得されませんでした")
+
+        # データを更新（行数が変わる）して差し替える
+        time.sleep(0.01)
+        write_dataset(data_dir, 2, with_snapshot=False)
+        if not shared.reload_if_changed():
+            failures.append("データの更新が検知されませんでした")
+            return failures
+        if any(results.stats()[name] for name in ('entries', 'bytes')):
+            failures.append(f"更新前の表が解放されていません: {results.stats()}")
+        after = lookup(shared.get())
+        if len(after) == len(before):
+            failures.append("更新後も更新前の表が表示されました")
+        else:
+            print(f"✓ データ更新で更新前の表を解放（{stats['entries']}表）、更新後の表を表示（{len(before)} → {len(after)}行）")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--max-kb', type=int, default=512)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scale':>5} {'views':>6} {'uncached_us':>12} {'cached_us':>10} {'hit_us':>7} {'hit_rate':>9} "
+          f"{'entries':>8} {'cache_kb':>9}")
+    managers = {}
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale, with_snapshot=False)
+            manager = managers[scale] = NBADataManager(use_static_data=True, data_dir=data_dir, source='csv')
+        view_count, uncached, cached, hit, stats = simulate(manager, args.requests)
+        hit_rate = stats['hits'] / (stats['hits'] + stats['misses'])
+        print(f"{scale:>4}x {view_count:>6} {uncached / args.requests * 1e6:>12.1f} "
+              f"{cached / args.requests * 1e6:>10.1f} {hit * 1e6:>7.2f} {hit_rate:>8.1%} "
+              f"{stats['entries']:>8} {stats['bytes'] / 1024:>9.1f}")
+        if cached >= uncached:
+            failures.append(f"x{scale}: キャッシュありの方が遅くなりました")
+    print()
+
+    failures += check_limits(managers[args.scales[0]], args.max_kb)
+    failures += check_invalidation()
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+シーズン切り替え時のLRU（SeasonStore）の挙動とメモリ使用量を確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_season_cache.py [--seasons 10] [--max-seasons 3] [--scale 10] [--rounds 3]
+
+合成データで複数シーズンを作成して順番に切り替え、保持シーズン数が上限を超えないこと、
+RSSが保持数相当で頭打ちになることを確認する。上限を超えた場合は終了コード1を返す。
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from synthetic import current_rss_mb, write_dataset
+from nba_data_static import SeasonStore
+from seasons import season_dir
+
+
+def make_seasons(data_dir, count, scale):
+    """直近countシーズン分の合成データを作成し、シーズン名のリストを返す"""
+    seasons = []
+    for i in range(count):
+        start = 2025 - i
+        season = f"{start}-{(start + 1) % 100:02d}"
+        path = season_dir(data_dir, season)
+        os.makedirs(path, exist_ok=True)
+        write_dataset(path, scale)
+        seasons.append(season)
+    return seasons
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seasons', type=int, default=10)
+    parser.add_argument('--max-seasons', type=int, default=3)
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        seasons = make_seasons(data_dir, args.seasons, args.scale)
+        # 監視スレッドはベンチマーク中に動かないよう間隔を長くする
+        store = SeasonStore(data_dir=data_dir, max_seasons=args.max_seasons, interval=3600)
+        assert store.seasons() == seasons, store.seasons()
+
+        rss_start = current_rss_mb()
+        peak_resident = 0
+        per_season_bytes = 0
+        load_times = []
+        hit_times = []
+        rss_after_round = []
+        for _ in range(args.rounds):
+            for season in seasons:
+                start = time.perf_counter()
+                manager = store.get(season)
+                load_times.append(time.perf_counter() - start)
+                assert manager.season == season
+                start = time.perf_counter()
+                store.get(season)
+                hit_times.append(time.perf_counter() - start)
+                per_season_bytes = max(per_season_bytes, manager.memory_usage())
+                peak_resident = max(peak_resident, len(store.stats()['resident_seasons']))
+            rss_after_round.append(current_rss_mb())
+
+        stats = store.stats()
+        print(f"seasons={args.seasons} max_seasons={args.max_seasons} scale={args.scale} rounds={args.rounds}")
+        print(f"resident_seasons={stats['resident_seasons']} peak_resident={peak_resident}")
+        print(f"resident_mb={stats['resident_bytes'] / 1024 / 1024:.1f} "
+              f"per_season_mb={per_season_bytes / 1024 / 1024:.1f}")
+        print(f"hits={stats['hits']} misses={stats['misses']} evictions={stats['evictions']}")
+        print(f"load_ms(mean)={sum(load_times) / len(load_times) * 1000:.2f} "
+              f"hit_us(mean)={sum(hit_times) / len(hit_times) * 1e6:.1f}")
+        print("rss_mb=" + " ".join(f"{rss:.1f}" for rss in [rss_start] + rss_after_round))
+
+        failures = []
+        if peak_resident > args.max_seasons:
+            failures.append(f"保持シーズン数が上限を超えました: {peak_resident} > {args.max_seasons}")
+        # 2周目以降のRSS増加が保持上限分のデータ量を大きく超える場合はリークとみなす
+        budget_mb = max(args.max_seasons * per_season_bytes / 1024 / 1024, 1) * 2
+        growth = rss_after_round[-1] - rss_after_round[0]
+        if len(rss_after_round) > 1 and growth > budget_mb:
+            failures.append(f"RSSが増え続けています: +{growth:.1f}MB > {budget_mb:.1f}MB")
+        for message in failures:
+            print(f"✗ {message}")
+        if failures:
+            sys.exit(1)
+        print("✓ 保持シーズン数・RSSともに上限内")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+同時に表示中のセッション数に対するメモリ使用量（RSS）を確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_session_memory.py [--scale 10] [--sessions 10 100] [--max-session-kb 64]
+
+各セッションは1回の再実行で取得する表（チームレーティング、全選手、チーム別選手、検索結果）を保持する。
+次の2つを独立したサブプロセスで計測し、読み込み後のRSSと1セッションあたりのRSSの増加を比較する。
+- legacy: 読み込んだままの型（object・float64）で保持し、取得のたびに全体をコピーする（従来の実装）
+- compact: カテゴリ・float32・int16・共有した名前の文字列で保持し、コピーオンライトで共有の表を返す
+compactの1セッションあたりの増加が上限を超える、またはlegacy以上の場合は終了コード1を返す。
+"""
+import argparse
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+
+from synthetic import REPO_ROOT, current_rss_mb, write_dataset
+
+
+def _child(mode, data_dir, session_counts):
+    """サブプロセス側: 読み込み後、セッションを順に増やしてRSSをJSONで出力"""
+    import random
+
+    import pandas as pd
+
+    import nba_data_static
+    from nba_data_static import NBADataManager
+
+    if mode == 'legacy':
+        # 型の変換を行わずに読み込む
+        nba_data_static.compact_types = lambda df: df
+    elif int(pd.__version__.split('.')[0]) < 3:
+        # アプリ（main.py）と同じくコピーオンライトを有効にする
+        pd.set_option('mode.copy_on_write', True)
+
+    rss_start = current_rss_mb()
+    manager = NBADataManager(data_dir=data_dir, source='csv')
+    gc.collect()
+    rss_loaded = current_rss_mb()
+
+    if mode == 'legacy':
+        def team_ratings():
+            return manager.team_ratings_cache.copy()
+
+        def player_ratings():
+            return manager._filter_players(20)
+    else:
+        team_ratings = manager.get_team_ratings
+
+        def player_ratings():
+            return manager.get_player_ratings(min_games=20)
+
+    team_names = [team['full_name'] for team in manager._teams]
+    # 検索は選手の姓で行う（1〜数人に一致する）
+    search_names = [name.split()[-1] for name in manager.player_ratings_cache['PLAYER_NAME'].head(200)]
+    rng = random.Random(0)
+    sessions = []
+    results = []
+    rss_before = current_rss_mb()
+    for count in sorted(session_counts):
+        while len(sessions) < count:
+            sessions.append((
+                team_ratings(),
+                player_ratings(),
+                manager.get_player_ratings(team_name=rng.choice(team_names)),
+                manager.search_players([rng.choice(search_names)]),
+            ))
+        gc.collect()
+        rss = current_rss_mb()
+        results.append({'sessions': count, 'rss_mb': rss, 'per_session_kb': (rss - rss_before) * 1024 / count})
+
+    frames = (manager.team_ratings_cache, manager.player_ratings_cache, manager.player_stints_cache)
+    print(json.dumps({
+        'mode': mode,
+        'load_mb': rss_loaded - rss_start,
+        'frames_kb': sum(df.memory_usage(deep=True).sum() for df in frames) / 1024,
+        'results': results,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scale', type=int, default=10)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--max-session-kb', type=float, default=64)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DATA_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.child[1], args.sessions)
+        return
+
+    outputs = {}
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(data_dir, args.scale, with_snapshot=False)
+        for mode in ('legacy', 'compact'):
+            output = subprocess.run(
+                [sys.executable, __file__, '--sessions', *map(str, args.sessions), '--child', mode, data_dir],
+                check=True, capture_output=True, text=True, cwd=REPO_ROOT
+            ).stdout
+            outputs[mode] = json.loads(output.strip().splitlines()[-1])
+
+    print(f"合成データ x{args.scale}")
+    print(f"{'mode':<8} {'load_mb':>8} {'frames_kb':>10} {'sessions':>9} {'rss_mb':>8} {'kb/session':>11}")
+    for mode, output in outputs.items():
+        for result in output['results']:
+            print(f"{mode:<8} {output['load_mb']:>8.1f} {output['frames_kb']:>10.0f} {result['sessions']:>9} "
+                  f"{result['rss_mb']:>8.1f} {result['per_session_kb']:>11.1f}")
+
+    failures = []
+    legacy, compact = outputs['legacy']['results'][-1], outputs['compact']['results'][-1]
+    if compact['per_session_kb'] > args.max_session_kb:
+        failures.append(f"1セッションあたりのメモリが上限を超えました（{compact['per_session_kb']:.1f}KB > "
+                        f"{args.max_session_kb}KB）")
+    if compact['per_session_kb'] >= legacy['per_session_kb']:
+        failures.append("1セッションあたりのメモリが従来の実装から減っていません")
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+"""
+CSVと列指向スナップショットの読み込み時間・RSSを比較するベンチマーク
+
+使い方:
+    python benchmarks/bench_snapshot_load.py [--scales 1 10 100] [--repeat 5]
+
+各計測は独立したサブプロセスで行い、読み込み前後のRSS差分を報告する。
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import REPO_ROOT, SCALES, current_rss_mb, write_dataset
+
+
+def _child(mode, data_dir, repeat):
+    """サブプロセス側: 指定方式で読み込み、時間とRSSをJSONで出力"""
+    import pandas as pd
+    import snapshot
+
+    paths = [
+        (os.path.join(data_dir, 'team_ratings.csv'), os.path.join(data_dir, snapshot.TEAM_SNAPSHOT)),
+        (os.path.join(data_dir, 'player_ratings.csv'), os.path.join(data_dir, snapshot.PLAYER_SNAPSHOT)),
+    ]
+
+    def load():
+        if mode == 'csv':
+            return [pd.read_csv(csv_path) for csv_path, _ in paths]
+        return [snapshot.read_snapshot(snapshot_path) for _, snapshot_path in paths]
+
+    # インポートのコストを計測から除くため一度読み込んで捨てる
+    load()
+    rss_before = current_rss_mb()
+    timings = []
+    frames = None
+    for _ in range(repeat):
+        frames = None
+        start = time.perf_counter()
+        frames = load()
+        timings.append(time.perf_counter() - start)
+    rss_after = current_rss_mb()
+    print(json.dumps({
+        'mode': mode,
+        'rows': sum(len(df) for df in frames),
+        'load_ms': min(timings) * 1000,
+        'rss_mb': rss_after,
+        'rss_delta_mb': rss_after - rss_before,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'DATA_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child[0], args.child[1], args.repeat)
+        return
+
+    results = []
+    print(f"{'scale':>6} {'mode':>9} {'rows':>9} {'load_ms':>10} {'rss_mb':>9} {'delta_mb':>9}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale)
+            for mode in ('csv', 'snapshot'):
+                output = subprocess.run(
+                    [sys.executable, __file__, '--repeat', str(args.repeat), '--child', mode, data_dir],
+                    check=True, capture_output=True, text=True, cwd=REPO_ROOT
+                ).stdout
+                result = dict(json.loads(output), scale=scale)
+                results.append(result)
+                print(f"{scale:>5}x {mode:>9} {result['rows']:>9} "
+                      f"{result['load_ms']:>10.2f} {result['rss_mb']:>9.1f} {result['rss_delta_mb']:>9.1f}")
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+"""
+データ更新中の読み込みの一貫性と、版管理（snapshot_store.py）による公開を確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_snapshot_publish.py [--updates 30] [--interval-ms 20]
+
+更新のたびに倍率を変えた合成データを書き込み、並行して読み込み側が変更を検知して読み込み直す。
+- inplace: 従来どおりシーズンのディレクトリのファイルを順に上書きする
+- versioned: 作業用ディレクトリに作成し、検証してからCURRENTを置き換えて公開する
+チームと選手の行数から倍率を求め、異なる更新のデータが混在した読み込み（mixed）・読み込みエラー・
+再読み込みの回数を比較する。あわせて、壊れた版が検証で公開されないことを確認する。
+versionedで混在・エラーがある、再読み込みが更新回数を超える、または壊れた版が公開された場合は終了コード1を返す。
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from synthetic import make_player_ratings, make_team_ratings, write_dataset
+import snapshot_store
+from data_sources import CsvSource
+from seasons import DEFAULT_SEASON
+
+# 更新ごとに交互に使う倍率（前の版からの行数の減少が検証の下限を下回らない組み合わせ）
+SCALES = (2, 3)
+
+
+def write_inplace(season_path, scale):
+    """シーズンのディレクトリのファイルを順に上書き（従来の書き込み方）"""
+    write_dataset(season_path, scale, with_snapshot=False)
+
+
+def write_versioned(season_path, scale):
+    """作業用ディレクトリに書き込み、検証してから公開"""
+    staging = snapshot_store.create_staging(season_path)
+    write_dataset(staging, scale, with_snapshot=False)
+    # 計測中に読み込み中の版が削除されないよう、すべての版を残す
+    snapshot_store.publish(season_path, staging, DEFAULT_SEASON, datetime.now().astimezone(), keep=10 ** 6)
+
+
+def run(mode, root, updates, interval):
+    """更新と並行して読み込み、(再読み込み回数, 混在した読み込み, エラー, シグネチャ確認のus)を返す"""
+    season_path = os.path.join(root, mode)
+    team_rows = len(make_team_ratings(1))
+    player_rows = len(make_player_ratings(1))
+    write = write_inplace if mode == 'inplace' else write_versioned
+    write(season_path, SCALES[0])
+
+    source = CsvSource(DEFAULT_SEASON, season_path)
+    counts = {'reloads': 0, 'mixed': 0, 'errors': 0}
+    signature_timings = []
+    done = threading.Event()
+
+    def reader():
+        last = source.signature()
+        while not done.is_set():
+            start = time.perf_counter()
+            signature = source.signature()
+            signature_timings.append(time.perf_counter() - start)
+            if signature == last:
+                time.sleep(0.001)
+                continue
+            last = signature
+            counts['reloads'] += 1
+            try:
+                teams = source.load_team_ratings()
+                players = source.load_player_ratings()
+            except Exception:
+                counts['errors'] += 1
+                continue
+            # チームと選手が同じ更新のデータか（倍率が一致するか）
+            if len(teams) * player_rows != len(players) * team_rows:
+                counts['mixed'] += 1
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for i in range(updates):
+        time.sleep(interval)
+        write(season_path, SCALES[(i + 1) % len(SCALES)])
+    time.sleep(interval)
+    done.set()
+    thread.join()
+    return counts, statistics.median(signature_timings) * 1e6
+
+
+def check_validation(root):
+    """壊れた版が検証で拒否され、公開中の版が変わらないことを確認（問題点のリストを返す）"""
+    failures = []
+    season_path = os.path.join(root, 'validation')
+    write_versioned(season_path, SCALES[0])
+    published = snapshot_store.current_version(season_path)
+
+    def attempt(label, corrupt):
+        staging = snapshot_store.create_staging(season_path)
+        write_dataset(staging, SCALES[0], with_snapshot=False)
+        corrupt(staging)
+        try:
+            snapshot_store.publish(season_path, staging, DEFAULT_SEASON, datetime.now().astimezone())
+            failures.append(f"{label}: 検証を通過して公開されました")
+        except snapshot_store.SnapshotValidationError as e:
+            print(f"✓ {label}: {e.errors[0]}")
+        if snapshot_store.current_version(season_path) != published:
+            failures.append(f"{label}: 公開中の版が変わりました")
+        if os.path.exists(staging):
+            failures.append(f"{label}: 作業用ディレクトリが残っています")
+
+    def rewrite(filename, transform):
+        def corrupt(staging):
+            path = os.path.join(staging, filename)
+            transform(pd.read_csv(path)).to_csv(path, index=False)
+        return corrupt
+
+    attempt("途中までしかない選手データ", rewrite('player_ratings.csv', lambda df: df.head(len(df) // 5)))
+    attempt("列が欠けたチームデータ", rewrite('team_ratings.csv', lambda df: df.drop(columns=['NET_RATING'])))
+    attempt("数値でない試合数", rewrite('player_ratings.csv', lambda df: df.assign(GP='-')))
+    attempt("更新日時がない", lambda staging: os.remove(os.path.join(staging, 'last_updated.txt')))
+
+    # マニフェスト作成後にファイルが変わった場合はチェックサムで検出する
+    path, _ = snapshot_store.resolve_dir(season_path)
+    manifest = snapshot_store.read_manifest(path)
+    with open(os.path.join(path, 'team_ratings.csv'), 'a') as f:
+        f.write("Extra Team,1,1,0\n")
+    errors = snapshot_store.validate(path, manifest)
+    if not any('チェックサム' in error for error in errors):
+        failures.append("公開後のファイルの変更がチェックサムで検出されませんでした")
+    else:
+        print("✓ 公開後に変更されたファイル: チェックサムの不一致を検出")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--updates', type=int, default=30)
+    parser.add_argument('--interval-ms', type=float, default=20)
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as root:
+        print(f"{'mode':<10} {'updates':>8} {'reloads':>8} {'mixed':>6} {'errors':>7} {'signature_us':>13}")
+        for mode in ('inplace', 'versioned'):
+            counts, signature_us = run(mode, root, args.updates, args.interval_ms / 1000)
+            print(f"{mode:<10} {args.updates:>8} {counts['reloads']:>8} {counts['mixed']:>6} "
+                  f"{counts['errors']:>7} {signature_us:>13.1f}")
+            if mode == 'versioned':
+                if counts['mixed'] or counts['errors']:
+                    failures.append(f"版管理での読み込みにデータの混在・エラーがありました: {counts}")
+                if counts['reloads'] > args.updates:
+                    failures.append(f"1回の公開で複数回再読み込みしました: {counts['reloads']} > {args.updates}")
+        print()
+        failures += check_validation(root)
+
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
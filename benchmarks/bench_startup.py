@@ -0,0 +1,101 @@
+"""
+アプリ起動時のインポート時間を計測するベンチマーク（python -X importtime）
+
+使い方:
+    python benchmarks/bench_startup.py [--repeat 5] [--budget-ms 0] [--top 10]
+
+新しいプロセスでmainモジュールをインポートし、アプリのモジュール・依存パッケージごとの
+インポート時間を集計する。起動時に読み込まないはずのモジュール（nba_apiなど）が読み込まれた場合、
+または--budget-msを指定してインポート時間の中央値が上回った場合は終了コード1を返す。
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from synthetic import REPO_ROOT
+
+# 静的データモードの起動時に読み込まないモジュール（ライブモード・データ取得・各ページでのみ使用）
+LAZY_MODULES = ('nba_api', 'nba_data', 'live_stats', 'lxml', 'html_tables', 'fetch_engine',
+                'history_store', 'player_search', 'components')
+
+# 起動時の処理（インポートとデータの読み込み）
+STARTUP_CODE = """
+import time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from nba_data_static import NBADataManager
+NBADataManager()
+print(f"STARTUP {(imported - start) * 1000:.3f} {(time.perf_counter() - imported) * 1000:.3f}")
+"""
+
+
+def parse_importtime(stderr):
+    """-X importtimeの出力を{モジュール名: (自身の時間us, 累積時間us, 階層)}に変換"""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        # モジュール名の前の空白（先頭の1文字を除く）2文字ごとに1階層
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        modules[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return modules
+
+
+def run_once():
+    """新しいプロセスで起動処理を実行し、(インポート時間ms, 読み込み時間ms, モジュール情報)を返す"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    line = next(line for line in result.stdout.splitlines() if line.startswith('STARTUP'))
+    _, import_ms, load_ms = line.split()
+    return float(import_ms), float(load_ms), parse_importtime(result.stderr)
+
+
+def package_totals(modules):
+    """各モジュール自身のインポート時間をトップレベルのパッケージ単位で集計（ms）"""
+    totals = {}
+    for name, (self_us, _, _) in modules.items():
+        package = name.split('.')[0]
+        totals[package] = totals.get(package, 0) + self_us / 1000
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=0, help="インポート時間の上限（0: 確認しない）")
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.repeat)]
+    import_ms = statistics.median(run[0] for run in runs)
+    load_ms = statistics.median(run[1] for run in runs)
+    modules = runs[-1][2]
+
+    print(f"import_ms(median)={import_ms:.1f} load_ms(median)={load_ms:.1f} modules={len(modules)}")
+    print(f"{'package':<24} {'self_ms':>10}")
+    totals = sorted(package_totals(modules).items(), key=lambda item: -item[1])
+    for package, total in totals[:args.top]:
+        print(f"{package:<24} {total:>10.1f}")
+
+    failures = []
+    loaded = sorted({name for name in modules if name.split('.')[0] in LAZY_MODULES})
+    if loaded:
+        failures.append(f"起動時に読み込まれたモジュール: {', '.join(loaded)}")
+    if args.budget_ms and import_ms > args.budget_ms:
+        failures.append(f"インポート時間が上限を超えました: {import_ms:.1f}ms > {args.budget_ms:.1f}ms")
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+    print("✓ 起動時に不要なモジュールは読み込まれていません")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,213 @@
+"""
+静的エクスポート（static_export.py）の書き出し時間・サイズと、配信のリクエスト数/秒を確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_static_export.py [--scales 1 10] [--clients 8] [--seconds 3]
+
+合成データを書き出し、同じHTTPサーバーの実装で次の2つを比較する。
+- static: 書き出したHTMLをそのまま返す（static_export.make_server）
+- live: リクエストごとにデータマネージャーから表を並び替え・整形してHTMLを作成する（閲覧者ごとに計算する経路）
+あわせて、書き出したHTMLがliveで作成した表と一致すること、If-None-Matchに304を返すこと、
+データの更新後に新しい版を返すことを確認し、問題があれば終了コード1を返す。
+"""
+import argparse
+import http.client
+import http.server
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from synthetic import write_dataset
+from nba_data_static import NBADataManager
+import static_export
+from table_format import PLAYER_COLUMN_LABELS, TEAM_COLUMN_LABELS, DisplayTable, numbered
+
+
+def request_paths(manager):
+    """閲覧者が開くページ（チームレーティングの全並び順、全チームの選手、全選手のランキング）"""
+    paths = []
+    for name in ('TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING'):
+        for order in ('desc', 'asc'):
+            paths.append(f"team_ratings/{name}-{order}.html")
+    for team in manager._teams:
+        paths.append(f"teams/{manager.get_team_id(team['full_name'])}/{static_export.DEFAULT_SORT}")
+    for name in ('NET_RATING', 'OFF_RATING', 'WS_PCTL'):
+        paths.append(f"players/{name}-desc.html")
+    return paths
+
+
+def make_table(manager, kind, key=None):
+    """ページの表（DisplayTable）と表示用の列名の辞書（画面と同じ処理）"""
+    if kind == 'team_ratings':
+        return DisplayTable(manager.get_team_ratings(), TEAM_COLUMN_LABELS), TEAM_COLUMN_LABELS
+    if kind == 'teams':
+        team = manager.team_index.team(key)
+        df = manager.get_player_ratings(team_name=team['full_name'], min_games=static_export.MIN_GAMES)
+    else:
+        df = manager.get_player_ratings(min_games=static_export.MIN_GAMES)
+    return DisplayTable(df, PLAYER_COLUMN_LABELS), PLAYER_COLUMN_LABELS
+
+
+def make_live_server(manager):
+    """リクエストごとに表を作成して返すHTTPサーバー（画面と同じく、DisplayTableはデータのバージョンごとに作成）"""
+    tables = {}
+
+    def table_for(kind, key):
+        if (kind, key) not in tables:
+            tables[kind, key] = make_table(manager, kind, key)
+        return tables[kind, key]
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # keep-aliveの接続でヘッダーと本文を別々に送った際の遅延（Nagleアルゴリズム）を避ける
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parts = self.path.strip('/').split('/')[1:]
+            kind, key = parts[0], parts[1] if len(parts) == 3 else None
+            name, order = parts[-1][:-len('.html')].rsplit('-', 1)
+            table, labels = table_for(kind, key)
+            body = live_table_html(table, labels.get(name, name), order).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+
+
+def live_table_html(table, label, order):
+    return numbered(table.rows(table.order(label, ascending=order == 'asc'))).to_html(border=0, escape=True)
+
+
+def load_test(port, season, paths, clients, seconds, seed=0):
+    """複数の接続（keep-alive）からページを繰り返し要求し、リクエスト数/秒を返す"""
+    counts = [0] * clients
+    errors = []
+    deadline = time.perf_counter() + seconds
+
+    def client(i):
+        rng = random.Random(seed + i)
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            while time.perf_counter() < deadline:
+                connection.request('GET', f"/{season}/{rng.choice(paths)}")
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    errors.append(response.status)
+                    return
+                counts[i] += 1
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, errors
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+def get(port, path, headers=None):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response.status, response.getheader('ETag'), body
+
+
+def check_serving(data_dir, output_dir, manager, port):
+    """書き出した内容の一致・304・データ更新後の版の切り替えを確認（問題点のリストを返す）"""
+    failures = []
+    season = manager.season
+    for path in request_paths(manager)[:3] + request_paths(manager)[-1:]:
+        _, _, body = get(port, f"/{season}/{path}")
+        kind, *rest = path.split('/')
+        name, order = rest[-1][:-len('.html')].rsplit('-', 1)
+        table, labels = make_table(manager, kind, rest[0] if len(rest) == 2 else None)
+        if live_table_html(table, labels.get(name, name), order) not in body.decode():
+            failures.append(f"{path}: 書き出した表が画面の表と一致しません")
+
+    status, etag, _ = get(port, f"/{season}/index.html")
+    status_304, _, _ = get(port, f"/{season}/index.html", {'If-None-Match': etag})
+    if status != 200 or status_304 != 304:
+        failures.append(f"If-None-Matchへの応答が304ではありません（{status}, {status_304}）")
+
+    # データを更新して書き出し直すと、確認間隔の後に新しい版を返す
+    time.sleep(0.01)
+    write_dataset(data_dir, 2, with_snapshot=False)
+    static_export.build_export(NBADataManager(data_dir=data_dir, source='csv'), output_dir)
+    time.sleep(static_export.SERVE_CHECK_INTERVAL + 0.1)
+    _, new_etag, _ = get(port, f"/{season}/index.html")
+    if new_etag == etag:
+        failures.append("データの更新後も更新前の版を返しました")
+    else:
+        print(f"✓ データの更新後は新しい版を返しました（{etag} → {new_etag}）")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10])
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=3)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scale':>5} {'build_s':>8} {'files':>6} {'size_kb':>8} {'static_rps':>11} {'live_rps':>9} {'speedup':>8}")
+    for i, scale in enumerate(args.scales):
+        with tempfile.TemporaryDirectory() as root:
+            data_dir = os.path.join(root, 'data')
+            output_dir = os.path.join(root, 'export')
+            write_dataset(data_dir, scale, with_snapshot=False)
+            manager = NBADataManager(data_dir=data_dir, source='csv')
+
+            start = time.perf_counter()
+            path = static_export.build_export(manager, output_dir)
+            build_seconds = time.perf_counter() - start
+            files = [os.path.join(directory, name) for directory, _, names in os.walk(path) for name in names]
+            size_kb = sum(os.path.getsize(file) for file in files) / 1024
+
+            paths = request_paths(manager)
+            static_server = static_export.make_server(output_dir, port=0)
+            live_server = make_live_server(manager)
+            static_port, live_port = serve(static_server), serve(live_server)
+            static_rps, static_errors = load_test(static_port, manager.season, paths, args.clients, args.seconds)
+            live_rps, live_errors = load_test(live_port, manager.season, paths, args.clients, args.seconds)
+            print(f"{scale:>4}x {build_seconds:>8.2f} {len(files):>6} {size_kb:>8.0f} {static_rps:>11.0f} "
+                  f"{live_rps:>9.0f} {static_rps / live_rps:>7.1f}x")
+            if static_errors or live_errors:
+                failures.append(f"x{scale}: エラー応答がありました（static {static_errors[:3]}, live {live_errors[:3]}）")
+            if static_rps <= live_rps:
+                failures.append(f"x{scale}: 静的配信のリクエスト数/秒がliveを上回りませんでした")
+            if i == 0:
+                print()
+                failures += check_serving(data_dir, output_dir, manager, static_port)
+                print()
+            static_server.shutdown()
+            live_server.shutdown()
+
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
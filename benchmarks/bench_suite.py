@@ -0,0 +1,249 @@
+"""
+データマネージャーと各ページの処理時間をまとめて計測するベンチマークスイート
+
+使い方:
+    python benchmarks/bench_suite.py [--scales 1 10 100] [--number 20] [--output results.json]
+                                     [--compare baseline.json --threshold 1.5] [--skip-apptest]
+
+1x/10x/100xの合成データで、読み込み・絞り込み・検索・並び替え・表示用の整形の時間を計測し、
+AppTestで各ページをヘッドレスに実行して再実行（rerun）全体の時間を計測する。
+結果はJSONで出力でき、--compareで以前の結果と比較して、中央値が閾値倍を超えて遅くなった項目があれば終了コード1を返す。
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from synthetic import REPO_ROOT, SCALES, write_dataset
+from seasons import DEFAULT_SEASON, season_dir
+
+# AppTestで実行するページと、各ページで行う操作
+PAGES = ["チームレーティング", "チーム別選手", "選手検索", "全選手レーティング"]
+SEARCH_QUERY = "james, curry"
+TEAM_NAME = "Boston Celtics"
+APPTEST_TIMEOUT = 120
+
+# AppTestは別プロセスで実行する（データディレクトリは起動時の環境変数で決まるため）
+APPTEST_CODE = """
+import json, statistics, sys, time
+from streamlit.testing.v1 import AppTest, local_script_runner
+
+# AppTestは0.1秒間隔で実行完了を確認するため、そのままでは時間が0.1秒単位になる。
+# 計測用に確認間隔を1msにした待機処理に置き換える
+def require_widgets_deltas(runner, timeout=3):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if runner.script_stopped():
+            return
+        time.sleep(0.001)
+    runner.request_stop()
+    raise RuntimeError(f"AppTest script run timed out after {timeout}s")
+
+local_script_runner.require_widgets_deltas = require_widgets_deltas
+
+number = int(sys.argv[1])
+results = []
+
+def timed(name, action, repeat=1):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        timings.append(time.perf_counter() - start)
+        assert not at.exception, (name, [e.value for e in at.exception])
+    results.append((name, timings))
+
+at = AppTest.from_file("main.py", default_timeout=%(timeout)d)
+timed("apptest.cold_start", at.run)
+page_select = next(s for s in at.selectbox if s.label == "ページを選択")
+for page in %(pages)r:
+    timed(f"apptest.{page}.open", lambda: page_select.set_value(page).run())
+    timed(f"apptest.{page}.rerun", at.run, number)
+    if page == "選手検索":
+        timed(f"apptest.{page}.search", lambda: at.text_input(key="player_search_query").set_value(%(query)r).run())
+    if page == "全選手レーティング":
+        timed(f"apptest.{page}.sort", lambda: at.button(key="all_players_asc").click().run(), number)
+    page_select = next(s for s in at.selectbox if s.label == "ページを選択")
+print("APPTEST " + json.dumps(results))
+""" % {'timeout': APPTEST_TIMEOUT, 'pages': PAGES, 'query': SEARCH_QUERY}
+
+
+def summarize(name, scale, timings, rows=None):
+    """計測結果（秒のリスト）を1項目分の結果に変換"""
+    result = {
+        'name': name,
+        'scale': scale,
+        'median_ms': statistics.median(timings) * 1000,
+        'min_ms': min(timings) * 1000,
+        'max_ms': max(timings) * 1000,
+        'repeat': len(timings),
+    }
+    if rows is not None:
+        result['rows'] = rows
+    return result
+
+
+def measure(func, number):
+    """funcをnumber回実行し、(各回の時間のリスト, 最後の戻り値)を返す"""
+    timings = []
+    value = None
+    for _ in range(number):
+        start = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - start)
+    return timings, value
+
+
+def prepare_data_dir(root, scale):
+    """合成データをアプリと同じ構成（data/seasons/<シーズン>/、data/teams.csv）で書き出す"""
+    data_dir = os.path.join(root, f"x{scale}")
+    write_dataset(season_dir(data_dir, DEFAULT_SEASON), scale)
+    shutil.copy(os.path.join(REPO_ROOT, 'data', 'teams.csv'), data_dir)
+    return data_dir
+
+
+def bench_manager(data_dir, scale, number):
+    """データマネージャー・表示用テーブルの各処理を計測"""
+    from nba_data_static import NBADataManager
+    from table_format import PLAYER_COLUMN_LABELS, DisplayTable, format_columns
+
+    path = season_dir(data_dir, DEFAULT_SEASON)
+    results = []
+
+    def add(name, func, repeat=number):
+        timings, value = measure(func, repeat)
+        results.append(summarize(name, scale, timings, len(value) if hasattr(value, '__len__') else None))
+        return value
+
+    # 読み込み（データの読み込み・移籍選手の分類・派生指標・チーム別インデックス）
+    manager = add('load', lambda: NBADataManager(season=DEFAULT_SEASON, data_dir=path, raise_errors=True),
+                  max(3, number // 4))
+
+    # 絞り込み
+    players = add('filter.min_games', lambda: manager.get_player_ratings(min_games=20))
+    add('filter.team', lambda: manager.get_player_ratings(team_name=TEAM_NAME))
+    add('aggregate.teams', manager.get_team_aggregates)
+
+    # 検索（初回はインデックスの構築を含む）
+    add('search.index_build', manager._build_search_index, max(3, number // 4))
+    for mode in ('substring', 'prefix', 'fuzzy'):
+        add(f'search.{mode}', lambda: manager.search_players(['james', 'curry'], mode=mode))
+
+    # 表示用の整形と並び替え
+    renamed = players.rename(columns=PLAYER_COLUMN_LABELS)
+    add('format.columns', lambda: format_columns(renamed))
+    table = add('format.display_table', lambda: DisplayTable(players, PLAYER_COLUMN_LABELS), max(3, number // 4))
+    add('sort.precomputed', lambda: table.rows(table.order('WS', ascending=False)[:50]))
+    add('sort.sort_values', lambda: renamed.sort_values('WS', ascending=False).head(50))
+    return results
+
+
+def bench_apptest(data_dir, scale, number):
+    """AppTestで各ページを実行し、ページを開く・再実行・操作ごとの時間を計測"""
+    env = dict(os.environ, NBA_DATA_DIR=data_dir, NBA_DATA_SOURCE='snapshot')
+    completed = subprocess.run(
+        [sys.executable, '-c', APPTEST_CODE, str(number)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    line = next((line for line in completed.stdout.splitlines() if line.startswith('APPTEST ')), None)
+    if completed.returncode != 0 or line is None:
+        raise RuntimeError(f"AppTestの実行に失敗しました:\n{completed.stderr[-2000:]}")
+    return [summarize(name, scale, timings) for name, timings in json.loads(line[len('APPTEST '):])]
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    """比較時に確認するための実行環境"""
+    import numpy
+    import pandas
+    import streamlit
+    return {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pandas.__version__,
+        'numpy': numpy.__version__,
+        'streamlit': streamlit.__version__,
+    }
+
+
+def compare(results, baseline_path, threshold, min_delta_ms):
+    """以前の結果と中央値を比較し、閾値倍を超えて遅くなった項目のリストを返す
+
+    キャッシュ済みの処理など、ごく短い時間の揺らぎで失敗しないよう、差がmin_delta_ms未満の項目は除く。
+    """
+    with open(baseline_path) as f:
+        baseline = {(r['scale'], r['name']): r for r in json.load(f)['results']}
+    regressions = []
+    print(f"\n{'scale':>5} {'name':<36} {'base_ms':>10} {'now_ms':>10} {'ratio':>7}")
+    for result in results:
+        base = baseline.get((result['scale'], result['name']))
+        if base is None or base['median_ms'] <= 0:
+            continue
+        ratio = result['median_ms'] / base['median_ms']
+        regressed = ratio > threshold and result['median_ms'] - base['median_ms'] >= min_delta_ms
+        mark = ' ✗' if regressed else ''
+        print(f"{result['scale']:>5} {result['name']:<36} {base['median_ms']:>10.3f} "
+              f"{result['median_ms']:>10.3f} {ratio:>7.2f}{mark}")
+        if regressed:
+            regressions.append((result, base, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--number', type=int, default=20)
+    parser.add_argument('--output', help="結果を書き出すJSONファイル（-: 標準出力）")
+    parser.add_argument('--compare', help="比較する以前の結果（JSON）")
+    parser.add_argument('--threshold', type=float, default=1.5, help="遅くなったとみなす中央値の比")
+    parser.add_argument('--min-delta-ms', type=float, default=0.5, help="遅くなったとみなす中央値の差の下限")
+    parser.add_argument('--skip-apptest', action='store_true', help="AppTestによるページの計測を省略")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as root:
+        for scale in args.scales:
+            data_dir = prepare_data_dir(root, scale)
+            scale_results = bench_manager(data_dir, scale, args.number)
+            if not args.skip_apptest:
+                scale_results += bench_apptest(data_dir, scale, max(3, args.number // 4))
+            log = sys.stderr if args.output == '-' else sys.stdout
+            print(f"x{scale}", file=log)
+            for result in scale_results:
+                print(f"  {result['name']:<36} {result['median_ms']:>10.3f}ms", file=log)
+            results += scale_results
+
+    report = {'environment': environment(), 'number': args.number, 'results': results}
+    if args.output == '-':
+        json.dump(report, sys.stdout, ensure_ascii=False, indent=2)
+    elif args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 結果を{args.output}に保存しました")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold, args.min_delta_ms)
+        for result, base, ratio in regressions:
+            print(f"✗ x{result['scale']} {result['name']}: {base['median_ms']:.3f}ms → "
+                  f"{result['median_ms']:.3f}ms（{ratio:.2f}倍）")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+チーム別選手取得（get_player_ratings(team_name=...)）の旧実装と新実装を比較するマイクロベンチマーク
+
+使い方:
+    python benchmarks/bench_team_lookup.py [--scales 1 10 100] [--number 200]
+
+あわせて、チームの各表記（Basketball Referenceの略称、「*」付きのチーム名など）が辞書の参照でチームのキーに
+対応付けられ、全チームの選手データが取得できることを確認する（取得できないチームがあれば終了コード1を返す）。
+"""
+import argparse
+import sys
+import tempfile
+import timeit
+
+import pandas as pd
+
+from synthetic import SCALES, write_dataset
+from nba_data_static import NBADataManager
+from team_metadata import BREF_ABBREVIATIONS
+
+
+def legacy_get_team_players(manager, team_name, min_games):
+    """インデックス導入前の実装（全体コピー + 線形探索 + 全行マスク）"""
+    df = manager.player_stints_cache.copy()
+    if 'GP' in df.columns:
+        df = df[df['GP'] >= min_games]
+    team = next((team for team in manager._teams if team['full_name'] == team_name), None)
+    if not team:
+        return pd.DataFrame()
+    df = df[df['TEAM_ID'] == team['abbreviation']]
+    cols = ['PLAYER_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']
+    return df[[c for c in cols if c in df.columns]]
+
+
+def check_team_keys(manager, number):
+    """全チームの表記の対応と選手データの取得を確認（問題点のリストを返す）"""
+    failures = []
+    bref_codes = {key: code for code, key in BREF_ABBREVIATIONS.items()}
+    team_names = set(manager.team_ratings_cache.get('TEAM_NAME', []))
+    for team in manager._teams:
+        key = team['abbreviation']
+        aliases = [team['full_name'], f"{team['full_name']}*", key, bref_codes.get(key, key), team['id']]
+        missed = [alias for alias in aliases if manager.get_team_id(alias) != key]
+        if missed:
+            failures.append(f"{team['full_name']}: キーに対応しない表記 {missed}")
+        if manager.get_player_ratings(team_name=team['full_name'], min_games=0).empty:
+            failures.append(f"{team['full_name']}: 選手データが空です")
+    # チームのレーティングのチーム名（「*」付き）もすべてチームに対応する
+    unmatched = [name for name in team_names if manager.get_team_id(name) is None]
+    if unmatched:
+        failures.append(f"チームに対応しないチーム名: {unmatched}")
+
+    names = [f"{team['full_name']}*" for team in manager._teams]
+    linear = min(timeit.repeat(
+        lambda: [next((t for t in manager._teams if t['full_name'] == name.rstrip('*')), None) for name in names],
+        number=number, repeat=3)) / number / len(names)
+    indexed = min(timeit.repeat(lambda: [manager.get_team_id(name) for name in names],
+                                number=number, repeat=3)) / number / len(names)
+    print(f"チーム名からキーへの変換: 線形探索 {linear * 1e6:.2f}us / 辞書 {indexed * 1e6:.2f}us")
+    if not failures:
+        print(f"✓ 全{len(manager._teams)}チームの表記がキーに対応し、選手データを取得できました")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=list(SCALES))
+    parser.add_argument('--number', type=int, default=200)
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'scale':>6} {'rows':>8} {'legacy_us':>10} {'indexed_us':>11} {'speedup':>8}")
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir:
+            write_dataset(data_dir, scale, with_snapshot=False)
+            manager = NBADataManager(use_static_data=True, data_dir=data_dir)
+        # 最後のチームは線形探索で最も遠い位置にある
+        team_name = manager._teams[-1]['full_name']
+        expected = legacy_get_team_players(manager, team_name, 20)
+        actual = manager.get_player_ratings(team_name=team_name, min_games=20)
+        # 新実装は派生指標の列も返すため、旧実装の列で比較する
+        assert expected.equals(actual[expected.columns]), "旧実装と新実装の結果が一致しません"
+
+        legacy = min(timeit.repeat(lambda: legacy_get_team_players(manager, team_name, 20),
+                                   number=args.number, repeat=3)) / args.number
+        indexed = min(timeit.repeat(lambda: manager.get_player_ratings(team_name=team_name, min_games=20),
+                                    number=args.number, repeat=3)) / args.number
+        print(f"{scale:>5}x {len(manager.player_stints_cache):>8} "
+              f"{legacy * 1e6:>10.1f} {indexed * 1e6:>11.1f} {legacy / indexed:>7.1f}x")
+
+    print()
+    failures += check_team_keys(NBADataManager(use_static_data=True), args.number)
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
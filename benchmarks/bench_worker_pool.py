@@ -0,0 +1,253 @@
+"""
+複数ワーカーの起動モード（shared_dataset.py・worker_pool.py）のメモリ・読み込み時間・スループットを確認するベンチマーク
+
+使い方:
+    python benchmarks/bench_worker_pool.py [--scales 10 100] [--workers 4] [--seconds 2]
+
+合成データを共有ディレクトリに公開し、同時に起動した--workers個のワーカープロセスで次の2つを比較する。
+- private: 各ワーカーがデータを読み込んで処理する（スナップショットのメモリマップ＋派生指標の計算、従来の実装）
+- shared: 各ワーカーは公開された処理済みの表をメモリマップで参照する（NBA_DATA_SOURCE=shared）
+データのメモリはワーカーのPSS（共有しているページはプロセス数で按分）のうち、読み込み後に増えた匿名メモリと
+データファイルをマップした領域の合計。あわせて、ワーカー数に対するリクエスト数/秒、データ更新時に
+解析・派生指標の計算をせずに新しい版に切り替わること、ロードバランサーの振り分けを確認し、
+問題があれば終了コード1を返す。
+"""
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+from synthetic import REPO_ROOT, write_dataset
+
+
+def data_pss_kb(data_dirs):
+    """PSSのうち匿名メモリ（プロセス全体）と、data_dirs内のファイルをマップした領域（KB）"""
+    anon = mapped = 0
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Pss_Anon:'):
+                anon = int(line.split()[1])
+    path = None
+    with open('/proc/self/smaps') as f:
+        for line in f:
+            fields = line.split()
+            if not fields[0].endswith(':'):
+                # マッピングの見出し行（アドレス 権限 オフセット デバイス inode パス）
+                path = fields[5] if len(fields) > 5 else None
+            elif fields[0] == 'Pss:' and path and path.startswith(tuple(data_dirs)):
+                mapped += int(fields[1])
+    return anon, mapped
+
+
+def _child(mode, data_dir, shared_dir, seconds):
+    """サブプロセス側: 読み込み後に親の合図を待ち、PSSを計測してからリクエストを処理し、結果をJSONで出力"""
+    import random
+
+    os.environ['NBA_SHARED_DIR'] = shared_dir
+    # ライブラリの読み込みはどちらの実装でも同じため、計測の前に済ませる
+    import pyarrow  # noqa: F401
+    from nba_data_static import NBADataManager
+    from table_format import PLAYER_COLUMN_LABELS, DisplayTable, numbered
+
+    anon_start, _ = data_pss_kb([data_dir, shared_dir])
+    start = time.perf_counter()
+    manager = NBADataManager(data_dir=data_dir, source='snapshot' if mode == 'private' else 'shared',
+                             raise_errors=True)
+    load_seconds = time.perf_counter() - start
+    print(json.dumps({'ready': True}), flush=True)
+    sys.stdin.readline()
+    # 全ワーカーが読み込んだ状態で計測する（共有しているページはワーカー数で按分される）
+    anon, mapped = data_pss_kb([data_dir, shared_dir])
+
+    # チーム別選手のページを並び替えて表示用の文字列にする（閲覧者ごとの再実行と同じ処理）
+    rng = random.Random(os.getpid())
+    teams = [team['full_name'] for team in manager._teams]
+    requests = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        table = DisplayTable(manager.get_player_ratings(team_name=rng.choice(teams)), PLAYER_COLUMN_LABELS)
+        label = rng.choice(list(table.values.columns))
+        numbered(table.rows(table.order(label, ascending=False))).to_html()
+        requests += 1
+
+    print(json.dumps({
+        'load_s': load_seconds,
+        'requests': requests,
+        'data_kb': anon - anon_start + mapped,
+        'mapped_kb': mapped,
+    }), flush=True)
+
+
+def run_workers(mode, data_dir, shared_dir, workers, seconds):
+    """ワーカーを同時に起動し、全ワーカーの読み込み後にPSSの計測・リクエストの処理を同時に始めさせる"""
+    processes = [subprocess.Popen([sys.executable, __file__, '--seconds', str(seconds),
+                                   '--child', mode, data_dir, shared_dir],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, cwd=REPO_ROOT)
+                 for _ in range(workers)]
+
+    for process in processes:
+        if not process.stdout.readline():
+            raise RuntimeError(f"ワーカーが異常終了しました（{mode}）")
+    start = time.perf_counter()
+    for process in processes:
+        process.stdin.write('\n')
+        process.stdin.flush()
+    outputs = [json.loads(process.stdout.readline()) for process in processes]
+    elapsed = time.perf_counter() - start
+    for process in processes:
+        process.wait()
+    return {
+        'load_s': max(output['load_s'] for output in outputs),
+        'data_kb': sum(output['data_kb'] for output in outputs),
+        'mapped_kb': sum(output['mapped_kb'] for output in outputs),
+        'rps': sum(output['requests'] for output in outputs) / elapsed,
+    }
+
+
+def check_propagation(data_dir, shared_dir):
+    """データの更新後、ワーカーが解析・派生指標の計算をせずに新しい版に切り替わることを確認（問題点のリストを返す）"""
+    import nba_data_static
+    import shared_dataset
+    from nba_data_static import NBADataManager, SharedDataManager
+
+    failures = []
+    shared = SharedDataManager(data_dir=data_dir, interval=3600, source='shared')
+    shared.stop()
+    before = shared.get()
+
+    time.sleep(0.01)
+    write_dataset(data_dir, 2, with_snapshot=True)
+    start = time.perf_counter()
+    shared_dataset.publish(NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True), shared_dir)
+    publish_seconds = time.perf_counter() - start
+
+    def fail(*args, **kwargs):
+        raise AssertionError("ワーカーで派生指標を計算しました")
+
+    original = nba_data_static.add_player_metrics
+    nba_data_static.add_player_metrics = fail
+    try:
+        start = time.perf_counter()
+        reloaded = shared.reload_if_changed()
+        attach_seconds = time.perf_counter() - start
+    finally:
+        nba_data_static.add_player_metrics = original
+    after = shared.get()
+    if not reloaded or after is before:
+        failures.append("公開した新しい版に切り替わりませんでした")
+    elif len(after.player_ratings_cache) == len(before.player_ratings_cache):
+        failures.append("切り替え後も更新前のデータを参照しています")
+    else:
+        print(f"✓ 新しい版に切り替え（{len(before.player_ratings_cache)} → {len(after.player_ratings_cache)}行、"
+              f"ローダーの公開 {publish_seconds * 1000:.0f}ms、ワーカーの切り替え {attach_seconds * 1000:.0f}ms）")
+    return failures
+
+
+def check_balancer():
+    """ロードバランサーが接続を順に振り分け、停止したワーカーを飛ばすことを確認（問題点のリストを返す）"""
+    from worker_pool import LoadBalancer, start_in_thread
+
+    def backend(name):
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = name.encode()
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    failures = []
+    backends = [backend('a'), backend('b')]
+    balancer = LoadBalancer([server.server_address for server in backends])
+    port, stop = start_in_thread(balancer)
+
+    def fetch(count):
+        return [urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read().decode() for _ in range(count)]
+
+    served = fetch(20)
+    if sorted(set(served)) != ['a', 'b'] or abs(served.count('a') - served.count('b')) > 2:
+        failures.append(f"接続が均等に振り分けられませんでした（a {served.count('a')}、b {served.count('b')}）")
+    backends[0].shutdown()
+    backends[0].server_close()
+    served = fetch(10)
+    if served != ['b'] * 10:
+        failures.append(f"停止したワーカーに振り分けました: {served}")
+    else:
+        print(f"✓ ロードバランサー: 2ワーカーに振り分け、停止したワーカーを除外（{balancer.stats()['connections']}）")
+    stop()
+    backends[1].shutdown()
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--scales', type=int, nargs='+', default=[10, 100])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=2)
+    parser.add_argument('--child', nargs=3, metavar=('MODE', 'DATA_DIR', 'SHARED_DIR'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(*args.child, args.seconds)
+        return
+
+    import shared_dataset
+    from nba_data_static import NBADataManager
+
+    failures = []
+    cpus = os.cpu_count() or 1
+    print(f"ワーカー {args.workers}個、CPU {cpus}個")
+    print(f"{'scale':>5} {'mode':<8} {'load_ms':>8} {'data_kb':>9} {'mapped_kb':>10} {'rps':>7} {'rps_1':>7} {'scaling':>8}")
+    shm = '/dev/shm' if os.path.isdir('/dev/shm') else None
+    for scale in args.scales:
+        with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory(dir=shm) as shared_dir:
+            write_dataset(data_dir, scale, with_snapshot=True)
+            shared_dataset.publish(NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True),
+                                   shared_dir)
+            results = {}
+            for mode in ('private', 'shared'):
+                single = run_workers(mode, data_dir, shared_dir, 1, args.seconds)
+                result = results[mode] = run_workers(mode, data_dir, shared_dir, args.workers, args.seconds)
+                print(f"{scale:>4}x {mode:<8} {result['load_s'] * 1000:>8.0f} {result['data_kb']:>9.0f} "
+                      f"{result['mapped_kb']:>10.0f} {result['rps']:>7.0f} {single['rps']:>7.0f} "
+                      f"{result['rps'] / single['rps']:>7.2f}x")
+                # CPUがワーカー数以上ある場合のみ、ワーカー数にほぼ比例してスループットが増えることを確認
+                if mode == 'shared' and cpus >= args.workers and result['rps'] < 0.7 * args.workers * single['rps']:
+                    failures.append(f"x{scale}: スループットがワーカー数に比例して増えませんでした")
+            if results['shared']['data_kb'] >= results['private']['data_kb']:
+                failures.append(f"x{scale}: 共有したデータのメモリが各ワーカーでの読み込みから減っていません")
+            if results['shared']['load_s'] >= results['private']['load_s']:
+                failures.append(f"x{scale}: 共有したデータの参照が各ワーカーでの読み込みより遅くなりました")
+    if cpus < args.workers:
+        print(f"（CPUが{cpus}個のため、スループットのスケールは確認しません）")
+    print()
+
+    with tempfile.TemporaryDirectory() as data_dir, tempfile.TemporaryDirectory(dir=shm) as shared_dir:
+        os.environ['NBA_SHARED_DIR'] = shared_dir
+        shared_dataset.SHARED_DIR = shared_dir
+        write_dataset(data_dir, 1, with_snapshot=True)
+        shared_dataset.publish(NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True), shared_dir)
+        failures += check_propagation(data_dir, shared_dir)
+    failures += check_balancer()
+
+    for message in failures:
+        print(f"✗ {message}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+ベンチマーク用の偽stats.nba.comエンドポイント
+合成データからresultSets形式のJSONを返す（遅延・エラー・データの版を設定可能）
+"""
+import http.server
+import json
+import threading
+import time
+
+from synthetic import make_player_ratings, make_team_ratings
+
+
+def team_fixture(scale=1, version=0):
+    """leaguedashteamstats（Advanced）相当の列と行"""
+    df = make_team_ratings(scale).head(30 * scale)
+    headers = ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'VERSION']
+    rows = [[name, off, dfn, net, version] for name, off, dfn, net in
+            df[['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']].itertuples(index=False)]
+    return headers, rows
+
+
+def player_fixture(scale=1, version=0):
+    """leaguedashplayerstats（Advanced）相当の列と行（移籍選手の合計行はない）"""
+    df = make_player_ratings(scale).dropna(subset=['GP'])
+    df = df[~df['TEAM_ID'].str.fullmatch(r'\d+TM')]
+    headers = ['PLAYER_ID', 'PLAYER_NAME', 'TEAM_ID', 'TEAM_ABBREVIATION',
+               'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', 'VERSION']
+    rows = [[i, name, 1610612700 + i % 30, team, off, dfn, net, int(gp), version]
+            for i, (name, team, off, dfn, net, gp) in enumerate(
+                df[['PLAYER_NAME', 'TEAM_ID', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']]
+                .itertuples(index=False))]
+    return headers, rows
+
+
+class FakeStatsServer:
+    """resultSets形式のJSONを返す偽エンドポイント（遅延・エラーを設定可能）
+
+    パスにleaguedashplayerstatsを含むリクエストには選手、それ以外にはチームのデータを返す。
+    """
+
+    def __init__(self, scale=1):
+        self.delay = 0.0
+        self.fail_next = 0
+        self.requests = 0
+        self.version = 0
+        self._lock = threading.Lock()
+        self._fixtures = {
+            'leaguedashteamstats': team_fixture(scale),
+            'leaguedashplayerstats': player_fixture(scale),
+        }
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests += 1
+                    fail = server.fail_next > 0
+                    if fail:
+                        server.fail_next -= 1
+                    version = server.version
+                time.sleep(server.delay)
+                if fail:
+                    self.send_response(500)
+                    self.end_headers()
+                    return
+                endpoint = 'leaguedashplayerstats' if 'leaguedashplayerstats' in self.path else 'leaguedashteamstats'
+                headers, rows = server._fixtures[endpoint]
+                body = json.dumps({'resultSets': [{
+                    'name': endpoint,
+                    'headers': headers,
+                    'rowSet': [row[:-1] + [version] for row in rows],
+                }]}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}/stats"
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
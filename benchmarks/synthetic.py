@@ -0,0 +1,128 @@
+"""
+ベンチマーク用の合成データセットを生成する
+現在のdata/のCSVを指定倍率で複製し、選手名・チーム名に連番を付けて値を少しずつ揺らす
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import snapshot  # noqa: E402
+from seasons import DEFAULT_SEASON, season_dir  # noqa: E402
+
+SOURCE_DIR = season_dir(os.path.join(REPO_ROOT, 'data'), DEFAULT_SEASON)
+SCALES = (1, 10, 100)
+
+
+def _replicate(df, scale, name_col, seed):
+    """DataFrameをscale倍に複製（2つ目以降は名前に連番を付け、数値を揺らす）"""
+    rng = np.random.default_rng(seed)
+    copies = []
+    for i in range(scale):
+        copy = df.copy()
+        if i > 0:
+            copy[name_col] = copy[name_col] + f" #{i}"
+            for col in snapshot.RATING_COLUMNS:
+                if col in copy.columns:
+                    copy[col] = (copy[col] + rng.normal(0, 0.5, len(copy))).round(1)
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+def make_team_ratings(scale=1, seed=0):
+    """合成チームデータを生成"""
+    df = pd.read_csv(os.path.join(SOURCE_DIR, 'team_ratings.csv'))
+    return _replicate(df, scale, 'TEAM_NAME', seed)
+
+
+def make_player_ratings(scale=1, seed=0):
+    """合成選手データを生成"""
+    df = pd.read_csv(os.path.join(SOURCE_DIR, 'player_ratings.csv'))
+    return _replicate(df, scale, 'PLAYER_NAME', seed)
+
+
+def write_dataset(data_dir, scale=1, with_snapshot=True, seed=0):
+    """合成データをNBADataManagerが読み込める形式でdata_dirに書き出す"""
+    os.makedirs(data_dir, exist_ok=True)
+    team_df = make_team_ratings(scale, seed)
+    player_df = make_player_ratings(scale, seed)
+    team_df.to_csv(os.path.join(data_dir, 'team_ratings.csv'), index=False)
+    player_df.to_csv(os.path.join(data_dir, 'player_ratings.csv'), index=False)
+    if with_snapshot:
+        snapshot.write_snapshot(team_df, os.path.join(data_dir, snapshot.TEAM_SNAPSHOT))
+        snapshot.write_snapshot(player_df, os.path.join(data_dir, snapshot.PLAYER_SNAPSHOT))
+    with open(os.path.join(data_dir, 'last_updated.txt'), 'w') as f:
+        f.write(f"synthetic x{scale}")
+    return team_df, player_df
+
+
+def current_rss_mb():
+    """現在のプロセスのRSS（MB）"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    # /procがない環境ではピークRSSで代用
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _table_html(df, table_id, over_header=None):
+    """Basketball Reference風のテーブルHTML（行頭のRk列はth、20行ごとに見出し行を繰り返す）"""
+    columns = ['Rk'] + list(df.columns)
+    header = ''.join(f'<th data-stat="{c.lower()}">{c}</th>' for c in columns)
+    # 見出しの上段は、末尾4列だけにグループ名を付ける（それ以外は空欄）
+    head = (f'<tr class="over_header"><th colspan="{len(columns) - 4}"></th>'
+            f'<th colspan="4">{over_header}</th></tr>') if over_header else ''
+    rows = []
+    for i, row in enumerate(df.itertuples(index=False), start=1):
+        if i % 20 == 0:
+            rows.append(f'<tr class="thead">{header}</tr>')
+        cells = ''.join('<td>{}</td>'.format('' if pd.isna(v) else v) for v in row)
+        rows.append(f'<tr><th>{i}</th>{cells}</tr>')
+    return (f'<table class="stats_table" id="{table_id}"><thead>{head}<tr>{header}</tr></thead>'
+            f'<tbody>{"".join(rows)}</tbody></table>')
+
+
+def make_bref_pages(scale=1, seed=0):
+    """Basketball Referenceのリーグページ・選手Advancedページを模したHTMLを生成
+
+    リーグページには目的のテーブル以外に多数のテーブル（一部はコメント内）を含める。
+    """
+    team_df = make_team_ratings(scale, seed).rename(columns={
+        'TEAM_NAME': 'Team', 'OFF_RATING': 'ORtg', 'DEF_RATING': 'DRtg', 'NET_RATING': 'NRtg'
+    })
+    player_df = make_player_ratings(scale, seed).rename(columns={
+        'PLAYER_NAME': 'Player', 'TEAM_ID': 'Team', 'OFF_RATING': 'OWS',
+        'DEF_RATING': 'DWS', 'NET_RATING': 'WS', 'GP': 'G'
+    })
+    rng = np.random.default_rng(seed)
+
+    def filler(names, width):
+        stats = pd.DataFrame(rng.normal(100, 10, (len(names), width)).round(1),
+                             columns=[f"S{i}" for i in range(width)])
+        return pd.concat([names.reset_index(drop=True), stats], axis=1)
+
+    tables = []
+    for i in range(8):
+        html = _table_html(filler(team_df['Team'], 20), f"stats-{i}")
+        # 一部のテーブルはBasketball Referenceと同様にコメント内に置く
+        tables.append(f'<div id="all_stats-{i}"><!--\n{html}\n--></div>' if i % 2 else html)
+    advanced = team_df.assign(Age=27.0, W=41, L=41, MOV=0.0, SOS=0.0, Pace=99.0,
+                              **{'eFG%': .540, 'TOV%': 12.0, 'ORB%': 25.0, 'FT/FGA': .200})
+    tables.insert(4, _table_html(advanced, 'advanced-team', over_header='Offense Four Factors'))
+    team_page = f'<html><head><title>NBA</title></head><body>{"".join(tables)}</body></html>'
+
+    player_columns = player_df.assign(Age=25, Pos='G', MP=1500, PER=15.0, **{'TS%': .570})
+    player_page = (f'<html><head><title>Advanced</title></head><body>'
+                   f'{_table_html(player_columns, "advanced")}</body></html>')
+    return team_page, player_page
@@ -0,0 +1,204 @@
+"""
+グラフ用のデータ（描画に必要な列だけを持つ小さなDataFrame）
+データのバージョンごとにNBADataManager.memoizeで一度だけ作成し、再実行のたびには作り直さない。
+散布図は点数の上限を超える場合に間引き、送信するデータ量を選手数（シーズン数）によらず一定に保つ。
+"""
+import numpy as np
+import pandas as pd
+
+from derived_metrics import (
+    DWS_COLUMN,
+    OWS_COLUMN,
+    WS_COLUMN,
+    WS_PER_36,
+    WS_PER_GAME,
+    float_column,
+    percentile_rank
+)
+
+# 散布図に描画する点数の上限と、間引かずに必ず残す上位選手（WS順）の数
+MAX_SCATTER_POINTS = 1500
+KEEP_TOP_POINTS = 100
+
+# 選手比較に使う指標（列名, 表示名）
+COMPARISON_METRICS = [
+    (OWS_COLUMN, 'OWS'),
+    (DWS_COLUMN, 'DWS'),
+    (WS_COLUMN, 'WS'),
+    (WS_PER_GAME, 'WS/G'),
+    (WS_PER_36, 'WS/36'),
+    ('GP', 'GP'),
+]
+
+ROSTER_QUANTILES = [('MIN', 0.0), ('Q1', 0.25), ('MEDIAN', 0.5), ('Q3', 0.75), ('MAX', 1.0)]
+
+
+def _played(df):
+    """1試合以上出場した選手の行"""
+    if 'GP' in df.columns:
+        return df[df['GP'] >= 1]
+    return df
+
+
+def downsample_points(x, y, weight, max_points=MAX_SCATTER_POINTS, keep_top=KEEP_TOP_POINTS):
+    """散布図の点を間引く
+
+    weightの上位keep_top点はそのまま残し、残りは格子に区切ってセルごとにweightが最大の点だけを残す。
+    格子は点のあるセルの数が残りの点数を超えない範囲で細かくする。
+
+    Returns:
+        (残す点の位置の配列（昇順）, 各点が代表する元の点の数)
+    """
+    n = len(x)
+    if n <= max_points:
+        return np.arange(n), np.ones(n, dtype=np.int64)
+
+    weight = np.nan_to_num(weight, nan=-np.inf)
+    keep_top = min(keep_top, max_points)
+    top = np.argpartition(-weight, keep_top - 1)[:keep_top] if keep_top else np.array([], dtype=np.int64)
+    is_top = np.zeros(n, dtype=bool)
+    is_top[top] = True
+
+    rest = np.flatnonzero(~is_top)
+    budget = max_points - keep_top
+
+    def normalize(values):
+        values = np.nan_to_num(values[rest])
+        low, high = values.min(), values.max()
+        return (values - low) / ((high - low) or 1.0)
+
+    def grid_cells(grid):
+        return (np.minimum(x_unit * grid, grid - 1).astype(np.int64) * grid
+                + np.minimum(y_unit * grid, grid - 1).astype(np.int64))
+
+    # 格子の1辺のセル数（点は偏って分布するため、点のあるセルが予算に収まる範囲で細かくする）
+    x_unit, y_unit = normalize(x), normalize(y)
+    grid = max(1, int(np.sqrt(budget)))
+    cells = grid_cells(grid)
+    while grid < 4096:
+        finer = grid_cells(int(grid * 1.5))
+        if len(np.unique(finer)) > budget:
+            break
+        grid, cells = int(grid * 1.5), finer
+    cell_of = np.empty(n, dtype=np.int64)
+    cell_of[rest] = cells
+    cells = cell_of
+    # weightの降順に並べた後、セル番号で安定ソートし、各セルの先頭を代表点とする
+    order = rest[np.argsort(-weight[rest], kind='stable')]
+    order = order[np.argsort(cells[order], kind='stable')]
+    sorted_cells = cells[order]
+    first = np.r_[True, sorted_cells[1:] != sorted_cells[:-1]]
+    representatives = order[first]
+    counts = np.diff(np.r_[np.flatnonzero(first), len(order)])
+
+    positions = np.concatenate([top, representatives])
+    represented = np.concatenate([np.ones(len(top), dtype=np.int64), counts])
+    order = np.argsort(positions)
+    return positions[order], represented[order]
+
+
+def team_scatter(team_ratings, max_points=MAX_SCATTER_POINTS):
+    """チームの散布図（ORtg・DRtg）用のデータ（複数シーズン分などで上限を超える場合は間引く）"""
+    columns = {'TEAM_NAME': 'チーム', 'OFF_RATING': 'ORtg', 'DEF_RATING': 'DRtg', 'NET_RATING': 'NRtg'}
+    df = team_ratings[[c for c in columns if c in team_ratings.columns]].rename(columns=columns)
+    if len(df) > max_points:
+        positions, _ = downsample_points(float_column(df, 'ORtg'), float_column(df, 'DRtg'), float_column(df, 'NRtg'), max_points)
+        df = df.iloc[positions].copy()
+    # スナップショットのfloat32は丸めても誤差が残るため、float64にしてから丸める
+    numeric = [c for c in ('ORtg', 'DRtg', 'NRtg') if c in df.columns]
+    df[numeric] = df[numeric].astype('float64').round(1)
+    return df.reset_index(drop=True)
+
+
+def player_scatter(season_totals, max_points=MAX_SCATTER_POINTS, keep_top=KEEP_TOP_POINTS):
+    """選手の散布図（OWS・DWS）用のデータ（上限を超える場合は間引き、代表する選手数を「人数」列に持つ）"""
+    df = _played(season_totals)
+    if df.empty:
+        return pd.DataFrame(columns=['選手', 'OWS', 'DWS', 'WS', 'GP', '人数'])
+    ows, dws, ws = (float_column(df, col) for col in (OWS_COLUMN, DWS_COLUMN, WS_COLUMN))
+    positions, represented = downsample_points(ows, dws, ws, max_points, keep_top)
+    return pd.DataFrame({
+        '選手': df['PLAYER_NAME'].to_numpy()[positions],
+        'OWS': ows[positions].round(1),
+        'DWS': dws[positions].round(1),
+        'WS': ws[positions].round(1),
+        'GP': float_column(df, 'GP')[positions],
+        '人数': represented,
+    })
+
+
+def roster_distribution(team_stints):
+    """チームごとの選手のWSの分布（最小・四分位・中央値・最大と選手数）
+
+    Returns:
+        TEAM_IDをインデックスとするDataFrame
+    """
+    columns = ['PLAYERS'] + [name for name, _ in ROSTER_QUANTILES]
+    df = _played(team_stints)
+    if df.empty or 'TEAM_ID' not in df.columns:
+        return pd.DataFrame(columns=columns)
+
+    ws = float_column(df, WS_COLUMN)
+    codes, uniques = pd.factorize(df['TEAM_ID'])
+    valid = (codes >= 0) & ~np.isnan(ws)
+    codes, ws = codes[valid], ws[valid]
+    n_groups = len(uniques)
+
+    # WSの昇順に並べた後、チーム番号で安定ソートし、チームごとに昇順に並んだWSを作る
+    order = np.argsort(ws)
+    order = order[np.argsort(codes[order].astype(np.int16 if n_groups < 2 ** 15 else np.int64), kind='stable')]
+    sorted_ws = ws[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+
+    result = {'PLAYERS': counts}
+    has_players = counts > 0
+    for name, q in ROSTER_QUANTILES:
+        # 線形補間による分位点（選手がいないチームは欠損値）
+        position = q * np.maximum(counts - 1, 0)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, np.maximum(counts - 1, 0))
+        fraction = position - low
+        values = np.full(n_groups, np.nan)
+        low_values = sorted_ws[(starts + low)[has_players]]
+        high_values = sorted_ws[(starts + high)[has_players]]
+        values[has_players] = low_values + (high_values - low_values) * fraction[has_players]
+        result[name] = values
+    return pd.DataFrame(result, index=pd.Index(np.asarray(uniques), name='TEAM_ID'))[columns]
+
+
+def comparison_table(season_totals):
+    """選手比較用の表（選手ごとの各指標の値とリーグ内パーセンタイル）
+
+    Returns:
+        選手名をインデックスとし、(指標の表示名, 'value'|'pctl')の2段の列を持つDataFrame
+    """
+    df = _played(season_totals)
+    metrics = [(col, label) for col, label in COMPARISON_METRICS if col in df.columns]
+    data = {}
+    for col, label in metrics:
+        values = float_column(df, col)
+        data[(label, 'value')] = values
+        data[(label, 'pctl')] = percentile_rank(values)
+    index = pd.Index(df['PLAYER_NAME'].to_numpy() if 'PLAYER_NAME' in df.columns else [], name='選手')
+    table = pd.DataFrame(data, index=index)
+    table.columns = pd.MultiIndex.from_tuples(table.columns) if data else table.columns
+    # 同名の選手がいる場合は最初の行を使う
+    return table[~table.index.duplicated()]
+
+
+def compare_players(table, player_names):
+    """選択した選手の比較用データ（縦持ち: 選手・指標・値・パーセンタイル）"""
+    rows = table.index.get_indexer(player_names)
+    selected = table.iloc[rows[rows >= 0]]
+    if selected.empty:
+        return pd.DataFrame(columns=['選手', '指標', '値', 'パーセンタイル'])
+    values = selected.xs('value', axis=1, level=1)
+    pctls = selected.xs('pctl', axis=1, level=1)
+    metrics = list(values.columns)
+    return pd.DataFrame({
+        '選手': np.repeat(selected.index.to_numpy(), len(metrics)),
+        '指標': np.tile(metrics, len(selected)),
+        '値': values.to_numpy().ravel(),
+        'パーセンタイル': pctls.to_numpy().ravel().round(1),
+    })
@@ -1,20 +1,31 @@
+import re
 import streamlit as st
-
+from table_format import (
+    DisplayTable,
+    PLAYER_COLUMN_LABELS,
+    TEAM_COLUMN_LABELS,
+    format_columns,
+    render_cached_table,
+    render_table
+)
+from profiling import profiled
+
+# 全選手レーティングの1ページあたりの表示件数の選択肢
+ALL_PLAYERS_PAGE_SIZES = [25, 50, 100, 200]
+
+@profiled('page.team_ratings')
 def display_team_ratings(nba_manager):
     """チームレーティングの表示"""
-    team_ratings = nba_manager.get_team_ratings()
+    # 列名の変更と数値フォーマットはデータのバージョンごとに一度だけ行う
+    team_ratings = nba_manager.memoize(
+        'team_ratings_table',
+        lambda: DisplayTable(nba_manager.get_team_ratings(), TEAM_COLUMN_LABELS)
+    )
 
     if not team_ratings.empty:
-        # 列名を先に変更（Basketball ReferenceのRating指標を使用）
-        team_ratings = team_ratings.rename(columns={
-            'OFF_RATING': 'ORtg',
-            'DEF_RATING': 'DRtg',
-            'NET_RATING': 'NRtg'
-        })
-
         # session_stateの初期化
         if 'team_ratings_sort_col' not in st.session_state:
-            st.session_state.team_ratings_sort_col = team_ratings.columns[0]
+            st.session_state.team_ratings_sort_col = team_ratings.values.columns[0]
         if 'team_ratings_ascending' not in st.session_state:
             st.session_state.team_ratings_ascending = False
 
@@ -22,7 +33,7 @@ def display_team_ratings(nba_manager):
         st.write("**並び替え列を選択:**")
         sort_column = st.radio(
             "並び替え列",
-            options=team_ratings.columns.tolist(),
+            options=team_ratings.values.columns.tolist(),
             horizontal=True,
             key="team_ratings_radio",
             label_visibility="collapsed"
@@ -38,24 +49,19 @@ def display_team_ratings(nba_manager):
                 st.session_state.team_ratings_sort_col = sort_column
                 st.session_state.team_ratings_ascending = True
 
-        # ソート実行
-        team_ratings_sorted = team_ratings.sort_values(
-            by=st.session_state.team_ratings_sort_col,
-            ascending=st.session_state.team_ratings_ascending
+        # ソート実行（事前計算済みのソート順から取り出すだけで並び替える）
+        # 並び替え済みの表は全セッションで共有し、同じ並び順の表は作り直さない
+        sort_col = st.session_state.team_ratings_sort_col
+        ascending = st.session_state.team_ratings_ascending
+        render_cached_table(
+            nba_manager,
+            ('team_ratings', sort_col, ascending),
+            lambda: (team_ratings.rows(team_ratings.order(sort_col, ascending=ascending)), 1)
         )
-
-        # ソート後に行数番号列を追加
-        team_ratings_sorted.insert(0, 'No.', range(1, len(team_ratings_sorted) + 1))
-
-        # 数値フォーマットを適用
-        for col in ['ORtg', 'DRtg', 'NRtg']:
-            if col in team_ratings_sorted.columns:
-                team_ratings_sorted[col] = team_ratings_sorted[col].apply(lambda x: f"{x:.1f}")
-
-        st.table(team_ratings_sorted.set_index('No.'))
     else:
         st.warning("表示できるチームデータがありません。")
 
+@profiled('page.team_players')
 def display_team_players(nba_manager):
     """チーム別選手レーティングの表示"""
     # 指標の説明を表示
@@ -67,6 +73,8 @@ def display_team_players(nba_manager):
         - **DWS (Defensive Win Shares)**: ディフェンス面での貢献度。相手の得点を防ぐ能力、リバウンド、スティールなどが評価されます
         - **WS (Win Shares)**: OWSとDWSを合計した総合的な貢献度。値が高いほどチームの勝利に貢献していることを示します
         - **GP (Games Played)**: シーズン中にプレイした試合数
+        - **WS/G**: 1試合あたりのWS（WS/36は36分あたりのWS、出場時間のデータがある場合のみ表示）
+        - **チーム内WS(z)**: チーム内でのWSの偏差（チームの平均を0、標準偏差を1とした値）
         """)
 
     try:
@@ -74,19 +82,26 @@ def display_team_players(nba_manager):
         selected_team = st.selectbox("チームを選択", teams)
 
         if selected_team:
-            team_players = nba_manager.get_player_ratings(team_name=selected_team)
+            # チーム全体の集計（データのバージョンごとに計算済み）
+            aggregates = nba_manager.get_team_aggregates()
+            team_id = nba_manager.get_team_id(selected_team)
+            if team_id in aggregates.index:
+                summary = aggregates.loc[team_id]
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("在籍選手数", int(summary['PLAYERS']))
+                col2.metric("WS合計", f"{summary['WS']:.1f}")
+                col3.metric("OWS / DWS", f"{summary['OWS']:.1f} / {summary['DWS']:.1f}")
+                col4.metric("WS最多", summary['TOP_PLAYER'], f"{summary['TOP_WS']:.1f} WS", delta_color="off")
+
+            team_players = nba_manager.memoize(
+                ('team_players_table', selected_team),
+                lambda: DisplayTable(nba_manager.get_player_ratings(team_name=selected_team), PLAYER_COLUMN_LABELS)
+            )
 
             if not team_players.empty:
-                # 列名を先に変更（Basketball ReferenceのWin Shares指標を使用）
-                team_players = team_players.rename(columns={
-                    'OFF_RATING': 'OWS',
-                    'DEF_RATING': 'DWS',
-                    'NET_RATING': 'WS'
-                })
-
                 # session_stateの初期化
                 if 'team_players_sort_col' not in st.session_state:
-                    st.session_state.team_players_sort_col = team_players.columns[0]
+                    st.session_state.team_players_sort_col = team_players.values.columns[0]
                 if 'team_players_ascending' not in st.session_state:
                     st.session_state.team_players_ascending = False
 
@@ -94,7 +109,7 @@ def display_team_players(nba_manager):
                 st.write("**並び替え列を選択:**")
                 sort_column = st.radio(
                     "並び替え列",
-                    options=team_players.columns.tolist(),
+                    options=team_players.values.columns.tolist(),
                     horizontal=True,
                     key="team_players_radio",
                     label_visibility="collapsed"
@@ -110,30 +125,21 @@ def display_team_players(nba_manager):
                         st.session_state.team_players_sort_col = sort_column
                         st.session_state.team_players_ascending = True
 
-                # ソート実行
-                team_players_sorted = team_players.sort_values(
-                    by=st.session_state.team_players_sort_col,
-                    ascending=st.session_state.team_players_ascending
+                # ソート実行（事前計算済みのソート順から取り出すだけで並び替える）
+                # 並び替え済みの表は全セッションで共有し、同じチーム・並び順の表は作り直さない
+                sort_col = st.session_state.team_players_sort_col
+                ascending = st.session_state.team_players_ascending
+                render_cached_table(
+                    nba_manager,
+                    ('team_players', team_id, sort_col, ascending),
+                    lambda: (team_players.rows(team_players.order(sort_col, ascending=ascending)), 1)
                 )
-
-                # ソート後に行数番号列を追加
-                team_players_sorted.insert(0, 'No.', range(1, len(team_players_sorted) + 1))
-
-                # 数値フォーマットを適用
-                for col in ['OWS', 'DWS', 'WS']:
-                    if col in team_players_sorted.columns:
-                        team_players_sorted[col] = team_players_sorted[col].apply(lambda x: f"{x:.1f}")
-
-                # GPは整数表示
-                if 'GP' in team_players_sorted.columns:
-                    team_players_sorted['GP'] = team_players_sorted['GP'].apply(lambda x: f"{int(x)}")
-
-                st.table(team_players_sorted.set_index('No.'))
             else:
                 st.warning(f"{selected_team}の選手データが見つかりませんでした。")
     except Exception as e:
         st.error(f"エラーが発生しました: {str(e)}")
 
+@profiled('page.player_search')
 def display_player_search(nba_manager):
     """選手検索機能の表示"""
     # 指標の説明を表示
@@ -145,46 +151,35 @@ def display_player_search(nba_manager):
         - **DWS (Defensive Win Shares)**: ディフェンス面での貢献度。相手の得点を防ぐ能力、リバウンド、スティールなどが評価されます
         - **WS (Win Shares)**: OWSとDWSを合計した総合的な貢献度。値が高いほどチームの勝利に貢献していることを示します
         - **GP (Games Played)**: シーズン中にプレイした試合数
+        - **WS/G**: 1試合あたりのWS（WS/36は36分あたりのWS、出場時間のデータがある場合のみ表示）
+        - **WSパーセンタイル**: リーグ全選手の中で、WSがその選手以下の選手の割合（%）
         """)
 
-    st.info("選手名の一部を入力してください（複数入力可）")
-
-    # UI改善: 検索フォームをまとめる
-    with st.form("search_form"):
-        col1, col2 = st.columns(2)
-        name1 = col1.text_input("選手名 1")
-        name2 = col2.text_input("選手名 2")
-        submit = st.form_submit_button("検索")
+    # 検索ページを開いたときだけ検索モジュールを読み込む
+    from player_search import SEARCH_MODES
 
-    search_names = [name1, name2]
+    st.info("選手名の一部を入力してください（カンマ区切りで複数入力可）")
 
-    if submit and any(search_names):
-        results = nba_manager.search_players(search_names)
+    # 入力確定ごとに再検索する（インデックス検索のため即座に結果を表示できる）
+    col1, col2 = st.columns([3, 2])
+    query = col1.text_input("選手名", placeholder="例: Jokic, LeBron, Curry", key="player_search_query")
+    mode_label = col2.radio("検索方法", list(SEARCH_MODES), horizontal=True, key="player_search_mode")
 
-        if not results.empty:
-            # 列名を先に変更（Basketball ReferenceのWin Shares指標を使用）
-            results = results.rename(columns={
-                'OFF_RATING': 'OWS',
-                'DEF_RATING': 'DWS',
-                'NET_RATING': 'WS'
-            })
+    search_names = [name.strip() for name in re.split(r'[,、，]', query) if name.strip()]
 
-            # 行数番号列を追加
-            results.insert(0, 'No.', range(1, len(results) + 1))
+    if search_names:
+        mode = SEARCH_MODES[mode_label]
 
-            # 数値フォーマットを適用
-            for col in ['OWS', 'DWS', 'WS']:
-                if col in results.columns:
-                    results[col] = results[col].apply(lambda x: f"{x:.1f}")
+        def build():
+            results = nba_manager.search_players(search_names, mode=mode)
+            # 列名を変更（Basketball ReferenceのWin Shares指標を使用）して数値を一括フォーマット
+            return format_columns(results.rename(columns=PLAYER_COLUMN_LABELS)), 1
 
-            # GPは整数表示
-            if 'GP' in results.columns:
-                results['GP'] = results['GP'].apply(lambda x: f"{int(x)}")
-
-            st.table(results.set_index('No.'))
-        else:
+        # 検索結果の表は全セッションで共有し、同じ検索条件では検索・整形を行わない
+        if not render_cached_table(nba_manager, ('player_search', tuple(search_names), mode), build):
             st.warning("該当する選手が見つかりませんでした。")
 
+@profiled('page.all_players')
 def display_all_players(nba_manager):
     """全選手レーティングの表示"""
     # 指標の説明を表示
@@ -196,23 +191,19 @@ def display_all_players(nba_manager):
         - **DWS (Defensive Win Shares)**: ディフェンス面での貢献度。相手の得点を防ぐ能力、リバウンド、スティールなどが評価されます
         - **WS (Win Shares)**: OWSとDWSを合計した総合的な貢献度。値が高いほどチームの勝利に貢献していることを示します
         - **GP (Games Played)**: シーズン中にプレイした試合数
+        - **WS/G**: 1試合あたりのWS（WS/36は36分あたりのWS、出場時間のデータがある場合のみ表示）
+        - **WSパーセンタイル**: リーグ全選手の中で、WSがその選手以下の選手の割合（%）
         """)
 
-    # 全選手表示は重いため、注意書きを入れるか、ページネーション的な工夫があると良いが、一旦そのまま表示
-    st.warning("注: 全選手のデータを取得・表示するため時間がかかる場合があります。")
-    all_players = nba_manager.get_player_ratings(min_games=20)
+    all_players = nba_manager.memoize(
+        'all_players_table',
+        lambda: DisplayTable(nba_manager.get_player_ratings(min_games=20), PLAYER_COLUMN_LABELS)
+    )
 
     if not all_players.empty:
-        # 列名を先に変更（Basketball ReferenceのWin Shares指標を使用）
-        all_players = all_players.rename(columns={
-            'OFF_RATING': 'OWS',
-            'DEF_RATING': 'DWS',
-            'NET_RATING': 'WS'
-        })
-
         # session_stateの初期化
         if 'all_players_sort_col' not in st.session_state:
-            st.session_state.all_players_sort_col = all_players.columns[0]
+            st.session_state.all_players_sort_col = all_players.values.columns[0]
         if 'all_players_ascending' not in st.session_state:
             st.session_state.all_players_ascending = False
 
@@ -220,7 +211,7 @@ def display_all_players(nba_manager):
         st.write("**並び替え列を選択:**")
         sort_column = st.radio(
             "並び替え列",
-            options=all_players.columns.tolist(),
+            options=all_players.values.columns.tolist(),
             horizontal=True,
             key="all_players_radio",
             label_visibility="collapsed"
@@ -236,24 +227,152 @@ def display_all_players(nba_manager):
                 st.session_state.all_players_sort_col = sort_column
                 st.session_state.all_players_ascending = True
 
-        # ソート実行
-        all_players_sorted = all_players.sort_values(
-            by=st.session_state.all_players_sort_col,
-            ascending=st.session_state.all_players_ascending
+        # 全件ではなく表示範囲のページだけを描画し、送信量と描画時間を一定に保つ
+        col1, col2, col3 = st.columns(3)
+        page_size = col1.selectbox(
+            "表示件数",
+            ALL_PLAYERS_PAGE_SIZES,
+            index=1,
+            key="all_players_page_size"
         )
+        top_n = col2.number_input(
+            "上位N人に絞り込み（0: 全員）",
+            min_value=0,
+            step=10,
+            key="all_players_top_n"
+        )
+        player_count = len(all_players.values)
+        total = min(top_n, player_count) if top_n else player_count
+        page_count = max(1, -(-total // page_size))
+        # 表示件数や絞り込みの変更でページ数が減った場合は最終ページに合わせる
+        if st.session_state.get("all_players_page", 1) > page_count:
+            st.session_state.all_players_page = page_count
+        page = col3.number_input(
+            f"ページ（全{page_count}ページ）",
+            min_value=1,
+            max_value=page_count,
+            step=1,
+            key="all_players_page"
+        )
+
+        offset = (page - 1) * page_size
+        end = min(offset + page_size, total)
+        st.caption(f"全{total}人中 {offset + 1}〜{end}位を表示")
+
+        # ソート実行（事前計算済みのソート順から取り出すだけで並び替える）
+        # 並び替え・ページ分割済みの表は全セッションで共有し、同じ並び順・ページの表は作り直さない
+        sort_col = st.session_state.all_players_sort_col
+        ascending = st.session_state.all_players_ascending
+        render_cached_table(
+            nba_manager,
+            ('all_players', sort_col, ascending, offset, end),
+            lambda: (all_players.rows(all_players.order(sort_col, ascending=ascending)[offset:end]), offset + 1)
+        )
+    else:
+        st.warning("表示できる選手データがありません。")
 
-        # ソート後に行数番号列を追加
-        all_players_sorted.insert(0, 'No.', range(1, len(all_players_sorted) + 1))
+@profiled('page.charts')
+def display_charts(nba_manager):
+    """グラフ（散布図・チーム内の分布・選手比較）の表示
 
-        # 数値フォーマットを適用
-        for col in ['OWS', 'DWS', 'WS']:
-            if col in all_players_sorted.columns:
-                all_players_sorted[col] = all_players_sorted[col].apply(lambda x: f"{x:.1f}")
+    グラフ用のデータはデータのバージョンごとに作成済みのものを使い、再実行のたびには作り直さない。
+    """
+    # グラフを表示するときだけaltairを読み込む
+    import altair as alt
 
-        # GPは整数表示
-        if 'GP' in all_players_sorted.columns:
-            all_players_sorted['GP'] = all_players_sorted['GP'].apply(lambda x: f"{int(x)}")
+    team_tab, player_tab, roster_tab, compare_tab = st.tabs(
+        ["チーム散布図", "選手散布図", "チーム内の分布", "選手比較"]
+    )
 
-        st.table(all_players_sorted.set_index('No.'))
-    else:
-        st.warning("表示できる選手データがありません。")
+    with team_tab:
+        teams = nba_manager.get_chart_data('team_scatter')
+        if teams.empty:
+            st.warning("表示できるチームデータがありません。")
+        else:
+            st.caption("右上ほど攻守とも優れたチーム（DRtgは低いほど良いため縦軸を反転）")
+            chart = alt.Chart(teams).mark_circle(size=120).encode(
+                x=alt.X('ORtg', scale=alt.Scale(zero=False)),
+                y=alt.Y('DRtg', scale=alt.Scale(zero=False, reverse=True)),
+                color=alt.Color('NRtg', scale=alt.Scale(scheme='redblue', reverse=True, domainMid=0)),
+                tooltip=['チーム', 'ORtg', 'DRtg', 'NRtg']
+            )
+            st.altair_chart(chart.interactive(), use_container_width=True)
+
+    with player_tab:
+        players = nba_manager.get_chart_data('player_scatter')
+        if players.empty:
+            st.warning("表示できる選手データがありません。")
+        else:
+            total = int(players['人数'].sum())
+            if len(players) < total:
+                st.caption(f"全{total}人中{len(players)}点を表示（WS上位の選手以外は、近い位置の選手を1点にまとめて表示）")
+            else:
+                st.caption(f"全{total}人を表示")
+            chart = alt.Chart(players).mark_circle(opacity=0.7).encode(
+                x='OWS',
+                y='DWS',
+                color=alt.Color('WS', scale=alt.Scale(scheme='viridis')),
+                size=alt.Size('人数', legend=None, scale=alt.Scale(range=[30, 300])),
+                tooltip=['選手', 'OWS', 'DWS', 'WS', 'GP', '人数']
+            )
+            st.altair_chart(chart.interactive(), use_container_width=True)
+
+    with roster_tab:
+        distribution = nba_manager.get_chart_data('roster_distribution')
+        if distribution.empty:
+            st.warning("表示できる選手データがありません。")
+        else:
+            team_names = [team['full_name'] for team in nba_manager._teams]
+            selected_team = st.selectbox("強調するチーム", team_names, key="chart_roster_team")
+            team_id = nba_manager.get_team_id(selected_team)
+            st.caption("チームごとの選手のWSの分布（線: 最小〜最大、箱: 第1〜第3四分位、白線: 中央値）")
+            data = distribution.reset_index()
+            highlight = alt.condition(alt.datum.TEAM_ID == team_id, alt.value('#d62728'), alt.value('#4c78a8'))
+            y = alt.Y('TEAM_ID:N', title=None, sort=alt.EncodingSortField('MEDIAN', order='descending'))
+            base = alt.Chart(data).encode(y=y, tooltip=['TEAM_ID', 'PLAYERS', 'MIN', 'Q1', 'MEDIAN', 'Q3', 'MAX'])
+            chart = alt.layer(
+                base.mark_rule().encode(x=alt.X('MIN:Q', title='WS'), x2='MAX:Q', color=highlight),
+                base.mark_bar(size=10).encode(x='Q1:Q', x2='Q3:Q', color=highlight),
+                base.mark_tick(color='white', size=10).encode(x='MEDIAN:Q'),
+            )
+            st.altair_chart(chart, use_container_width=True)
+
+            # 選択したチームの選手ごとのOWS・DWS（チームの選手数分だけの小さなデータ）
+            roster = nba_manager.get_player_ratings(team_name=selected_team, min_games=1)
+            if not roster.empty:
+                stacked = roster.rename(columns=PLAYER_COLUMN_LABELS).melt(
+                    id_vars=['PLAYER_NAME'], value_vars=['OWS', 'DWS'], var_name='指標', value_name='値'
+                )
+                chart = alt.Chart(stacked).mark_bar().encode(
+                    x=alt.X('値:Q', title='WS'),
+                    y=alt.Y('PLAYER_NAME:N', title=None, sort='-x'),
+                    color='指標:N',
+                    tooltip=['PLAYER_NAME', '指標', '値']
+                )
+                st.altair_chart(chart, use_container_width=True)
+
+    with compare_tab:
+        from chart_data import compare_players
+
+        table = nba_manager.get_chart_data('comparison')
+        if table.empty:
+            st.warning("表示できる選手データがありません。")
+            return
+        # 既定ではWS上位2人を比較する
+        default = table[('WS', 'value')].nlargest(2).index.tolist() if ('WS', 'value') in table.columns else []
+        selected = st.multiselect("比較する選手", table.index.tolist(), default=default, key="chart_compare_players")
+        if not selected:
+            st.info("比較する選手を選択してください（人数の制限はありません）")
+            return
+        comparison = compare_players(table, selected)
+        st.caption("各指標のリーグ内パーセンタイル（1試合以上出場した選手の中での順位）")
+        chart = alt.Chart(comparison).mark_line(point=True).encode(
+            x=alt.X('指標:N', sort=None, title=None),
+            y=alt.Y('パーセンタイル:Q', scale=alt.Scale(domain=[0, 100])),
+            color='選手:N',
+            tooltip=['選手', '指標', '値', 'パーセンタイル']
+        )
+        st.altair_chart(chart, use_container_width=True)
+        values = comparison.pivot(index='選手', columns='指標', values='値').reindex(index=selected)
+        values = values[comparison['指標'].unique()].rename_axis(columns=None).reset_index()
+        render_table(format_columns(values))
@@ -0,0 +1,255 @@
+"""
+データの取得元（DataSource）
+NBADataManagerはここで定義した取得元からチーム・選手のデータを読み込む。
+取得元ごとに変更の確認方法（signature）と確認間隔（refresh_interval）を持ち、
+使用する取得元は設定（環境変数 NBA_DATA_SOURCE または引数）で切り替える。
+
+- csv: CSVファイルのみを読み込む
+- snapshot: 列指向スナップショットがあればメモリマップで、なければCSVを読み込む（既定）
+- live: stats.nba.comから取得する（nba_apiが必要）
+- shared: ローダープロセスが共有メモリに公開した処理済みの表をメモリマップで参照する（shared_dataset.py）
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+
+import snapshot_store
+from snapshot import PLAYER_SNAPSHOT, TEAM_SNAPSHOT, load_frame
+
+# 既定の取得元
+DEFAULT_DATA_SOURCE = os.environ.get('NBA_DATA_SOURCE', 'snapshot')
+
+# ファイルの変更を確認する間隔（秒）
+FILE_REFRESH_SECONDS = 30
+# 共有メモリの公開中の版を確認する間隔（秒、CURRENTを読むだけのため短くする）
+SHARED_REFRESH_SECONDS = 5
+# ライブデータの更新を確認する間隔（秒、再取得の要否はLiveStatsClientの有効期限で決まる）
+LIVE_REFRESH_SECONDS = 60
+# ライブデータがまだない場合に取得を待つ時間（秒、上流の障害時に画面の表示を再試行の間ずっと止めない）
+LIVE_FIRST_FETCH_SECONDS = 10
+
+TEAM_COLUMNS = ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']
+
+
+class DataSource(ABC):
+    """データの取得元の基底クラス
+
+    Attributes:
+        name: 設定で指定する取得元の名前
+        refresh_interval: 変更を確認する間隔（秒）
+        preprocessed: Trueの場合、load_frames()で処理済みの表（派生指標・型の変換済み）を返す
+        win_shares: 選手のOFF_RATING/DEF_RATING/NET_RATINGがWin Shares（OWS/DWS/WS）の場合True
+    """
+    name = None
+    refresh_interval = FILE_REFRESH_SECONDS
+    preprocessed = False
+    win_shares = True
+
+    def __init__(self, season, data_dir):
+        self.season = season
+        self.data_dir = data_dir
+
+    @abstractmethod
+    def signature(self):
+        """変更検知用のシグネチャ（値が変わった場合のみデータを読み込み直す）"""
+
+    @abstractmethod
+    def load_team_ratings(self):
+        """チームのデータを読み込む（失敗時は例外を送出）"""
+
+    @abstractmethod
+    def load_player_ratings(self):
+        """選手のデータを読み込む（失敗時は例外を送出）"""
+
+    @abstractmethod
+    def last_updated(self):
+        """データの更新日時（表示用の文字列）"""
+
+    def commit(self):
+        """読み込みに成功した後に呼ばれる（signatureで確認した版を読み込み済みの版として記録する）"""
+
+
+class CsvSource(DataSource):
+    """CSVファイルから読み込む取得元
+
+    版管理されたデータ（snapshot_store.py）は公開中の版のディレクトリから読み込む。
+    version_dir/versionは読み込みに成功した版（再読み込みに失敗しても変わらない）。
+    """
+    name = 'csv'
+    files = ('team_ratings.csv', 'player_ratings.csv', 'last_updated.txt')
+
+    def __init__(self, season, data_dir):
+        super().__init__(season, data_dir)
+        self.version_dir, self.version = None, None
+        self._resolved = snapshot_store.resolve_dir(data_dir)
+
+    def _path(self, filename):
+        return os.path.join(self._resolved[0], filename)
+
+    def signature(self):
+        """公開中の版のID（版管理されていない場合はデータファイルのmtime/サイズ）
+
+        読み込みはシグネチャを取得した時点の版から行う。
+        """
+        self._resolved = snapshot_store.resolve_dir(self.data_dir)
+        version = self._resolved[1]
+        if version is not None:
+            return ('version', version)
+        signature = []
+        for filename in self.files:
+            try:
+                stat = os.stat(self._path(filename))
+                signature.append((filename, stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.append((filename, None, None))
+        return tuple(signature)
+
+    def commit(self):
+        self.version_dir, self.version = self._resolved
+
+    def load_team_ratings(self):
+        return pd.read_csv(self._path('team_ratings.csv'))
+
+    def load_player_ratings(self):
+        return pd.read_csv(self._path('player_ratings.csv'))
+
+    def last_updated(self):
+        path = self._path('last_updated.txt')
+        if not os.path.exists(path):
+            return "不明"
+        with open(path, 'r') as f:
+            return f.read().strip()
+
+
+class SnapshotSource(CsvSource):
+    """列指向スナップショットをメモリマップで読み込む取得元（スナップショットが古い・ない場合はCSV）"""
+    name = 'snapshot'
+    files = CsvSource.files + (TEAM_SNAPSHOT, PLAYER_SNAPSHOT)
+
+    def load_team_ratings(self):
+        return load_frame(self._path('team_ratings.csv'), self._path(TEAM_SNAPSHOT))
+
+    def load_player_ratings(self):
+        return load_frame(self._path('player_ratings.csv'), self._path(PLAYER_SNAPSHOT))
+
+
+class SharedMemorySource(DataSource):
+    """ローダープロセスが共有メモリに公開した処理済みの表をメモリマップで参照する取得元（複数ワーカー用）
+
+    データの解析・派生指標の計算はローダーが一度だけ行い、ワーカーは公開中の版（CURRENT）の変更を確認して
+    新しい版のファイルを参照し直すだけにする。
+    """
+    name = 'shared'
+    refresh_interval = SHARED_REFRESH_SECONDS
+    preprocessed = True
+
+    def __init__(self, season, data_dir):
+        super().__init__(season, data_dir)
+        self.version_dir, self.version = None, None
+        self._resolved = (None, None)
+
+    def signature(self):
+        """公開中の版のID（読み込みはシグネチャを取得した時点の版から行う）"""
+        import shared_dataset
+        self._resolved = shared_dataset.resolve(self.season)
+        return ('shared', self._resolved[1])
+
+    def commit(self):
+        self.version_dir, self.version = self._resolved
+
+    def load_frames(self):
+        """NBADataManagerの属性名 → 処理済みのDataFrame"""
+        import shared_dataset
+        version_dir = self._resolved[0]
+        if version_dir is None:
+            raise FileNotFoundError(f"{self.season}のデータが共有ディレクトリに公開されていません"
+                                    f"（python shared_dataset.py publish を実行してください）")
+        return shared_dataset.attach(version_dir)
+
+    def load_team_ratings(self):
+        """処理済みのチームの表"""
+        return self.load_frames()['team_ratings_cache']
+
+    def load_player_ratings(self):
+        """処理済みの選手の表（シーズン合計）"""
+        return self.load_frames()['player_ratings_cache']
+
+    def last_updated(self):
+        import shared_dataset
+        return shared_dataset.read_manifest(self._resolved[0])['last_updated']
+
+
+class LiveApiSource(DataSource):
+    """stats.nba.comから取得する取得元
+
+    キャッシュ・再取得はLiveStatsClient（期限切れのデータを返しつつ裏で再取得）に任せ、
+    定期的な確認でクライアントのデータが新しくなっていれば読み込み直す。
+    """
+    name = 'live'
+    refresh_interval = LIVE_REFRESH_SECONDS
+    # stats.nba.comの選手のOFF_RATING/DEF_RATING/NET_RATINGはWin Sharesではなくレーティング
+    win_shares = False
+
+    def __init__(self, season, data_dir, client=None):
+        super().__init__(season, data_dir)
+        # nba_apiはライブモードでのみ読み込む
+        import nba_data
+        self._client = client or nba_data.get_live_client()
+        self._team_request = nba_data.team_ratings_request(season)
+        self._player_request = nba_data.player_ratings_request(season)
+
+    def signature(self):
+        """キャッシュしているデータの取得時刻（期限切れの場合はここで裏での再取得が始まる）
+
+        データがまだない場合はチーム・選手の取得を合わせてLIVE_FIRST_FETCH_SECONDSまで待ち、間に合わなければ
+        StatsRequestErrorを送出する（取得は裏で続け、完了後の確認で読み込まれる）。
+        """
+        from live_stats import StatsRequestError
+
+        deadline = time.monotonic() + LIVE_FIRST_FETCH_SECONDS
+        error = None
+        for endpoint, parameters in (self._team_request, self._player_request):
+            # 片方が間に合わなくても、もう片方の取得も開始しておく
+            try:
+                self._client.get_frame(endpoint, parameters, timeout=max(deadline - time.monotonic(), 0))
+            except StatsRequestError as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return tuple(self._client.fetched_at(endpoint, parameters)
+                     for endpoint, parameters in (self._team_request, self._player_request))
+
+    def load_team_ratings(self):
+        df = self._client.get_frame(*self._team_request)
+        return df[[c for c in TEAM_COLUMNS if c in df.columns]]
+
+    def load_player_ratings(self):
+        df = self._client.get_frame(*self._player_request)
+        # チーム別の絞り込みは略称で行うため、TEAM_IDは数値IDではなく略称にする
+        if 'TEAM_ABBREVIATION' in df.columns:
+            df = df.drop(columns=['TEAM_ID'], errors='ignore').rename(columns={'TEAM_ABBREVIATION': 'TEAM_ID'})
+        cols = ['PLAYER_NAME', 'TEAM_ID', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']
+        return df[[c for c in cols if c in df.columns]]
+
+    def last_updated(self):
+        fetched_at = self._client.fetched_at(*self._player_request)
+        if fetched_at is None:
+            return "リアルタイム"
+        jst = timezone(timedelta(hours=9))
+        return f"{datetime.fromtimestamp(fetched_at, jst):%Y-%m-%d %H:%M:%S}（リアルタイム）"
+
+
+# 設定で指定できる取得元
+DATA_SOURCES = {source.name: source for source in (CsvSource, SnapshotSource, SharedMemorySource, LiveApiSource)}
+
+
+def create_source(name, season, data_dir):
+    """名前から取得元を作成"""
+    try:
+        source_class = DATA_SOURCES[name]
+    except KeyError:
+        raise ValueError(f"不明なデータ取得元です: {name}（{', '.join(DATA_SOURCES)}のいずれかを指定）")
+    return source_class(season, data_dir)
@@ -0,0 +1,128 @@
+"""
+選手データからの派生指標
+Win Shares系の列から試合あたり・36分あたりの値、リーグ内パーセンタイル、チーム内のzスコア、
+チームごとの集計をNumPyで一括計算する。NBADataManagerがデータのバージョンごとに一度だけ計算して保持する。
+"""
+import numpy as np
+import pandas as pd
+
+# 選手データでWin Sharesを格納している列（CSV・履歴の列名は互換性のためRating系のまま）
+OWS_COLUMN = 'OFF_RATING'
+DWS_COLUMN = 'DEF_RATING'
+WS_COLUMN = 'NET_RATING'
+
+# 派生指標の列
+WS_PER_GAME = 'WS_PER_GAME'
+WS_PER_36 = 'WS_PER_36'
+WS_PCTL = 'WS_PCTL'
+WS_TEAM_Z = 'WS_TEAM_Z'
+
+
+def float_column(df, col):
+    """列をfloat64の配列として取得（列がなければ欠損値の配列）"""
+    if col not in df.columns:
+        return np.full(len(df), np.nan)
+    return df[col].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _ratio(numerator, denominator):
+    """割り算（分母が0以下・欠損の場合は欠損値）"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = numerator / denominator
+    result[~(denominator > 0)] = np.nan
+    return result
+
+
+def percentile_rank(values):
+    """パーセンタイル順位（その値以下の選手の割合、0〜100。欠損値は欠損のまま）"""
+    valid_positions = np.flatnonzero(~np.isnan(values))
+    # 同じ値には同じ順位を付けるため、同値内の並びは問わない（安定ソートより高速）
+    order = valid_positions[np.argsort(values[valid_positions])]
+    sorted_values = values[order]
+    result = np.full(len(values), np.nan)
+    if len(sorted_values):
+        # 並べ替えた値同士で探索すると参照が連続し、未整列の値で探索するより高速
+        result[order] = np.searchsorted(sorted_values, sorted_values, side='right') / len(sorted_values) * 100
+    return result
+
+
+def group_zscores(values, codes, n_groups):
+    """グループ内のzスコア（母標準偏差を使用し、グループ内の値がすべて同じ場合は0）
+
+    Args:
+        values: 値の配列（欠損値はNaN）
+        codes: 各行のグループ番号（0〜n_groups-1、グループなしは-1）
+    """
+    valid = ~np.isnan(values) & (codes >= 0)
+    groups = np.where(valid, codes, 0)
+    weights = valid.astype('float64')
+    masked = np.where(valid, values, 0.0)
+    counts = np.bincount(groups, weights=weights, minlength=n_groups)
+    mean = _ratio(np.bincount(groups, weights=masked, minlength=n_groups), counts)
+    mean_sq = _ratio(np.bincount(groups, weights=masked * masked, minlength=n_groups), counts)
+    std = np.sqrt(np.maximum(mean_sq - mean * mean, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = (values - mean[groups]) / std[groups]
+    z[valid & ~(std[groups] > 1e-12)] = 0.0
+    z[~valid] = np.nan
+    return z
+
+
+def _add_rate_metrics(df):
+    """試合あたり・36分あたり（出場時間の列がある場合）のWSを追加"""
+    ws = float_column(df, WS_COLUMN)
+    df[WS_PER_GAME] = _ratio(ws, float_column(df, 'GP'))
+    if 'MIN' in df.columns:
+        df[WS_PER_36] = _ratio(ws, float_column(df, 'MIN')) * 36
+    return df
+
+
+def add_player_metrics(season_totals):
+    """シーズン合計（1選手1行）の表に、WS/GとリーグでのWSパーセンタイルを追加したコピーを返す"""
+    df = _add_rate_metrics(season_totals.copy())
+    df[WS_PCTL] = percentile_rank(float_column(df, WS_COLUMN))
+    return df
+
+
+def add_team_metrics(team_stints):
+    """チームごとの行の表に、WS/Gとチーム内でのWSのzスコアを追加したコピーを返す"""
+    df = _add_rate_metrics(team_stints.copy())
+    if 'TEAM_ID' in df.columns:
+        codes, uniques = pd.factorize(df['TEAM_ID'])
+        df[WS_TEAM_Z] = group_zscores(float_column(df, WS_COLUMN), codes, len(uniques))
+    return df
+
+
+def team_aggregates(team_stints):
+    """チームごとの集計（在籍選手数、OWS・DWS・WSの合計、WS最多の選手）
+
+    Returns:
+        TEAM_IDをインデックスとするDataFrame
+    """
+    columns = ['PLAYERS', 'OWS', 'DWS', 'WS', 'TOP_PLAYER', 'TOP_WS']
+    if team_stints.empty or 'TEAM_ID' not in team_stints.columns:
+        return pd.DataFrame(columns=columns)
+
+    codes, uniques = pd.factorize(team_stints['TEAM_ID'])
+    valid = codes >= 0
+    codes = codes[valid]
+    n_groups = len(uniques)
+    result = {'PLAYERS': np.bincount(codes, minlength=n_groups)}
+    for name, col in (('OWS', OWS_COLUMN), ('DWS', DWS_COLUMN), ('WS', WS_COLUMN)):
+        values = np.nan_to_num(float_column(team_stints, col)[valid])
+        result[name] = np.bincount(codes, weights=values, minlength=n_groups)
+
+    # WSの降順に並べた後、チーム番号で安定ソートし、各チームの先頭をWS最多の選手とする
+    # （チーム番号は小さい整数型にすると基数ソートになり、2キーのlexsortより高速）
+    ws = np.nan_to_num(float_column(team_stints, WS_COLUMN)[valid], nan=-np.inf)
+    order = np.argsort(-ws)
+    sorted_codes = codes[order].astype(np.int16 if n_groups < 2 ** 15 else np.int64)
+    order = order[np.argsort(sorted_codes, kind='stable')]
+    sorted_codes = codes[order]
+    first = order[np.r_[True, sorted_codes[1:] != sorted_codes[:-1]]]
+    names = team_stints['PLAYER_NAME'].to_numpy()[valid] if 'PLAYER_NAME' in team_stints.columns \
+        else np.full(len(codes), None)
+    result['TOP_PLAYER'] = names[first]
+    result['TOP_WS'] = float_column(team_stints, WS_COLUMN)[valid][first]
+    return pd.DataFrame(result, index=pd.Index(np.asarray(uniques), name='TEAM_ID'))[columns]
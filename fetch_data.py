@@ -1,159 +1,322 @@
 """
-Basketball Referenceから2025-26シーズンのNBAデータを取得してCSVファイルに保存するスクリプト
+Basketball Referenceから指定シーズン（既定は2025-26）のNBAデータを取得してCSVファイルに保存するスクリプト
 定期的に実行してデータを更新し、GitHubにプッシュすることでStreamlit Cloudでも最新データを利用可能
+データはシーズンごとに data/seasons/<シーズン>/ に版として保存し、検証後にまとめて公開する（snapshot_store.py）
 """
+import argparse
 import pandas as pd
-import requests
 from datetime import datetime, timezone, timedelta
-import time
+from io import StringIO
 import os
-
-def fetch_basketball_reference_data():
-    """Basketball ReferenceからデータをスクレイピングしてCSVに保存"""
-
-    # User-Agentを設定（礼儀正しくアクセス）
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+import snapshot
+import snapshot_store
+from fetch_engine import FetchEngine
+from html_tables import extract_table
+from history_store import append_delta, update_current_view
+from player_stints import classify_rows
+from seasons import DEFAULT_SEASON, bref_season_year, season_dir
+from team_metadata import TEAMS_FILE, write_teams
+
+BASE_URL = "https://www.basketball-reference.com"
+
+# User-Agentを設定（礼儀正しくアクセス）
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+# Basketball Referenceは1分あたり20リクエストまでを推奨しているため、同一ホストへは3秒以上空ける
+REQUEST_INTERVAL_SECONDS = 3.0
+
+# 条件付きGET用のETag/Last-Modifiedの保存先（dataディレクトリ内）
+VALIDATORS_FILE = 'http_validators.json'
+
+# 抽出するテーブルのid（選手ページは旧レイアウトのidも候補にする）
+TEAM_TABLE_ID = 'advanced-team'
+PLAYER_TABLE_IDS = ('advanced', 'advanced_stats')
+
+def save_snapshot(df, path):
+    """列指向スナップショットを保存（pyarrowがない場合はCSVのみ）"""
+    if not snapshot.is_available():
+        print("! pyarrowがないため列指向スナップショットは保存しません")
+        return
+    snapshot.write_snapshot(df, path)
+    print(f"✓ 列指向スナップショットを保存しました: {path}")
+
+def find_advanced_team_table(html):
+    """ページ内の全テーブルからAdvanced Statsのテーブルを探す（idで見つからない場合の代替手段）"""
+    # すべてのテーブルを取得
+    all_tables = pd.read_html(StringIO(html))
+
+    # Advanced Statsを含むテーブルを探す（ORtgを含むテーブル）
+    for table in all_tables:
+        # マルチインデックスの場合、レベル1のカラム名をチェック
+        if isinstance(table.columns, pd.MultiIndex):
+            level_0_cols = [col[0] for col in table.columns]
+            if 'Unnamed: 10_level_0' in level_0_cols or 'ORtg' in level_0_cols:
+                # マルチインデックスを解除（レベル1を使用）
+                table.columns = [col[1] if col[1] != 'Unnamed: ' + str(i) + '_level_1' else col[0]
+                                for i, col in enumerate(table.columns)]
+                return table
+        else:
+            # シングルインデックスの場合
+            if 'ORtg' in table.columns:
+                return table
+    return None
+
+def save_team_data(html, data_dir, output_dir=None):
+    """チームページのAdvanced StatsをCSVに保存
+
+    Args:
+        data_dir: シーズンのディレクトリ（履歴の保存先）
+        output_dir: CSV・スナップショットの保存先（前回のデータを含む新しい版の作業用ディレクトリ、省略時はdata_dir）
+
+    Returns:
+        前回のデータとの差分（履歴への追記は版の公開後に行う）。テーブルが見つからない場合はNone
+    """
+    output_dir = output_dir or data_dir
+    # 目的のテーブルだけを抽出（コメント内のテーブルにも対応）し、見つからなければ全テーブルから探す
+    team_df = extract_table(html, TEAM_TABLE_ID)
+    if team_df is None:
+        team_df = find_advanced_team_table(html)
+
+    if team_df is None:
+        print("✗ チームのAdvanced Statsテーブルが見つかりません")
+        return None
+
+    # カラム名を確認してマッピング
+    # Basketball Referenceでは: Team, ORtg, DRtg, NRtg
+    column_mapping = {
+        'Team': 'TEAM_NAME',
+        'ORtg': 'OFF_RATING',
+        'DRtg': 'DEF_RATING',
+        'NRtg': 'NET_RATING'
     }
 
-    season_year = "2026"  # 2025-26シーズンは2026として表記
-
-    # チームデータを取得
-    print("Basketball Referenceからチームデータを取得中...")
-    try:
-        # チームのAdvanced Statsを取得
-        team_url = f"https://www.basketball-reference.com/leagues/NBA_{season_year}.html"
-
-        # すべてのテーブルを取得
-        all_tables = pd.read_html(team_url)
-
-        # Advanced Statsを含むテーブルを探す（ORtgを含むテーブル）
-        team_df = None
-        for table in all_tables:
-            # マルチインデックスの場合、レベル1のカラム名をチェック
-            if isinstance(table.columns, pd.MultiIndex):
-                level_0_cols = [col[0] for col in table.columns]
-                if 'Unnamed: 10_level_0' in level_0_cols or 'ORtg' in level_0_cols:
-                    # マルチインデックスを解除（レベル1を使用）
-                    table.columns = [col[1] if col[1] != 'Unnamed: ' + str(i) + '_level_1' else col[0]
-                                    for i, col in enumerate(table.columns)]
-                    team_df = table
-                    break
-            else:
-                # シングルインデックスの場合
-                if 'ORtg' in table.columns:
-                    team_df = table
-                    break
-
-        if team_df is None:
-            print("✗ チームのAdvanced Statsテーブルが見つかりません")
-            return False
-
-        # カラム名を確認してマッピング
-        # Basketball Referenceでは: Team, ORtg, DRtg, NRtg
-        column_mapping = {
-            'Team': 'TEAM_NAME',
-            'ORtg': 'OFF_RATING',
-            'DRtg': 'DEF_RATING',
-            'NRtg': 'NET_RATING'
-        }
-
-        team_df = team_df.rename(columns=column_mapping)
-
-        # 必要なカラムを抽出
-        team_cols = ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']
-        team_df = team_df[[col for col in team_cols if col in team_df.columns]]
+    team_df = team_df.rename(columns=column_mapping)
 
-        # リーグ平均の行を削除（存在する場合）
-        team_df = team_df[team_df['TEAM_NAME'] != 'League Average']
+    # 必要なカラムを抽出
+    team_cols = ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']
+    team_df = team_df[[col for col in team_cols if col in team_df.columns]]
 
-        # 欠損値を削除
-        team_df = team_df.dropna(subset=['TEAM_NAME'])
+    # リーグ平均の行を削除（存在する場合）
+    team_df = team_df[team_df['TEAM_NAME'] != 'League Average']
 
-        # 数値型に変換
-        numeric_cols = ['OFF_RATING', 'DEF_RATING', 'NET_RATING']
-        for col in numeric_cols:
-            if col in team_df.columns:
-                team_df[col] = pd.to_numeric(team_df[col], errors='coerce')
+    # 欠損値を削除
+    team_df = team_df.dropna(subset=['TEAM_NAME'])
 
-        # CSVに保存
-        team_df.to_csv('data/team_ratings.csv', index=False)
-        print(f"✓ チームデータを保存しました: {len(team_df)}チーム")
+    # 数値型に変換
+    numeric_cols = ['OFF_RATING', 'DEF_RATING', 'NET_RATING']
+    for col in numeric_cols:
+        if col in team_df.columns:
+            team_df[col] = pd.to_numeric(team_df[col], errors='coerce')
 
-    except Exception as e:
-        print(f"✗ チームデータ取得エラー: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    # 前回のデータとの差分を求め、前回のデータに差分を適用して現在のデータを作成
+    team_df, delta = update_current_view(team_df, data_dir, 'team_ratings', view_dir=output_dir)
+    if delta.empty:
+        print("✓ チームデータに変更はありません")
+        return delta
 
-    # 礼儀正しく待機
-    print("\n5秒待機中...")
-    time.sleep(5)
+    # CSVに保存
+    team_df.to_csv(os.path.join(output_dir, 'team_ratings.csv'), index=False)
+    print(f"✓ チームデータを保存しました: {len(team_df)}チーム")
+    save_snapshot(team_df, os.path.join(output_dir, snapshot.TEAM_SNAPSHOT))
+    return delta
 
-    # 選手データを取得
-    print("Basketball Referenceから選手データを取得中...")
-    try:
-        # 選手のAdvanced Statsを取得
-        player_url = f"https://www.basketball-reference.com/leagues/NBA_{season_year}_advanced.html"
-
-        # pandasでHTMLテーブルを読み込む
-        player_tables = pd.read_html(player_url)
+def save_player_data(html, data_dir, output_dir=None):
+    """選手ページのAdvanced StatsをCSVに保存（引数・戻り値はsave_team_dataと同じ）"""
+    output_dir = output_dir or data_dir
+    # 目的のテーブルだけを抽出し、見つからなければpandasでページ先頭のテーブルを読み込む
+    player_df = extract_table(html, PLAYER_TABLE_IDS)
+    if player_df is None:
+        player_tables = pd.read_html(StringIO(html))
 
         if len(player_tables) == 0:
             print("✗ 選手のAdvanced Statsテーブルが見つかりません")
-            return False
+            return None
 
         player_df = player_tables[0]
 
-        # カラム名を確認してマッピング
-        # Basketball Referenceでは: Player, Team, OWS (Offensive Win Shares), DWS (Defensive Win Shares), WS (Total Win Shares), G
-        column_mapping = {
-            'Player': 'PLAYER_NAME',
-            'Team': 'TEAM_ID',
-            'OWS': 'OFF_RATING',      # Offensive Win Shares を OFF_RATING として使用
-            'DWS': 'DEF_RATING',      # Defensive Win Shares を DEF_RATING として使用
-            'WS': 'NET_RATING',       # Total Win Shares を NET_RATING として使用
-            'G': 'GP'
-        }
+    # カラム名を確認してマッピング
+    # Basketball Referenceでは: Player, Team, OWS (Offensive Win Shares), DWS (Defensive Win Shares), WS (Total Win Shares), G, MP (Minutes Played)
+    column_mapping = {
+        'Player': 'PLAYER_NAME',
+        'Team': 'TEAM_ID',
+        'OWS': 'OFF_RATING',      # Offensive Win Shares を OFF_RATING として使用
+        'DWS': 'DEF_RATING',      # Defensive Win Shares を DEF_RATING として使用
+        'WS': 'NET_RATING',       # Total Win Shares を NET_RATING として使用
+        'G': 'GP',
+        'MP': 'MIN'               # 出場時間（36分あたりの指標に使用）
+    }
+
+    player_df = player_df.rename(columns=column_mapping)
+
+    # 必要なカラムを抽出
+    player_cols = ['PLAYER_NAME', 'TEAM_ID', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', 'MIN']
+    player_df = player_df[[col for col in player_cols if col in player_df.columns]]
 
-        player_df = player_df.rename(columns=column_mapping)
+    # ヘッダー行を削除（存在する場合）
+    player_df = player_df[player_df['PLAYER_NAME'] != 'Player']
 
-        # 必要なカラムを抽出
-        player_cols = ['PLAYER_NAME', 'TEAM_ID', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']
-        player_df = player_df[[col for col in player_cols if col in player_df.columns]]
+    # 数値型に変換
+    numeric_cols = ['OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', 'MIN']
+    for col in numeric_cols:
+        if col in player_df.columns:
+            player_df[col] = pd.to_numeric(player_df[col], errors='coerce')
 
-        # ヘッダー行を削除（存在する場合）
-        player_df = player_df[player_df['PLAYER_NAME'] != 'Player']
+    # 欠損値を削除
+    player_df = player_df.dropna(subset=['PLAYER_NAME'])
 
-        # 数値型に変換
-        numeric_cols = ['OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']
-        for col in numeric_cols:
-            if col in player_df.columns:
-                player_df[col] = pd.to_numeric(player_df[col], errors='coerce')
+    # 移籍選手の合計行（2TM/3TMなど）とチームごとの行を区別する列を追加
+    player_df = classify_rows(player_df)
 
-        # 欠損値を削除
-        player_df = player_df.dropna(subset=['PLAYER_NAME'])
+    # 前回のデータとの差分を求め、前回のデータに差分を適用して現在のデータを作成
+    player_df, delta = update_current_view(player_df, data_dir, 'player_ratings', view_dir=output_dir)
+    if delta.empty:
+        print("✓ 選手データに変更はありません")
+        return delta
 
-        # CSVに保存
-        player_df.to_csv('data/player_ratings.csv', index=False)
-        print(f"✓ 選手データを保存しました: {len(player_df)}選手")
+    # CSVに保存
+    player_df.to_csv(os.path.join(output_dir, 'player_ratings.csv'), index=False)
+    print(f"✓ 選手データを保存しました: {len(player_df)}選手")
+    save_snapshot(player_df, os.path.join(output_dir, snapshot.PLAYER_SNAPSHOT))
+    return delta
+
+def save_team_metadata(data_dir):
+    """アプリが読み込むチーム一覧（teams.csv）をnba_apiの静的データから生成"""
+    try:
+        changed = write_teams(data_dir)
+    except ImportError:
+        # nba_apiがない環境では同梱のファイルをそのまま使う
+        print(f"! nba_apiがインストールされていないため{TEAMS_FILE}は更新しません")
+        return False
+    if changed:
+        print(f"✓ チーム一覧を保存しました: {os.path.join(data_dir, TEAMS_FILE)}")
+    return True
 
+def fetch_basketball_reference_data(season=DEFAULT_SEASON, base_url=BASE_URL, data_dir='data', engine=None,
+                                    keep_versions=snapshot_store.KEEP_VERSIONS):
+    """Basketball ReferenceからデータをスクレイピングしてCSVに保存
+
+    Args:
+        season: 取得するシーズン（'2025-26'形式）
+        base_url: 取得先のURL（ローカルのスタブサーバーでの動作確認用に変更可能）
+        data_dir: データディレクトリ（シーズンのデータは data_dir/seasons/<シーズン>/ に保存）
+        engine: 使用するFetchEngine（省略時は接続プール・レート制限付きで作成）
+        keep_versions: 公開後に残す版の数（公開中の版は常に残す）
+    """
+    if engine is None:
+        engine = FetchEngine(
+            headers=HEADERS,
+            min_interval=REQUEST_INTERVAL_SECONDS,
+            validators_path=os.path.join(data_dir, VALIDATORS_FILE)
+        )
+
+    season_year = bref_season_year(season)  # 2025-26シーズンは2026として表記
+    data_dir = season_dir(data_dir, season)
+    os.makedirs(data_dir, exist_ok=True)
+
+    # チームと選手のAdvanced Statsを同時に取得（同一ホストへの間隔はレート制限で確保）
+    team_url = f"{base_url}/leagues/NBA_{season_year}.html"
+    player_url = f"{base_url}/leagues/NBA_{season_year}_advanced.html"
+    print(f"Basketball Referenceから{season}シーズンのチーム・選手データを取得中...")
+    try:
+        team_page, player_page = engine.fetch_all([team_url, player_url])
     except Exception as e:
-        print(f"✗ 選手データ取得エラー: {e}")
+        print(f"✗ データ取得エラー: {e}")
         import traceback
         traceback.print_exc()
         return False
 
+    jst = timezone(timedelta(hours=9))
+    fetched_at = datetime.now(jst)
+
+    if team_page.not_modified and player_page.not_modified:
+        print("✓ 前回の取得から変更がないため、更新をスキップしました")
+        return True
+
+    # 公開中の版を引き継いだ作業用ディレクトリに新しい版を作成する（読み込み側からは見えない）
+    current_dir, _ = snapshot_store.resolve_dir(data_dir)
+    staging = snapshot_store.create_staging(data_dir, current_dir)
+    saved_pages = []
+    deltas = []
+    for page, save, kind, label in [
+        (team_page, save_team_data, 'team_ratings', "チーム"),
+        (player_page, save_player_data, 'player_ratings', "選手"),
+    ]:
+        if page.not_modified:
+            print(f"✓ {label}データは前回から変更がないためスキップしました")
+            continue
+        try:
+            delta = save(page.text, data_dir, output_dir=staging)
+            if delta is None:
+                snapshot_store.discard_staging(staging)
+                return False
+        except Exception as e:
+            print(f"✗ {label}データ取得エラー: {e}")
+            import traceback
+            traceback.print_exc()
+            snapshot_store.discard_staging(staging)
+            return False
+        saved_pages.append(page)
+        deltas.append((kind, label, delta))
+
     # 更新日時を記録
-    with open('data/last_updated.txt', 'w') as f:
-        jst = timezone(timedelta(hours=9))
-        f.write(datetime.now(jst).strftime('%Y-%m-%d %H:%M:%S'))
+    with open(os.path.join(staging, 'last_updated.txt'), 'w') as f:
+        f.write(fetched_at.strftime('%Y-%m-%d %H:%M:%S'))
+
+    # マニフェスト（行数・スキーマ・チェックサム）を検証してから、CURRENTを置き換えて公開
+    try:
+        version = snapshot_store.publish(data_dir, staging, season, fetched_at, keep=keep_versions)
+    except snapshot_store.SnapshotValidationError as e:
+        print("✗ 作成したデータの検証に失敗したため、公開しませんでした（公開中のデータは変更していません）")
+        for error in e.errors:
+            print(f"  - {error}")
+        return False
+    print(f"✓ データを公開しました: {version}")
+
+    # 公開した版の差分のみ履歴に追記する
+    for kind, label, delta in deltas:
+        if not delta.empty:
+            append_delta(data_dir, kind, delta, fetched_at)
+            print(f"✓ {label}データの差分を履歴に記録しました: {len(delta)}行")
+
+    # 公開できたページのみ、次回の条件付きGETの対象にする
+    for page in saved_pages:
+        engine.remember(page)
+    engine.save_validators()
 
     print("\n✓ すべてのデータ取得が完了しました")
     return True
 
 if __name__ == "__main__":
-    # dataディレクトリを作成
-    os.makedirs('data', exist_ok=True)
+    parser = argparse.ArgumentParser(description="Basketball ReferenceからNBAデータを取得")
+    parser.add_argument('--season', action='append', dest='seasons',
+                        help=f"取得するシーズン（'2025-26'形式、複数指定可。既定: {DEFAULT_SEASON}）")
+    parser.add_argument('--base-url', default=BASE_URL, help="取得先のURL（スタブサーバーでの確認用）")
+    parser.add_argument('--data-dir', default='data', help="データディレクトリ")
+    parser.add_argument('--keep-versions', type=int, default=snapshot_store.KEEP_VERSIONS,
+                        help="公開後に残す版の数（読み込み中のアプリがない環境では1でよい）")
+    parser.add_argument('--export', metavar='DIR',
+                        help="取得後に全画面の表示結果をJSON・HTMLに書き出すディレクトリ（static_export.py）")
+    args = parser.parse_args()
 
-    fetch_basketball_reference_data()
+    # dataディレクトリを作成
+    os.makedirs(args.data_dir, exist_ok=True)
+    save_team_metadata(args.data_dir)
+
+    # 複数シーズンでも接続プールとレート制限を共有する
+    engine = FetchEngine(
+        headers=HEADERS,
+        min_interval=REQUEST_INTERVAL_SECONDS,
+        validators_path=os.path.join(args.data_dir, VALIDATORS_FILE)
+    )
+    seasons = args.seasons or [DEFAULT_SEASON]
+    for season in seasons:
+        fetch_basketball_reference_data(season=season, base_url=args.base_url,
+                                        data_dir=args.data_dir, engine=engine, keep_versions=args.keep_versions)
+
+    if args.export:
+        # 公開中のデータから書き出す（データの版が前回の書き出しと同じ場合は書き出さない）
+        from static_export import export_seasons
+        for season, path in export_seasons(args.data_dir, args.export, seasons).items():
+            print(f"✓ {season}シーズンの表示結果を書き出しました: {path}")
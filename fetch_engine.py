@@ -0,0 +1,130 @@
+"""
+HTTP取得エンジン
+接続プール付きのセッション、同時取得数の上限、ホストごとのレート制限と、
+ETag / Last-Modifiedによる条件付きGETで変更のないページの再取得を省く
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 取得結果（not_modifiedがTrueの場合、textはNone）
+FetchResult = namedtuple('FetchResult', ['url', 'status', 'text', 'not_modified', 'validators'])
+
+
+class RateLimiter:
+    """ホストごとにリクエストの開始間隔をmin_interval秒以上空ける"""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        """次のリクエスト枠まで待機"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FetchEngine:
+    """条件付きGET・レート制限・同時取得に対応したHTTP取得エンジン"""
+
+    def __init__(self, headers=None, max_workers=4, min_interval=3.0, timeout=30,
+                 retries=3, validators_path=None):
+        """
+        Args:
+            headers: すべてのリクエストに付けるヘッダー
+            max_workers: 同時に取得するページ数の上限
+            min_interval: 同一ホストへのリクエスト間隔（秒）
+            timeout: 1リクエストのタイムアウト（秒）
+            retries: 429/5xx応答や接続エラー時の再試行回数（Retry-Afterを尊重）
+            validators_path: ETag/Last-Modifiedを保存するJSONファイル（Noneの場合は保存しない）
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.rate_limiter = RateLimiter(min_interval)
+        self.validators_path = validators_path
+
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        retry = Retry(
+            total=retries,
+            backoff_factor=2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+            respect_retry_after_header=True
+        )
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._validators = self._load_validators()
+
+    def _load_validators(self):
+        """保存済みのETag/Last-Modifiedを読み込む"""
+        if not self.validators_path or not os.path.exists(self.validators_path):
+            return {}
+        try:
+            with open(self.validators_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def fetch(self, url):
+        """1ページを取得（前回から変更がなければnot_modified=Trueを返す）"""
+        headers = {}
+        validators = self._validators.get(url, {})
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+        self.rate_limiter.wait(urlsplit(url).netloc)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return FetchResult(url, 304, None, True, validators)
+        response.raise_for_status()
+
+        # charset指定がない場合、requestsはISO-8859-1とみなすため選手名が文字化けする
+        if 'charset' not in response.headers.get('Content-Type', ''):
+            response.encoding = 'utf-8'
+        new_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+        }
+        return FetchResult(url, response.status_code, response.text, False, new_validators)
+
+    def fetch_all(self, urls):
+        """複数ページを同時取得（結果はurlsと同じ順）"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(self.fetch, urls))
+
+    def remember(self, result):
+        """処理が完了したページのETag/Last-Modifiedを記録（次回の条件付きGETに使用）"""
+        if not result.not_modified:
+            self._validators[result.url] = {k: v for k, v in result.validators.items() if v}
+
+    def save_validators(self):
+        """記録したETag/Last-Modifiedを保存"""
+        if not self.validators_path:
+            return
+        tmp_path = f"{self.validators_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self._validators, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.validators_path)
+
+    def close(self):
+        self.session.close()
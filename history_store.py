@@ -0,0 +1,183 @@
+"""
+差分ベースの履歴ストア
+取得したデータを前回の現在ビュー（data/*.csv）と行単位で比較し、変更行だけを
+日付ごとのパーティション（history/<種類>/date=YYYY-MM-DD/）に追記する。
+現在ビューは前回の現在ビューに差分を適用して作成する。
+"""
+import glob
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+
+HISTORY_DIR = 'history'
+
+# データの種類ごとの行のキー
+KEY_COLUMNS = {
+    'team_ratings': ['TEAM_NAME'],
+    'player_ratings': ['PLAYER_NAME', 'TEAM_ID'],
+}
+
+# 履歴に付ける列（操作の種類: upsert / delete、記録日時）
+OP_COLUMN = '_op'
+RECORDED_AT_COLUMN = '_recorded_at'
+
+# 同じキーの行が複数ある場合の出現順（キーを一意にするための内部列）
+_OCCURRENCE_COLUMN = '_occurrence'
+
+
+def _with_occurrence(df, keys):
+    """同じキーの行を区別できるよう出現順の列を追加"""
+    df = df.copy()
+    df[_OCCURRENCE_COLUMN] = df.groupby(keys, dropna=False, sort=False).cumcount()
+    return df
+
+
+def _values_equal(left, right):
+    """列同士を要素ごとに比較（欠損値同士は等しいとみなす）"""
+    left_na = left.isna().to_numpy()
+    right_na = right.isna().to_numpy()
+    with np.errstate(invalid='ignore'):
+        equal = (left.to_numpy() == right.to_numpy())
+    return (equal & ~left_na & ~right_na) | (left_na & right_na)
+
+
+def compute_delta(previous, current, keys):
+    """前回と今回のデータを比較し、追加・変更された行（upsert）と削除された行（delete）を返す"""
+    value_cols = [c for c in current.columns if c not in keys]
+    join_keys = keys + [_OCCURRENCE_COLUMN]
+    # 外部結合はキー順に並び替えるため、差分は元の行順（今回→前回）に戻して返す
+    merged = pd.merge(
+        _with_occurrence(previous, keys).assign(_position_prev=np.arange(len(previous))),
+        _with_occurrence(current, keys).assign(_position=np.arange(len(current))),
+        on=join_keys,
+        how='outer',
+        suffixes=('_prev', ''),
+        indicator=True,
+        sort=False
+    )
+
+    changed = merged['_merge'] == 'right_only'
+    both = (merged['_merge'] == 'both').to_numpy()
+    for col in value_cols:
+        if f"{col}_prev" in merged.columns:
+            changed |= both & ~_values_equal(merged[f"{col}_prev"], merged[col])
+        else:
+            # 新しく追加された列は値があれば変更とみなす
+            changed |= both & merged[col].notna().to_numpy()
+
+    merged = merged.sort_values(['_position', '_position_prev'], kind='stable')
+    changed = changed.loc[merged.index]
+    upserts = merged.loc[changed, keys + value_cols].assign(**{OP_COLUMN: 'upsert'})
+    # 削除行には削除前の値を残す
+    prev_cols = {f"{c}_prev": c for c in value_cols if f"{c}_prev" in merged.columns}
+    deletes = (merged.loc[merged['_merge'] == 'left_only', keys + list(prev_cols)]
+               .rename(columns=prev_cols)
+               .reindex(columns=keys + value_cols)
+               .assign(**{OP_COLUMN: 'delete'}))
+    parts = [df for df in (upserts, deletes) if not df.empty]
+    if not parts:
+        return upserts.reset_index(drop=True)
+    return pd.concat(parts, ignore_index=True)
+
+
+def apply_delta(previous, delta, keys):
+    """前回の現在ビューに差分を適用（既存行の順序は維持し、新しい行は末尾に追加）"""
+    if delta.empty:
+        return previous.copy()
+    columns = list(dict.fromkeys(list(previous.columns) + [c for c in delta.columns if c != OP_COLUMN
+                                                             and c != RECORDED_AT_COLUMN]))
+    join_keys = keys + [_OCCURRENCE_COLUMN]
+    base = _with_occurrence(previous.reindex(columns=columns), keys)
+
+    deletes = _with_occurrence(delta[delta[OP_COLUMN] == 'delete'][keys], keys)
+    upserts = _with_occurrence(delta[delta[OP_COLUMN] == 'upsert'].reindex(columns=columns), keys)
+
+    base_index = pd.MultiIndex.from_frame(base[join_keys])
+    base = base[~base_index.isin(pd.MultiIndex.from_frame(deletes[join_keys]))]
+
+    # 既存行の更新は元の位置で置き換え、新規行は末尾に追加
+    upsert_index = pd.MultiIndex.from_frame(upserts[join_keys])
+    base_index = pd.MultiIndex.from_frame(base[join_keys])
+    is_update = upsert_index.isin(base_index)
+    updated = base.set_index(join_keys)
+    updates = upserts[is_update].set_index(join_keys)
+    # DataFrame.updateは欠損値で上書きしないため、行ごと置き換える
+    updated.loc[updates.index, updates.columns] = updates
+    parts = [df for df in (updated.reset_index(), upserts[~is_update]) if not df.empty]
+    result = pd.concat(parts, ignore_index=True) if parts else upserts.iloc[:0]
+    return result[columns].reset_index(drop=True)
+
+
+def append_delta(data_dir, kind, delta, recorded_at):
+    """差分を日付パーティションに新しいファイルとして追記（既存ファイルは変更しない）
+
+    ファイル名は記録時刻（マイクロ秒まで）で、名前順が記録順になる。同じ時刻のファイルがある場合は
+    連番を付けて別のファイルにする（排他的に作成するため、既存の差分を上書きしない）。
+    """
+    partition = os.path.join(data_dir, HISTORY_DIR, kind, f"date={recorded_at:%Y-%m-%d}")
+    os.makedirs(partition, exist_ok=True)
+    delta = delta.assign(**{RECORDED_AT_COLUMN: recorded_at.isoformat(timespec='seconds')})
+    name = f"part-{recorded_at:%H%M%S%f}"
+    for sequence in itertools.count():
+        # 連番付きの名前（_001など）は'.'より後に並ぶため、同じ時刻の最初のファイルの後になる
+        path = os.path.join(partition, f"{name}.csv" if sequence == 0 else f"{name}_{sequence:03d}.csv")
+        try:
+            with open(path, 'x', newline='', encoding='utf-8') as f:
+                delta.to_csv(f, index=False)
+            return path
+        except FileExistsError:
+            continue
+
+
+def has_history(data_dir, kind):
+    """種類（team_ratings / player_ratings）の差分が1つ以上記録されているか"""
+    return bool(glob.glob(os.path.join(data_dir, HISTORY_DIR, kind, 'date=*', 'part-*.csv')))
+
+
+def load_history(data_dir, kind, since=None):
+    """履歴を記録順に読み込む
+
+    Args:
+        since: 'YYYY-MM-DD'形式の日付（指定した場合はその日以降のパーティションのみ読み込む）
+    """
+    paths = sorted(glob.glob(os.path.join(data_dir, HISTORY_DIR, kind, 'date=*', 'part-*.csv')))
+    if since:
+        paths = [p for p in paths if os.path.basename(os.path.dirname(p)) >= f"date={since}"]
+    if not paths:
+        return pd.DataFrame()
+    return pd.concat([pd.read_csv(p) for p in paths], ignore_index=True)
+
+
+def update_current_view(current, data_dir, kind, view_dir=None):
+    """今回のデータと前回の現在ビューの差分を求め、新しい現在ビューを返す
+
+    差分はここでは履歴に追記しない。新しい版の公開に成功した後でappend_deltaを呼び出す
+    （公開しなかった版の差分が履歴に残ると、履歴を再生しても公開中のデータにならないため）。
+
+    Args:
+        data_dir: 履歴を保存するディレクトリ
+        view_dir: 前回の現在ビュー（<種類>.csv）のディレクトリ（省略時はdata_dir）
+
+    Returns:
+        (現在ビューのDataFrame, 差分のDataFrame)
+    """
+    keys = KEY_COLUMNS[kind]
+    csv_path = os.path.join(view_dir or data_dir, f"{kind}.csv")
+    if os.path.exists(csv_path) and has_history(data_dir, kind):
+        previous = pd.read_csv(csv_path)
+    else:
+        # 履歴がまだない場合は、今回のデータ全体を最初の差分として記録する
+        previous = pd.DataFrame(columns=current.columns)
+
+    delta = compute_delta(previous, current, keys)
+    if delta.empty:
+        return previous, delta
+
+    view = apply_delta(previous, delta, keys)
+    # 差分の適用結果が今回のデータと一致することを確認（一致しない場合は今回のデータを採用）
+    if not compute_delta(view, current, keys).empty:
+        print(f"! {kind}: 差分の適用結果が取得データと一致しないため、取得データをそのまま使用します")
+        view = current.reset_index(drop=True)
+    return view, delta
@@ -0,0 +1,102 @@
+"""
+HTMLから目的のテーブルだけを取り出す抽出器
+lxmlのプルパーサーでHTMLを少しずつ読み込み、指定したidのテーブルだけをDataFrameにする
+（Basketball Referenceのようにコメント内に埋め込まれたテーブルにも対応）
+"""
+import pandas as pd
+from lxml import etree
+
+# プルパーサーに一度に渡す文字数
+CHUNK_SIZE = 64 * 1024
+
+
+def _cell_text(cell):
+    return ''.join(cell.itertext()).strip()
+
+
+def _unique_columns(names):
+    """空の列名をUnnamed: iに、重複する列名を name.1, name.2 ... に置き換える（pd.read_htmlと同様）"""
+    columns = []
+    seen = {}
+    for i, name in enumerate(names):
+        name = name or f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def _is_header_row(row):
+    """表中で繰り返される見出し行か"""
+    classes = (row.get('class') or '').split()
+    return 'thead' in classes or 'over_header' in classes
+
+
+def table_to_frame(table):
+    """table要素をDataFrameに変換（列名は見出しの最下段、値は文字列、空欄は欠損値）"""
+    header_rows = table.findall('thead/tr')
+    body_rows = [row for body in table.findall('tbody') for row in body.findall('tr')]
+    if not header_rows and not body_rows:
+        body_rows = table.findall('tr')
+    if not header_rows and body_rows:
+        header_rows, body_rows = body_rows[:1], body_rows[1:]
+    if not header_rows:
+        return pd.DataFrame()
+
+    header = [row for row in header_rows if 'over_header' not in (row.get('class') or '').split()]
+    columns = _unique_columns([_cell_text(cell) for cell in (header or header_rows)[-1]])
+
+    records = []
+    for row in body_rows:
+        if _is_header_row(row):
+            continue
+        values = [_cell_text(cell) or None for cell in row]
+        # 列数が合わない行は見出しに合わせて切り詰め・補完する
+        values = (values + [None] * len(columns))[:len(columns)]
+        records.append(values)
+    return pd.DataFrame(records, columns=columns)
+
+
+def extract_table(html, table_id):
+    """HTMLから指定したidのテーブルをDataFrameとして取り出す
+
+    Args:
+        html: HTML文字列
+        table_id: テーブルのid（複数候補をタプルで指定した場合は最初に見つかったもの）
+    Returns:
+        DataFrame（見つからない場合はNone）
+    """
+    table_ids = (table_id,) if isinstance(table_id, str) else tuple(table_id)
+    target = None
+
+    for event, element in _iter_events(html):
+        if event == 'comment':
+            text = element.text or ''
+            # コメント内に埋め込まれたテーブルは、コメントを解析してidを確認する
+            # （属性の引用符の種類などによらず、解析したtable要素のidで判定する）
+            if '<table' in text:
+                df = extract_table(text, table_ids)
+                if df is not None:
+                    return df
+        elif event == 'start':
+            if target is None and element.tag == 'table' and element.get('id') in table_ids:
+                target = element
+        elif element is target:
+            return table_to_frame(target)
+        elif target is None and isinstance(element.tag, str):
+            # 目的のテーブル以外は読み終えた要素から解放してメモリを抑える
+            element.clear()
+    return None
+
+
+def _iter_events(html):
+    """HTMLを少しずつパーサーに渡し、解析イベントを順に返す"""
+    parser = etree.HTMLPullParser(events=('start', 'end', 'comment'))
+    for offset in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[offset:offset + CHUNK_SIZE])
+        yield from parser.read_events()
+    parser.close()
+    yield from parser.read_events()
@@ -0,0 +1,173 @@
+"""
+stats.nba.comからのデータ取得（ライブモード用の非同期取得レイヤー）
+専用スレッドのイベントループで取得を行い、Streamlitのスクリプトスレッドは結果を待つだけにする。
+
+- 同じリクエストが同時に要求された場合は上流への取得を1回にまとめる（single-flight）
+- 有効期限切れのデータは即座に返し、裏で再取得する（stale-while-revalidate）
+- 失敗時はジッター付きの指数バックオフで再試行し、それでも失敗した場合は前回のデータを返す
+"""
+import asyncio
+import concurrent.futures
+import os
+import random
+import threading
+import time
+
+import pandas as pd
+import requests
+
+# 取得先（ローカルの偽エンドポイントでの動作確認用に環境変数で変更可能）
+STATS_BASE_URL = os.environ.get('NBA_STATS_BASE_URL', 'https://stats.nba.com/stats')
+
+# stats.nba.comへのアクセス用ヘッダー（ブロック回避）
+STATS_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Referer': 'https://stats.nba.com/',
+    'Connection': 'keep-alive',
+    'x-nba-stats-origin': 'stats',
+    'x-nba-stats-token': 'true',
+}
+
+# 1回のリクエストのタイムアウト（秒）と再試行の設定
+REQUEST_TIMEOUT_SECONDS = 30
+MAX_ATTEMPTS = 4
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 16.0
+
+# 取得したデータを新しいとみなす期間（秒）
+FRESH_TTL_SECONDS = 3600
+
+
+class StatsRequestError(Exception):
+    """再試行しても取得できなかった場合のエラー"""
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE_SECONDS, cap=BACKOFF_MAX_SECONDS):
+    """attempt回目（0始まり）の失敗後の待機時間（上限付き指数バックオフ + フルジッター）"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def result_set_frame(payload, index=0):
+    """stats.nba.comのレスポンス（resultSets形式）をDataFrameに変換"""
+    result_sets = payload.get('resultSets') or payload.get('resultSet')
+    if isinstance(result_sets, dict):
+        result_sets = [result_sets]
+    result_set = result_sets[index]
+    return pd.DataFrame(result_set['rowSet'], columns=result_set['headers'])
+
+
+class LiveStatsClient:
+    """stats.nba.comの取得結果をキャッシュし、重複リクエストをまとめるクライアント"""
+
+    def __init__(self, base_url=STATS_BASE_URL, headers=STATS_HEADERS, timeout=REQUEST_TIMEOUT_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, backoff_base=BACKOFF_BASE_SECONDS,
+                 backoff_max=BACKOFF_MAX_SECONDS, ttl=FRESH_TTL_SECONDS):
+        self.base_url = base_url.rstrip('/')
+        self.headers = headers
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.ttl = ttl
+        self._session = requests.Session()
+        self._cache = {}
+        self._inflight = {}
+        self.last_errors = {}
+        # 統計情報（上流へのリクエスト数、キャッシュからの応答数など）
+        self.stats = {'upstream_requests': 0, 'fresh_hits': 0, 'stale_hits': 0, 'coalesced': 0, 'failures': 0}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='nba-live-stats', daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """取得中のタスクを取り消してイベントループを停止"""
+        async def cancel_inflight():
+            tasks = list(self._inflight.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(cancel_inflight(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._session.close()
+
+    def get_frame(self, endpoint, parameters, index=0, timeout=None):
+        """エンドポイントの結果をDataFrameで取得（スクリプトスレッドから呼び出す）
+
+        キャッシュが新しければそのまま、古ければ古いデータを返しつつ裏で再取得する。
+        キャッシュがない場合のみ取得完了を待つ（timeout秒を超えた場合、取得は裏で続け、完了後はキャッシュから返す）。
+
+        Raises:
+            StatsRequestError: キャッシュがなく、再試行しても取得できなかった場合・timeout秒以内に取得できなかった場合
+        """
+        future = asyncio.run_coroutine_threadsafe(self.fetch(endpoint, parameters, index), self._loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            raise StatsRequestError(f"{endpoint}を{timeout}秒以内に取得できませんでした（取得は裏で続行します）")
+
+    def fetched_at(self, endpoint, parameters, index=0):
+        """キャッシュしているデータの取得時刻（UNIX時刻、キャッシュがなければNone）"""
+        cached = self._cache.get((endpoint, tuple(sorted(parameters.items())), index))
+        return cached[2] if cached is not None else None
+
+    async def fetch(self, endpoint, parameters, index=0):
+        """get_frameの非同期版（イベントループ上で実行する）"""
+        key = (endpoint, tuple(sorted(parameters.items())), index)
+        cached = self._cache.get(key)
+        if cached is not None:
+            frame, fetched_at, _ = cached
+            if time.monotonic() - fetched_at < self.ttl:
+                self.stats['fresh_hits'] += 1
+                return frame
+            # 期限切れ: 前回のデータを返し、再取得は裏で1回だけ行う
+            self.stats['stale_hits'] += 1
+            self._refresh(key, endpoint, parameters, index)
+            return frame
+        return await asyncio.shield(self._refresh(key, endpoint, parameters, index))
+
+    def _refresh(self, key, endpoint, parameters, index):
+        """取得タスクを開始（同じキーの取得中タスクがあればそれを共有）"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['coalesced'] += 1
+            return task
+        task = self._loop.create_task(self._fetch_with_retry(key, endpoint, parameters, index))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return task
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        # 裏での再取得の失敗は前回のデータで応答済みのため、例外を取り出して警告を抑止
+        if not task.cancelled():
+            task.exception()
+
+    async def _fetch_with_retry(self, key, endpoint, parameters, index):
+        """ジッター付き指数バックオフで再試行しながら取得し、成功したらキャッシュを更新"""
+        url = f"{self.base_url}/{endpoint}"
+        last_error = None
+        for attempt in range(self.max_attempts):
+            try:
+                self.stats['upstream_requests'] += 1
+                payload = await asyncio.to_thread(self._get_json, url, parameters)
+                frame = result_set_frame(payload, index)
+                self._cache[key] = (frame, time.monotonic(), time.time())
+                self.last_errors.pop(key, None)
+                return frame
+            except Exception as e:
+                last_error = e
+                if attempt < self.max_attempts - 1:
+                    await asyncio.sleep(backoff_delay(attempt, self.backoff_base, self.backoff_max))
+        self.stats['failures'] += 1
+        self.last_errors[key] = last_error
+        raise StatsRequestError(f"{endpoint}の取得に{self.max_attempts}回失敗しました: {last_error}")
+
+    def _get_json(self, url, parameters):
+        """HTTP GET（ワーカースレッドで実行）"""
+        response = self._session.get(url, params=parameters, headers=self.headers, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
@@ -1,45 +1,72 @@
+import pandas as pd
 import streamlit as st
-from nba_data_static import NBADataManager
-from components import (
-    display_team_ratings,
-    display_team_players,
-    display_player_search,
-    display_all_players
-)
+from nba_data_static import get_season_store
+from profiling import finish_run, render_overlay, start_run
+from seasons import DEFAULT_SEASON
 from utils import setup_page
 
+# 読み込んだデータは全セッションで共有し、データマネージャーは共有の表の浅いコピーを返すため、
+# 取得した表を変更しても共有の表は変わらないようコピーオンライトを有効にする（pandas 3以降は常に有効）
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 def main():
-    # ページの初期設定
-    setup_page()
-    
-    # NBA データマネージャーのインスタンス化（静的データを使用）
-    nba_manager = NBADataManager(use_static_data=True)
-    
-    # データ更新日時を表示
-    st.sidebar.info(f"📅 データ更新日時: {nba_manager.get_last_updated()}")
-    
-    # ページ選択を上部に移動
-    page = st.selectbox(
-        "ページを選択",
-        ["チームレーティング", "チーム別選手", "選手検索", "全選手レーティング"]
-    )
+    # 処理時間の計測を開始（環境変数 NBA_PROFILE=1 の場合のみ）
+    run = start_run()
     
-    # ページ表示
-    if page == "チームレーティング":
-        st.header("チームレーティング一覧")
-        display_team_ratings(nba_manager)
-        
-    elif page == "チーム別選手":
-        st.header("チーム別選手レーティング")
-        display_team_players(nba_manager)
-        
-    elif page == "選手検索":
-        st.header("選手検索")
-        display_player_search(nba_manager)
-        
-    else:
-        st.header("全選手レーティング")
-        display_all_players(nba_manager)
+    season = page = None
+    try:
+        # ページの初期設定
+        setup_page()
+        
+        # シーズンを選択（データが保存されているシーズンのみ）
+        season_store = get_season_store()
+        seasons = season_store.seasons() or [DEFAULT_SEASON]
+        season = st.sidebar.selectbox("シーズン", seasons)
+        
+        # プロセス共有のNBAデータマネージャーを取得（静的データを使用、初回要求時に読み込み、変更時のみ再読み込み）
+        nba_manager = season_store.get(season)
+        
+        # データ更新日時を表示
+        st.sidebar.info(f"📅 データ更新日時: {nba_manager.get_last_updated()}")
+        
+        # ページ選択を上部に移動
+        page = st.selectbox(
+            "ページを選択",
+            ["チームレーティング", "チーム別選手", "選手検索", "全選手レーティング", "チャート"]
+        )
+        
+        # ページ表示（表示するページのモジュールだけを読み込み、起動時のインポートを減らす）
+        if page == "チームレーティング":
+            st.header("チームレーティング一覧")
+            from components import display_team_ratings
+            display_team_ratings(nba_manager)
+        
+        elif page == "チーム別選手":
+            st.header("チーム別選手レーティング")
+            from components import display_team_players
+            display_team_players(nba_manager)
+        
+        elif page == "選手検索":
+            st.header("選手検索")
+            from components import display_player_search
+            display_player_search(nba_manager)
+        
+        elif page == "全選手レーティング":
+            st.header("全選手レーティング")
+            from components import display_all_players
+            display_all_players(nba_manager)
+        
+        else:
+            st.header("チャート")
+            from components import display_charts
+            display_charts(nba_manager)
+    finally:
+        # Streamlitが再実行を中断した場合（停止・再実行の例外）も計測を終了し、次の再実行の段階を記録しない
+        finish_run(run, season=season, page=page)
+
+    # サイドバーに内訳を表示
+    render_overlay(run)
 
 if __name__ == "__main__":
     main()
@@ -1,68 +1,242 @@
-from nba_api.stats.static import teams
+import numpy as np
 import pandas as pd
 import streamlit as st
+import logging
 import os
+import threading
+import time
+from collections import OrderedDict
+from seasons import DEFAULT_SEASON, available_seasons, data_root, season_dir
+from data_sources import DEFAULT_DATA_SOURCE, DataSource, create_source
+from player_stints import split_player_rows
+from team_metadata import TEAMS_FILE, TeamIndex, load_teams
+from snapshot import compact_types
+from profiling import profiled, stage
+from result_cache import results
+from derived_metrics import (
+    WS_PCTL,
+    WS_PER_36,
+    WS_PER_GAME,
+    WS_TEAM_Z,
+    add_player_metrics,
+    add_team_metrics,
+    team_aggregates
+)
+
+logger = logging.getLogger('nba_data')
+
+# データディレクトリ（環境変数で上書き可能、シーズンごとのデータは data/seasons/<シーズン>/）
+DATA_DIR = os.environ.get('NBA_DATA_DIR', 'data')
+
+# シーズン一覧（データディレクトリ）を確認し直す間隔（秒）
+RELOAD_INTERVAL_SECONDS = 30
+
+# 同時にメモリ上に保持するシーズン数・データ量の上限（超えた場合は最も長く使われていないシーズンを解放）
+MAX_RESIDENT_SEASONS = 3
+MAX_RESIDENT_BYTES = 256 * 1024 * 1024
+
+# 選手の表示列（全選手・検索はリーグ内の指標、チーム別選手はチーム内の指標を表示）
+PLAYER_COLUMNS = ['PLAYER_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', WS_PER_GAME, WS_PER_36, WS_PCTL]
+TEAM_PLAYER_COLUMNS = ['PLAYER_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', WS_PER_GAME, WS_PER_36, WS_TEAM_Z]
+
 
 class NBADataManager:
-    def __init__(self, use_static_data=True):
+    def __init__(self, use_static_data=True, season=DEFAULT_SEASON, data_dir=None, raise_errors=False,
+                 source=None):
         """
         Args:
-            use_static_data: Trueの場合、CSVファイルからデータを読み込む（Streamlit Cloud用）
-                           Falseの場合、APIから直接取得（ローカル開発用）
+            use_static_data: Trueの場合、保存済みのデータファイルから読み込む（Streamlit Cloud用）
+                           Falseの場合、APIから直接取得（ローカル開発用、source='live'と同じ）
+            season: 対象シーズン（'2025-26'形式）
+            data_dir: CSVファイルを格納したディレクトリ（省略時は data/seasons/<シーズン>/）
+            raise_errors: Trueの場合、読み込みエラーを画面に表示せず例外として送出する
+                          （バックグラウンドでの再読み込み用）
+            source: データの取得元（'csv'、'snapshot'、'shared'、'live'またはDataSource。
+                    省略時は環境変数 NBA_DATA_SOURCE、既定は'snapshot'）
         """
-        self.use_static_data = use_static_data
-        self.season = "2025-26"
-        self._teams = teams.get_teams()
+        self.season = season
+        self.data_dir = data_dir or season_dir(DATA_DIR, season)
+        if source is None:
+            source = DEFAULT_DATA_SOURCE if use_static_data else 'live'
+        if not isinstance(source, DataSource):
+            source = create_source(source, season, self.data_dir)
+        self.source = source
+        self.use_static_data = source.name != 'live'
+        self.signature = None
+        if self.use_static_data:
+            # 読み込むデータと同じデータディレクトリのチーム一覧（ない場合は既定のデータディレクトリに同梱のもの）を使い、
+            # 静的データモードではnba_apiをインポートしない
+            teams_dir = data_root(self.data_dir)
+            if not os.path.exists(os.path.join(teams_dir, TEAMS_FILE)):
+                teams_dir = DATA_DIR
+            self._teams = load_teams(teams_dir)
+        else:
+            from nba_api.stats.static import teams
+            with stage('teams.load'):
+                self._teams = teams.get_teams()
+        # チームの各表記（略称・チーム名）からチームのキー（nba_apiの略称）への対応
+        self.team_index = TeamIndex(self._teams)
+        self._team_positions = {}
+        self._team_games = {}
+        self._memo = {}
         
-        if use_static_data:
-            self._load_static_data()
+        if raise_errors:
+            self._read_source()
+        else:
+            self._load_data()
     
-    def _load_static_data(self):
-        """CSVファイルからデータを読み込む"""
+    def _load_data(self):
+        """取得元からデータを読み込む（失敗時は画面にエラーを表示し、空のデータにする）"""
         try:
-            self.team_ratings_cache = pd.read_csv('data/team_ratings.csv')
-            self.player_ratings_cache = pd.read_csv('data/player_ratings.csv')
-            
-            # 更新日時を読み込む
-            if os.path.exists('data/last_updated.txt'):
-                with open('data/last_updated.txt', 'r') as f:
-                    self.last_updated = f.read().strip()
-            else:
-                self.last_updated = "不明"
+            self._read_source()
         except Exception as e:
-            st.error(f"データファイルの読み込みエラー: {e}")
+            st.error(f"データの読み込みエラー: {e}")
             self.team_ratings_cache = pd.DataFrame()
             self.player_ratings_cache = pd.DataFrame()
+            self.player_stints_cache = pd.DataFrame()
             self.last_updated = "エラー"
+            self._team_positions = {}
+            self._team_games = {}
     
-    def get_team_id(self, team_name):
-        """チーム名からチーム略称を取得（Basketball Reference形式）"""
-        team = next((team for team in self._teams if team['full_name'] == team_name), None)
-        return team['abbreviation'] if team else None
+    @profiled('manager.load')
+    def _read_source(self):
+        """取得元からデータを読み込む（失敗時は例外を送出）"""
+        # 読み込み中にデータが更新された場合は次回の確認で再読み込みされるよう、先にシグネチャを取得し、
+        # 記録は読み込みに成功した後で行う（失敗した場合は次回の確認で読み込み直す）
+        with stage('manager.load.signature'):
+            signature = self.source.signature()
+        if self.source.preprocessed:
+            # 処理済みの表（共有メモリに公開された版）はそのまま参照する
+            with stage('manager.load.attach') as s:
+                for attr, df in self.source.load_frames().items():
+                    setattr(self, attr, df)
+                s.rows = len(self.player_stints_cache)
+        else:
+            self._process_source()
+        self.last_updated = self.source.last_updated()
+        
+        self._build_team_index()
+        self.source.commit()
+        self.signature = signature
     
-    def get_team_ratings(self):
-        """チームのレーティングデータを取得"""
-        if self.use_static_data:
-            return self.team_ratings_cache.copy()
+    def _process_source(self):
+        """取得元の表を読み込み、チームの表記の統一・移籍選手の行の分類・派生指標の計算・型の変換を行う"""
+        with stage('manager.load.teams') as s:
+            self.team_ratings_cache = self.source.load_team_ratings()
+            s.rows = len(self.team_ratings_cache)
+        with stage('manager.load.players') as s:
+            player_ratings = self.source.load_player_ratings()
+            s.rows = len(player_ratings)
+        # 選手のチームの略称（Basketball ReferenceのBRK・CHO・PHOなど）をチームのキーにそろえる
+        if 'TEAM_ID' in player_ratings.columns:
+            with stage('manager.load.team_keys'):
+                player_ratings = player_ratings.assign(TEAM_ID=self.team_index.normalize(player_ratings['TEAM_ID']))
+        # 試合数のない行（League Averageなど）はどの画面にも表示されないため除外（スナップショットと同じ）
+        if 'GP' in player_ratings.columns:
+            player_ratings = player_ratings.dropna(subset=['GP']).reset_index(drop=True)
+        # 移籍選手の行はシーズン合計（全選手・検索用）とチームごとの行（チーム別選手用）に分けて保持
+        with stage('manager.load.split'):
+            season_totals, team_stints = split_player_rows(player_ratings)
+        # 派生指標（WS/G、パーセンタイル、チーム内zスコア）はここで一度だけ計算する
+        # （Win Sharesのない取得元（ライブデータ）では、レーティングをWSとして表示しないよう計算しない）
+        if self.source.win_shares:
+            with stage('manager.load.metrics'):
+                player_ratings_cache = add_player_metrics(season_totals)
+                player_stints_cache = add_team_metrics(team_stints)
         else:
-            # APIから取得（ローカル開発用）
-            from nba_data_api import fetch_team_ratings
-            df = fetch_team_ratings(self.season)
-            if df.empty:
-                return pd.DataFrame(columns=['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING'])
-            cols = ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']
-            available_cols = [c for c in cols if c in df.columns]
-            return df[available_cols]
+            player_ratings_cache, player_stints_cache = season_totals, team_stints
+        # 派生指標の計算後に、保持する型をスナップショットと同じ小さい型にする（CSVから読み込んだ場合）
+        with stage('manager.load.compact'):
+            self.team_ratings_cache = compact_types(self.team_ratings_cache)
+            self.player_ratings_cache = compact_types(player_ratings_cache)
+            self.player_stints_cache = compact_types(player_stints_cache)
     
-    def get_player_ratings(self, team_name=None, min_games=20):
-        """選手のレーティングデータを取得"""
-        if self.use_static_data:
-            df = self.player_ratings_cache.copy()
+    @profiled('manager.team_index')
+    def _build_team_index(self):
+        """チーム別選手の取得用インデックスを作成
+
+        チームのキーごとに選手の行位置（チームごとの行の表）を試合数の昇順で保持し、
+        最低試合数の条件は二分探索で適用できるようにする。
+        """
+        self._team_positions = {}
+        self._team_games = {}
+        df = self.player_stints_cache
+        if df.empty or 'TEAM_ID' not in df.columns:
+            return
+        
+        if 'GP' in df.columns:
+            games = df['GP'].to_numpy(dtype='float64', na_value=np.nan)
         else:
-            # APIから取得（ローカル開発用）
-            from nba_data_api import fetch_player_ratings
-            df = fetch_player_ratings(self.season, min_games)
+            # 試合数がない場合はフィルターを適用しない
+            games = np.full(len(df), np.inf)
         
+        for team_id, positions in df.groupby('TEAM_ID', observed=True, sort=False).indices.items():
+            # 試合数が欠損している行はどの条件にも一致しないため除外
+            positions = positions[~np.isnan(games[positions])]
+            order = np.argsort(games[positions], kind='stable')
+            self._team_positions[team_id] = positions[order]
+            self._team_games[team_id] = games[positions][order]
+    
+    @profiled('manager.search_index')
+    def _build_search_index(self):
+        """選手名検索用のインデックスを作成（検索対象は1試合以上出場した選手）"""
+        df = self.player_ratings_cache
+        if df.empty or 'PLAYER_NAME' not in df.columns:
+            return None
+        from player_search import PlayerSearchIndex
+        if 'GP' in df.columns:
+            positions = np.flatnonzero((df['GP'] >= 1).to_numpy())
+        else:
+            positions = np.arange(len(df))
+        names = df['PLAYER_NAME'].to_numpy()[positions]
+        return PlayerSearchIndex(names, positions)
+    
+    def memoize(self, key, compute):
+        """データのバージョンごとに一度だけ計算した結果を返す
+
+        インスタンスは読み込んだ1つのデータバージョンに対応する（データ更新時は
+        新しいインスタンスに差し替わる）ため、インスタンス単位で結果を保持する。
+        """
+        try:
+            return self._memo[key]
+        except KeyError:
+            value = self._memo[key] = compute()
+            return value
+    
+    def memory_usage(self):
+        """読み込んだデータのおおよそのメモリ使用量（バイト）"""
+        def compute():
+            frames = [getattr(self, name, None)
+                      for name in ('team_ratings_cache', 'player_ratings_cache', 'player_stints_cache')]
+            return int(sum(df.memory_usage(deep=True).sum() for df in frames if df is not None))
+        return self.memoize('memory_usage', compute)
+    
+    def get_team_id(self, team_name):
+        """チーム名（略称・「*」付きの名前も可）から選手データのTEAM_IDの値（チームのキー）を取得"""
+        return self.team_index.key(team_name)
+    
+    @profiled('manager.team_ratings')
+    def get_team_ratings(self):
+        """チームのレーティングデータを取得（共有の表の浅いコピー。取得した表は変更しないこと）
+
+        アプリ（main.py）ではコピーオンライトを有効にしているため、変更してもコピーが作られ共有の表は変わらない。
+        """
+        return self.team_ratings_cache.copy(deep=False)
+    
+    @profiled('manager.player_ratings')
+    def get_player_ratings(self, team_name=None, min_games=20):
+        """選手のレーティングデータを取得
+
+        全選手の表は最低試合数ごとにデータのバージョンごとに一度だけ作成し、全セッションで共有する。
+        """
+        if team_name:
+            return self._get_team_players(team_name, min_games)
+        return self.memoize(('player_ratings', min_games),
+                            lambda: self._filter_players(min_games)).copy(deep=False)
+    
+    def _filter_players(self, min_games):
+        """最低試合数を満たす選手の表示列"""
+        df = self.player_ratings_cache
         if df.empty:
             return pd.DataFrame()
         
@@ -70,39 +244,241 @@ class NBADataManager:
         if 'GP' in df.columns:
             df = df[df['GP'] >= min_games]
         
-        if team_name:
-            team_id = self.get_team_id(team_name)
-            if team_id:
-                df = df[df['TEAM_ID'] == team_id]
-            else:
-                st.warning(f"チーム '{team_name}' が見つかりませんでした。")
-                return pd.DataFrame()
-        
-        cols = ['PLAYER_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP']
-        available_cols = [c for c in cols if c in df.columns]
+        available_cols = [c for c in PLAYER_COLUMNS if c in df.columns]
         return df[available_cols]
     
-    def search_players(self, player_names):
-        """選手名で検索"""
-        all_players = self.get_player_ratings(min_games=1)
-        if all_players.empty:
+    @profiled('manager.team_aggregates')
+    def get_team_aggregates(self):
+        """チームごとの集計（在籍選手数、OWS・DWS・WSの合計、WS最多の選手）を取得
+
+        Win Sharesのない取得元（ライブデータ）では、レーティングの合計をWSとして表示しないよう空の表を返す。
+        """
+        if not self.source.win_shares:
+            return team_aggregates(self.player_stints_cache.iloc[:0])
+        return self.memoize('team_aggregates', lambda: team_aggregates(self.player_stints_cache))
+    
+    def get_chart_data(self, name):
+        """グラフ用のデータを取得（データのバージョンごとに一度だけ作成）
+
+        Args:
+            name: 'team_scatter'（チームのORtg・DRtg）、'player_scatter'（選手のOWS・DWS、間引き済み）、
+                  'roster_distribution'（チームごとのWSの分布）、'comparison'（選手比較用の表）
+        """
+        import chart_data
+        builders = {
+            'team_scatter': lambda: chart_data.team_scatter(self.team_ratings_cache),
+            'player_scatter': lambda: chart_data.player_scatter(self.player_ratings_cache),
+            'roster_distribution': lambda: chart_data.roster_distribution(self.player_stints_cache),
+            'comparison': lambda: chart_data.comparison_table(self.player_ratings_cache),
+        }
+        with stage(f'chart.{name}'):
+            return self.memoize(f'chart_{name}', builders[name])
+    
+    def _get_team_players(self, team_name, min_games):
+        """インデックスを使ってチームの選手データを取得（チーム・最低試合数ごとにデータのバージョンごとに一度だけ作成）"""
+        if self.player_stints_cache.empty:
             return pd.DataFrame()
+        
+        team_id = self.get_team_id(team_name)
+        if not team_id:
+            st.warning(f"チーム '{team_name}' が見つかりませんでした。")
+            return pd.DataFrame()
+        
+        return self.memoize(('team_players', team_id, min_games),
+                            lambda: self._select_team_players(team_id, min_games)).copy(deep=False)
+    
+    def _select_team_players(self, team_id, min_games):
+        """チームの選手の表示列（チームの選手数に比例するコスト）"""
+        df = self.player_stints_cache
+        col_positions = [df.columns.get_loc(c) for c in TEAM_PLAYER_COLUMNS if c in df.columns]
+        positions = self._team_positions.get(team_id)
+        if positions is None:
+            return df.iloc[:0, col_positions]
+        
+        # 試合数の昇順に並んでいるため、条件を満たすのは二分探索で求めた位置以降
+        start = np.searchsorted(self._team_games[team_id], min_games, side='left')
+        # 元の行順を維持して返す
+        rows = np.sort(positions[start:])
+        return df.iloc[rows, col_positions]
+    
+    @profiled('manager.search_players')
+    def search_players(self, player_names, mode='substring'):
+        """選手名で検索
 
-        matched_dfs = []
-        valid_names = [name for name in player_names if name]
+        Args:
+            player_names: 検索する選手名（部分文字列）のリスト
+            mode: 'substring'（部分一致）、'prefix'（前方一致）、'fuzzy'（あいまい検索）
         
-        for name in valid_names:
-            matched = all_players[all_players['PLAYER_NAME'].str.contains(name, case=False, na=False)]
-            matched_dfs.append(matched)
+        インデックスを使って検索し、クエリごとに一致度順で返す（重複は除外）。
+        """
+        # インデックスは起動時ではなく最初の検索時に作成する（データのバージョンごとに1回）
+        search_index = self.memoize('search_index', self._build_search_index)
+        if search_index is None:
+            return pd.DataFrame()
         
-        if not matched_dfs:
+        valid_names = [name for name in player_names if name]
+        positions = [search_index.search(name, mode=mode) for name in valid_names]
+        if not positions:
             return pd.DataFrame()
         
-        return pd.concat(matched_dfs).drop_duplicates()
+        # 複数クエリに一致した選手は最初に一致した位置に残す
+        rows = pd.unique(np.concatenate(positions))
+        df = self.player_ratings_cache
+        return df.iloc[rows, [df.columns.get_loc(c) for c in PLAYER_COLUMNS if c in df.columns]]
     
     def get_last_updated(self):
         """データの最終更新日時を取得"""
-        if self.use_static_data:
-            return self.last_updated
-        else:
-            return "リアルタイム"
+        return self.last_updated
+
+
+class SharedDataManager:
+    """プロセス全体で共有する読み取り専用のNBADataManager
+
+    取得元のシグネチャ（公開中の版のID、ファイルのmtime/サイズ、ライブデータの取得時刻）を取得元ごとの間隔で
+    バックグラウンドで確認し、変更があった場合のみ新しいインスタンスを読み込んで差し替える。
+    get()はI/Oを行わない。
+    """
+
+    def __init__(self, season=DEFAULT_SEASON, data_dir=None, interval=None, source=None):
+        """
+        Args:
+            interval: 変更を確認する間隔（秒、省略時は取得元のrefresh_interval）
+            source: データの取得元（NBADataManagerと同じ）
+        """
+        self.season = season
+        self.data_dir = data_dir or season_dir(DATA_DIR, season)
+        self._manager = NBADataManager(season=season, data_dir=self.data_dir, source=source)
+        self.interval = interval or self._manager.source.refresh_interval
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._watch, name=f"nba-data-watcher-{season}", daemon=True)
+        self._thread.start()
+
+    def get(self):
+        """現在のNBADataManagerを取得（I/Oなし）"""
+        return self._manager
+
+    def stop(self):
+        """監視スレッドを停止"""
+        self._stop_event.set()
+
+    def _watch(self):
+        """データの変更を監視し、変更時に再読み込み"""
+        while not self._stop_event.wait(self.interval):
+            self.reload_if_changed()
+
+    def reload_if_changed(self):
+        """シグネチャが変わっていれば再読み込みし、差し替えた場合はTrueを返す"""
+        source = self._manager.source
+        try:
+            if source.signature() == self._manager.signature:
+                return False
+            manager = NBADataManager(season=self.season, data_dir=self.data_dir,
+                                     raise_errors=True, source=source)
+        except Exception as e:
+            # 書き込み途中などで読み込めない場合は現在のデータを維持し、次回再試行する
+            logger.warning("データの再読み込みに失敗しました（前回のデータを継続使用）: %s", e)
+            return False
+        # 参照の差し替えはアトミックなため、読み取り側のロックは不要
+        self._manager = manager
+        # 更新前のバージョンの表示用の表を解放（キーにバージョンを含むため、解放前でも表示されることはない）
+        results.invalidate(self.data_dir, keep_version=manager.signature)
+        return True
+
+
+class SeasonStore:
+    """シーズンごとのSharedDataManagerを初めて要求された時点で読み込み、LRUで保持量を制限する
+
+    保持シーズン数（max_seasons）またはデータ量（max_bytes）が上限を超えた場合は、
+    最も長く使われていないシーズンから解放する（直近に読み込んだシーズンは常に保持）。
+    """
+
+    def __init__(self, data_dir=DATA_DIR, max_seasons=MAX_RESIDENT_SEASONS,
+                 max_bytes=MAX_RESIDENT_BYTES, interval=None, source=None):
+        """
+        Args:
+            interval: シーズン一覧・データの変更を確認する間隔（秒、省略時は取得元ごとの既定値）
+            source: データの取得元の名前（省略時は環境変数 NBA_DATA_SOURCE、既定は'snapshot'）
+        """
+        self.data_dir = data_dir
+        self.max_seasons = max_seasons
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.source = source or DEFAULT_DATA_SOURCE
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._seasons = None
+        self._seasons_checked_at = 0.0
+        # LRUの統計情報
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def seasons(self):
+        """データが保存されているシーズンの一覧（新しい順、一定間隔でのみディレクトリを確認）"""
+        now = time.monotonic()
+        if self._seasons is None or now - self._seasons_checked_at > (self.interval or RELOAD_INTERVAL_SECONDS):
+            self._seasons = available_seasons(self.data_dir)
+            self._seasons_checked_at = now
+        return self._seasons
+
+    def get(self, season=DEFAULT_SEASON):
+        """シーズンのNBADataManagerを取得（未読み込みの場合のみ読み込む）"""
+        with self._lock:
+            shared = self._lookup(season)
+            if shared is not None:
+                self.hits += 1
+                return shared.get()
+            self.misses += 1
+            load_lock = self._load_locks.setdefault(season, threading.Lock())
+
+        # 同じシーズンの読み込みは1回だけ行い、同時に要求したセッションはその完了を待つ
+        with load_lock:
+            with self._lock:
+                shared = self._lookup(season)
+            if shared is None:
+                shared = SharedDataManager(season=season, data_dir=season_dir(self.data_dir, season),
+                                           interval=self.interval, source=self.source)
+                with self._lock:
+                    self._entries[season] = shared
+                    self._evict()
+        return shared.get()
+
+    def _lookup(self, season):
+        """保持中のシーズンを取得し、最近使われたものとして記録（ロック内で呼び出す）"""
+        shared = self._entries.get(season)
+        if shared is not None:
+            self._entries.move_to_end(season)
+        return shared
+
+    def _evict(self):
+        """上限を超えている間、最も長く使われていないシーズンを解放（ロック内で呼び出す）"""
+        while len(self._entries) > 1 and (
+            len(self._entries) > self.max_seasons or self._resident_bytes() > self.max_bytes
+        ):
+            _, shared = self._entries.popitem(last=False)
+            shared.stop()
+            results.invalidate(shared.data_dir)
+            self.evictions += 1
+
+    def _resident_bytes(self):
+        return sum(shared.get().memory_usage() for shared in self._entries.values())
+
+    def stats(self):
+        """LRUの統計情報（保持中のシーズン、データ量、ヒット・ミス・解放の回数）"""
+        with self._lock:
+            return {
+                'resident_seasons': list(self._entries),
+                'resident_bytes': self._resident_bytes(),
+                'max_seasons': self.max_seasons,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+
+@st.cache_resource
+def get_season_store():
+    """プロセス共有のSeasonStoreを取得"""
+    return SeasonStore()
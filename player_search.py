@@ -0,0 +1,162 @@
+"""
+選手名検索用のインデックス
+アクセント除去・小文字化した選手名にn-gramの転置インデックスを作成し、
+部分一致・前方一致・あいまい検索（タイプミス許容、類似度順）を行う
+"""
+import bisect
+import difflib
+import unicodedata
+from collections import defaultdict
+
+import numpy as np
+
+NGRAM_SIZE = 3
+
+# 検索モード（UIの表示名 → モード）
+SEARCH_MODES = {
+    '部分一致': 'substring',
+    '前方一致': 'prefix',
+    'あいまい検索': 'fuzzy',
+}
+
+# あいまい検索で類似度を再計算する候補数と、結果に含める最低類似度
+FUZZY_CANDIDATES = 200
+FUZZY_MIN_SCORE = 0.6
+
+# NFKD分解でアクセントが外れない文字の置き換え
+_FOLD_TABLE = str.maketrans({
+    'ø': 'o', 'đ': 'd', 'ł': 'l', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ı': 'i', 'þ': 'th',
+})
+
+
+def normalize_name(name):
+    """検索用に名前を正規化（アクセント除去・大文字小文字の統一・空白の整理）"""
+    if not isinstance(name, str):
+        return ''
+    decomposed = unicodedata.normalize('NFKD', name.casefold())
+    folded = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(folded.translate(_FOLD_TABLE).split())
+
+
+def _ngrams(text):
+    """文字列のn-gram集合"""
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class PlayerSearchIndex:
+    """選手名のn-gram転置インデックス
+
+    検索結果は元のDataFrameの行位置（positions）で返す。
+    """
+
+    def __init__(self, names, positions=None):
+        """
+        Args:
+            names: 選手名のシーケンス
+            positions: 各選手名に対応する行位置（省略時は0からの連番）
+        """
+        self._names = [normalize_name(name) for name in names]
+        self._positions = np.arange(len(self._names)) if positions is None else np.asarray(positions)
+
+        postings = defaultdict(list)
+        tokens = []
+        for i, name in enumerate(self._names):
+            # 前後に空白を付けて語頭・語末のn-gramも登録する（あいまい検索用）
+            for gram in _ngrams(f" {name} "):
+                postings[gram].append(i)
+            for token in set(name.split()):
+                tokens.append((token, i))
+        self._postings = {gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()}
+        # 前方一致用にトークンをソートしておく
+        tokens.sort()
+        self._tokens = [token for token, _ in tokens]
+        self._token_ids = [i for _, i in tokens]
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, query, mode='substring', limit=None):
+        """クエリに一致する行位置を一致度の高い順に返す"""
+        query = normalize_name(query)
+        if not query:
+            return np.array([], dtype=np.int64)
+        if mode == 'prefix':
+            ids = self._search_prefix(query)
+        elif mode == 'fuzzy':
+            ids = self._search_fuzzy(query)
+        else:
+            ids = self._search_substring(query)
+        if limit is not None:
+            ids = ids[:limit]
+        return self._positions[np.asarray(ids, dtype=np.int64)]
+
+    def _rank(self, query, ids):
+        """完全一致 → 名前の先頭一致 → 語頭一致 → その他の順に並べる（同順位は元の順序）"""
+        def rank(i):
+            name = self._names[i]
+            if name == query:
+                return 0
+            if name.startswith(query):
+                return 1
+            if f" {query}" in name:
+                return 2
+            return 3
+        return sorted(ids, key=lambda i: (rank(i), i))
+
+    def _candidates(self, grams):
+        """すべてのn-gramを含む候補（短い転置リストから順に積集合を取る）"""
+        lists = sorted((self._postings.get(gram) for gram in grams), key=lambda ids: 0 if ids is None else len(ids))
+        if lists[0] is None:
+            return np.array([], dtype=np.int64)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return candidates
+
+    def _search_substring(self, query):
+        """部分一致検索"""
+        if len(query) >= NGRAM_SIZE:
+            candidates = self._candidates(_ngrams(query))
+        else:
+            # n-gramを作れない短いクエリは全件を確認する
+            candidates = range(len(self._names))
+        return self._rank(query, [i for i in candidates if query in self._names[i]])
+
+    def _search_prefix(self, query):
+        """前方一致検索（名・姓など、いずれかの語の先頭から一致）"""
+        first = query.split()[0]
+        start = bisect.bisect_left(self._tokens, first)
+        ids = set()
+        for j in range(start, len(self._tokens)):
+            if not self._tokens[j].startswith(first):
+                break
+            ids.add(self._token_ids[j])
+        return self._rank(query, [i for i in ids if self._names[i].startswith(query) or f" {query}" in self._names[i]])
+
+    def _search_fuzzy(self, query):
+        """あいまい検索（共有n-gram数で候補を絞り込み、編集類似度の高い順に返す）"""
+        postings = [self._postings[gram] for gram in _ngrams(f" {query} ") if gram in self._postings]
+        if not postings:
+            return []
+        ids, counts = np.unique(np.concatenate(postings), return_counts=True)
+        top = ids[np.argsort(-counts, kind='stable')[:FUZZY_CANDIDATES]]
+
+        query_tokens = query.split()
+        scored = []
+        for i in top:
+            name = self._names[i]
+            score = difflib.SequenceMatcher(None, query, name).ratio()
+            name_tokens = name.split()
+            width = len(query_tokens)
+            # 名前の一部（クエリと同じ語数の連続部分）との類似度も考慮する
+            for k in range(len(name_tokens) - width + 1):
+                part = ' '.join(name_tokens[k:k + width])
+                score = max(score, difflib.SequenceMatcher(None, query, part).ratio())
+            if query in name:
+                score = 1.0
+            if score >= FUZZY_MIN_SCORE:
+                scored.append((-score, i))
+        scored.sort()
+        return [i for _, i in scored]
@@ -0,0 +1,74 @@
+"""
+複数チームに在籍した選手（シーズン途中の移籍）の行の分類
+Basketball Referenceの選手テーブルでは、移籍した選手はチームごとの行に加えて
+合計行（TEAM_IDが'2TM'/'3TM'など）を持つ。取り込み時に各行を分類しておき、
+シーズン合計（1選手1行）とチーム在籍期間ごとの行の2つの表を作成する。
+"""
+import numpy as np
+import pandas as pd
+
+ROW_TYPE_COLUMN = 'ROW_TYPE'
+
+# 選手IDの列（取得元にある場合は同名の選手の区別に使う）
+PLAYER_ID_COLUMN = 'PLAYER_ID'
+
+# 行の種類
+SINGLE = 'single'  # 1チームのみに在籍した選手の行（シーズン合計かつチームの行）
+TOTAL = 'total'    # 複数チームに在籍した選手のシーズン合計行（2TM/3TMなど）
+STINT = 'stint'    # 複数チームに在籍した選手のチームごとの行
+
+# 合計行のTEAM_ID（'2TM'、'3TM'など）
+MULTI_TEAM_PATTERN = r'\d+TM'
+
+
+def classify_rows(df):
+    """各行に種類（single / total / stint）の列を追加したDataFrameを返す
+
+    選手IDの列（PLAYER_ID）があれば選手IDごとに、なければBasketball Referenceの行の順
+    （合計行の直後に同じ選手のチームごとの行が続く）で合計行とチームごとの行を対応付ける。
+    同名の別の選手を同じ選手として扱わないよう、名前だけでの表全体のグループ化はしない。
+    """
+    df = df.copy()
+    if df.empty or 'TEAM_ID' not in df.columns or 'PLAYER_NAME' not in df.columns:
+        df[ROW_TYPE_COLUMN] = SINGLE
+        return df
+
+    team = df['TEAM_ID'].astype('string')
+    is_total = team.str.fullmatch(MULTI_TEAM_PATTERN).fillna(False).to_numpy(dtype=bool)
+    if PLAYER_ID_COLUMN in df.columns and df[PLAYER_ID_COLUMN].notna().all():
+        # 合計行を持つ選手のそれ以外の行はチームごとの行（選手IDごとに1回のgroupbyで判定）
+        is_stint = (pd.Series(is_total, index=df.index)
+                    .groupby(df[PLAYER_ID_COLUMN], sort=False)
+                    .transform('any')
+                    .to_numpy(dtype=bool)) & ~is_total
+    else:
+        # 合計行、または前の行と名前が異なる行から新しいブロックを始める
+        name = df['PLAYER_NAME'].to_numpy(dtype=object)
+        starts = is_total.copy()
+        starts[0] = True
+        starts[1:] |= name[1:] != name[:-1]
+        start_rows = np.flatnonzero(starts)
+        block = np.cumsum(starts) - 1
+        position = np.arange(len(df)) - start_rows[block]
+        # 合計行から始まるブロックの、チーム数（'2TM'なら2）までの後続の行がチームごとの行
+        stints = np.zeros(len(df))
+        stints[is_total] = pd.to_numeric(team[is_total].str[:-2], errors='coerce')
+        is_stint = (position > 0) & (position <= stints[start_rows][block])
+    df[ROW_TYPE_COLUMN] = np.where(is_total, TOTAL, np.where(is_stint, STINT, SINGLE))
+    return df
+
+
+def split_player_rows(df):
+    """選手データをシーズン合計（1選手1行）とチーム在籍期間ごとの行に分ける
+
+    分類列がない場合（分類前に保存されたデータ）はここで分類する。
+
+    Returns:
+        (シーズン合計のDataFrame, チームごとの行のDataFrame)
+    """
+    if ROW_TYPE_COLUMN not in df.columns:
+        df = classify_rows(df)
+    row_type = df[ROW_TYPE_COLUMN].astype('string').to_numpy()
+    season_totals = df[row_type != STINT].reset_index(drop=True)
+    team_stints = df[row_type != TOTAL].reset_index(drop=True)
+    return season_totals, team_stints
@@ -0,0 +1,285 @@
+"""
+処理時間の計測（オプトイン、環境変数 NBA_PROFILE=1 で有効）
+データマネージャーの各処理・各ページの表示処理の時間と行数を段階（stage）ごとに記録する。
+
+- 1回の再実行（rerun）分の内訳はサイドバーに表示できる
+- 全体の集計はPrometheusのテキスト形式でローカルのエンドポイント（/metrics）から取得できる
+- 再実行ごとの内訳はJSON形式でログ（ロガー名: nba_profile）に出力する
+
+無効の場合、デコレーターは元の関数をそのまま返し、stage()は何もしないため計測のコストはかからない。
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+
+ENABLED = os.environ.get('NBA_PROFILE', '').lower() in ('1', 'true', 'yes')
+# /metricsを公開するポート（0の場合は公開しない）
+METRICS_PORT = int(os.environ.get('NBA_PROFILE_PORT', '9464'))
+METRICS_HOST = '127.0.0.1'
+
+# 処理時間のヒストグラムの区切り（秒）
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+logger = logging.getLogger('nba_profile')
+
+
+class _Stats:
+    """1つの段階の累計（回数・合計時間・ヒストグラム・行数）"""
+    __slots__ = ('count', 'seconds', 'buckets', 'rows')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.rows = 0
+
+
+class Registry:
+    """プロセス全体の段階ごとの累計（複数セッションのスレッドから更新される）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._collectors = []
+        self.runs = 0
+        self.run_seconds = 0.0
+
+    def record(self, name, seconds, rows=None):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _Stats()
+            stats.count += 1
+            stats.seconds += seconds
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    stats.buckets[i] += 1
+            if rows is not None:
+                stats.rows += rows
+
+    def record_run(self, seconds):
+        with self._lock:
+            self.runs += 1
+            self.run_seconds += seconds
+
+    def add_collector(self, collect):
+        """/metricsに含める他の計測値を追加（collect()はテキスト形式の行のリストを返す）"""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def prometheus_text(self):
+        """Prometheusのテキスト形式（exposition format）"""
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                '# HELP nba_rerun_seconds Streamlit rerun duration.',
+                '# TYPE nba_rerun_seconds summary',
+                f'nba_rerun_seconds_count {self.runs}',
+                f'nba_rerun_seconds_sum {self.run_seconds:.6f}',
+                '# HELP nba_stage_seconds Duration of instrumented stages.',
+                '# TYPE nba_stage_seconds histogram',
+            ]
+            for name, stats in stages:
+                for bound, count in zip(BUCKETS, stats.buckets):
+                    lines.append(f'nba_stage_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+                lines.append(f'nba_stage_seconds_bucket{{stage="{name}",le="+Inf"}} {stats.count}')
+                lines.append(f'nba_stage_seconds_sum{{stage="{name}"}} {stats.seconds:.6f}')
+                lines.append(f'nba_stage_seconds_count{{stage="{name}"}} {stats.count}')
+            lines += [
+                '# HELP nba_stage_rows_total Rows returned by instrumented stages.',
+                '# TYPE nba_stage_rows_total counter',
+            ]
+            lines += [f'nba_stage_rows_total{{stage="{name}"}} {stats.rows}' for name, stats in stages]
+            collectors = list(self._collectors)
+        for collect in collectors:
+            lines += collect()
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+_local = threading.local()
+_server = None
+_server_started = False
+_server_lock = threading.Lock()
+
+
+class Run:
+    """1回の再実行で記録した段階の一覧（(段階名, 秒, 行数, 階層)）"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = []
+        self.depth = 0
+        self.seconds = None
+
+
+class _Stage:
+    """段階の計測（with文で使用し、rowsに行数を設定できる）"""
+    __slots__ = ('name', 'rows', '_start', '_run', '_index', '_depth')
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = None
+
+    def __enter__(self):
+        run = self._run = getattr(_local, 'run', None)
+        if run is not None:
+            # 内訳は開始順に並べるため、入れ子の段階より先に位置を確保しておく
+            self._index = len(run.stages)
+            self._depth = run.depth
+            run.stages.append(None)
+            run.depth += 1
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._start
+        registry.record(self.name, seconds, self.rows)
+        run = self._run
+        if run is not None:
+            run.depth -= 1
+            run.stages[self._index] = (self.name, seconds, self.rows, self._depth)
+        return False
+
+
+class _NullStage:
+    """無効時の何もしない段階"""
+    __slots__ = ()
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """処理の一部を段階として計測するコンテキストマネージャー
+
+    Examples:
+        with stage('manager.load.players') as s:
+            df = load()
+            s.rows = len(df)
+    """
+    return _Stage(name) if ENABLED else _NULL_STAGE
+
+
+def _row_count(value):
+    """戻り値の行数（DataFrameなどの表形式のみ）"""
+    shape = getattr(value, 'shape', None)
+    return shape[0] if shape else None
+
+
+def profiled(name):
+    """関数を段階として計測するデコレーター（戻り値がDataFrameの場合は行数も記録）"""
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with _Stage(name) as s:
+                value = func(*args, **kwargs)
+                s.rows = _row_count(value)
+            return value
+        return wrapper
+    return decorator
+
+
+def start_run():
+    """再実行の計測を開始（無効時はNone）"""
+    if not ENABLED:
+        return None
+    start_metrics_server()
+    run = _local.run = Run()
+    return run
+
+
+def finish_run(run, **fields):
+    """再実行の計測を終了し、累計への反映とログ出力を行う"""
+    if run is None:
+        return
+    _local.run = None
+    run.seconds = time.perf_counter() - run.started
+    registry.record_run(run.seconds)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({
+            'event': 'rerun',
+            'seconds': round(run.seconds, 6),
+            **fields,
+            'stages': [{'stage': name, 'seconds': round(seconds, 6), 'rows': rows, 'depth': depth}
+                       for name, seconds, rows, depth in run.stages],
+        }, ensure_ascii=False))
+
+
+def start_metrics_server(port=None):
+    """/metricsエンドポイントを別スレッドで開始（プロセスで1回、ポート0の場合は開始しない）
+
+    Returns:
+        待ち受けているポート番号（開始しない場合はNone）
+    """
+    global _server, _server_started
+    port = METRICS_PORT if port is None else port
+    with _server_lock:
+        if _server_started:
+            return _server.server_address[1] if _server is not None else None
+        _server_started = True
+        if not port:
+            return None
+        import http.server
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = registry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        try:
+            _server = http.server.ThreadingHTTPServer((METRICS_HOST, port), Handler)
+        except OSError as e:
+            # 同じポートを別プロセスが使用している場合は公開せずに計測だけ行う
+            logger.warning(f"/metricsを公開できませんでした（ポート{port}）: {e}")
+            return None
+        threading.Thread(target=_server.serve_forever, name='nba-profile-metrics', daemon=True).start()
+        return _server.server_address[1]
+
+
+def render_overlay(run):
+    """再実行の内訳をサイドバーに表示（チェックボックスで表示を切り替え）"""
+    if run is None:
+        return
+    import pandas as pd
+    import streamlit as st
+
+    seconds = run.seconds if run.seconds is not None else time.perf_counter() - run.started
+    if not st.sidebar.checkbox("⏱ 処理時間を表示", key="profile_overlay"):
+        return
+    # 入れ子の段階は階層に応じて字下げする（終了していない段階は除く）
+    stages = [entry for entry in run.stages if entry is not None]
+    breakdown = pd.DataFrame({
+        '段階': ['　' * depth + name for name, _, _, depth in stages],
+        'ms': [round(stage_seconds * 1000, 2) for _, stage_seconds, _, _ in stages],
+        '行数': pd.array([rows for _, _, rows, _ in stages], dtype='Int64'),
+    })
+    st.sidebar.caption(f"この再実行: {seconds * 1000:.1f}ms（記録した段階: {len(stages)}）")
+    if stages:
+        st.sidebar.dataframe(breakdown, hide_index=True, use_container_width=True)
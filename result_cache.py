@@ -0,0 +1,153 @@
+"""
+表示用の表（並び替え・ページ分割・整形済みのDataFrame）のプロセス共有キャッシュ
+キーは (データディレクトリ, データのバージョン, 表示条件)。同じチーム・並び順を見るセッションは
+作成済みの表をそのまま描画し、pandasの処理を行わない。
+
+- 保持量はエントリ数とデータ量（バイト）で制限し、超えた場合は最も長く使われていない表から解放する
+- データのバージョン（NBADataManager.signature）をキーに含めるため、更新前の表が表示されることはない。
+  更新前のバージョンの表はSharedDataManagerの差し替え時に解放する
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+from profiling import registry
+
+# 保持する表の数・データ量の上限
+MAX_ENTRIES = 2048
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _size_of(value):
+    """キャッシュする値のおおよそのメモリ使用量（バイト）
+
+    表示用の表は文字列の列が中心のため、DataFrame.memory_usage(deep=True)（列ごとに集計するため表の作成より遅い）
+    ではなく、値の配列と各要素の大きさから求める。
+    """
+    to_numpy = getattr(value, 'to_numpy', None)
+    if to_numpy is None:
+        return sys.getsizeof(value)
+    values = to_numpy()
+    size = values.nbytes
+    if values.dtype == object:
+        size += sum(map(sys.getsizeof, values.ravel()))
+    return size
+
+
+class ResultCache:
+    """LRUで保持量を制限する表示用の表のキャッシュ（複数セッションのスレッドから使用される）
+
+    同じキーの表を複数のセッションが同時に作成した場合は、後から作成した方で置き換える。
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        # LRUの統計情報
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, namespace, version, view, compute):
+        """表示条件に対応する表を取得（ない場合はcompute()で作成して保持）
+
+        Args:
+            namespace: データの識別子（シーズンのデータディレクトリ）
+            version: データのバージョン（Noneの場合は読み込みに失敗したデータとして保持しない）
+            view: ページ名と表示条件のタプル
+        """
+        key = (namespace, version, view)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        value = compute()
+        if version is None:
+            return value
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return value
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        """上限を超えている間、最も長く使われていない表を解放（ロック内で呼び出す）"""
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.bytes -= size
+            self.evictions += 1
+
+    def invalidate(self, namespace, keep_version=None):
+        """データの表を解放（keep_versionを指定した場合はそのバージョンの表を残す）
+
+        Returns:
+            解放した表の数
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == namespace and key[1] != keep_version]
+            for key in keys:
+                _, size = self._entries.pop(key)
+                self.bytes -= size
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        """LRUの統計情報（保持中の表の数、データ量、ヒット・ミス・解放の回数）"""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def prometheus_lines(self):
+        """/metrics用のテキスト形式の行"""
+        stats = self.stats()
+        return [
+            '# HELP nba_result_cache_requests_total Display table cache lookups.',
+            '# TYPE nba_result_cache_requests_total counter',
+            f'nba_result_cache_requests_total{{result="hit"}} {stats["hits"]}',
+            f'nba_result_cache_requests_total{{result="miss"}} {stats["misses"]}',
+            '# HELP nba_result_cache_evictions_total Display tables released by the LRU limit.',
+            '# TYPE nba_result_cache_evictions_total counter',
+            f'nba_result_cache_evictions_total {stats["evictions"]}',
+            '# HELP nba_result_cache_invalidations_total Display tables released after a data update.',
+            '# TYPE nba_result_cache_invalidations_total counter',
+            f'nba_result_cache_invalidations_total {stats["invalidations"]}',
+            '# HELP nba_result_cache_bytes Approximate size of cached display tables.',
+            '# TYPE nba_result_cache_bytes gauge',
+            f'nba_result_cache_bytes {stats["bytes"]}',
+            '# HELP nba_result_cache_entries Number of cached display tables.',
+            '# TYPE nba_result_cache_entries gauge',
+            f'nba_result_cache_entries {stats["entries"]}',
+        ]
+
+
+# プロセス全体で共有するキャッシュ（ヒット・ミスの回数などは/metricsにも含める）
+results = ResultCache()
+registry.add_collector(results.prometheus_lines)
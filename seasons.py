@@ -0,0 +1,53 @@
+"""
+シーズンごとのデータ配置
+各シーズンのデータは data/seasons/<シーズン>/ に保存する（例: data/seasons/2025-26/）
+"""
+import os
+import re
+
+# 既定のシーズン（今シーズン）
+DEFAULT_SEASON = "2025-26"
+
+SEASONS_DIR = 'seasons'
+
+_SEASON_PATTERN = re.compile(r'^(\d{4})-(\d{2})$')
+
+
+def is_valid_season(season):
+    """'2025-26'形式のシーズン表記か"""
+    return bool(_SEASON_PATTERN.match(season or ''))
+
+
+def season_dir(data_dir, season):
+    """シーズンのデータディレクトリ"""
+    if not is_valid_season(season):
+        raise ValueError(f"シーズンは'2025-26'の形式で指定してください: {season}")
+    return os.path.join(data_dir, SEASONS_DIR, season)
+
+
+def data_root(path):
+    """シーズンのデータディレクトリ（data/seasons/<シーズン>/）からデータディレクトリ（data/）を求める
+
+    シーズンごとの配置でない場合はpathをそのまま返す。
+    """
+    path = os.path.normpath(path)
+    parent = os.path.dirname(path)
+    if is_valid_season(os.path.basename(path)) and os.path.basename(parent) == SEASONS_DIR:
+        return os.path.dirname(parent) or os.curdir
+    return path
+
+
+def available_seasons(data_dir):
+    """データが保存されているシーズンの一覧（新しい順）"""
+    root = os.path.join(data_dir, SEASONS_DIR)
+    if not os.path.isdir(root):
+        return []
+    return sorted((name for name in os.listdir(root)
+                   if is_valid_season(name) and os.path.isdir(os.path.join(root, name))), reverse=True)
+
+
+def bref_season_year(season):
+    """Basketball Referenceのシーズン表記（2025-26シーズンは2026）"""
+    if not is_valid_season(season):
+        raise ValueError(f"シーズンは'2025-26'の形式で指定してください: {season}")
+    return str(int(season[:4]) + 1)
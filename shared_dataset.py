@@ -0,0 +1,186 @@
+"""
+ワーカープロセス間で共有する処理済みデータ（共有メモリ上のメモリマップファイル）
+ローダープロセス（python shared_dataset.py publish）がデータを一度だけ読み込み、チームの表記の統一・
+派生指標の計算・型の変換を済ませた表を、非圧縮のArrow IPC形式で共有メモリ（/dev/shm）に書き出す。
+各ワーカー（NBA_DATA_SOURCE=shared）はファイルをメモリマップで参照するため、数値列・文字列の列
+（pyarrowの文字列型）はプロセス間で同じ物理メモリを共有し、ワーカーごとのCSVの解析・派生指標の計算も行わない。
+
+    <共有ディレクトリ>/<シーズン>/
+        CURRENT                     # 公開中の版（データの版のID）
+        <版>/
+            manifest.json           # シーズン・データの版・更新日時・行数
+            team_ratings.feather
+            player_ratings.feather  # シーズン合計（全選手・検索用）
+            player_stints.feather   # チームごとの行（チーム別選手用）
+
+データ・エクスポートと同じく、作業用ディレクトリに書き出してからCURRENTを置き換えて公開し、
+ワーカーはCURRENTの変更を確認した時点で新しい版を参照し直す。
+
+使い方:
+    python shared_dataset.py publish [--data-dir data] [--season 2025-26] [--shared-dir DIR] [--watch]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from seasons import DEFAULT_SEASON, available_seasons, season_dir
+from snapshot import read_snapshot, write_snapshot
+from snapshot_store import (
+    CURRENT_FILE,
+    MANIFEST_FILE,
+    STAGING_PREFIX,
+    current_version,
+    data_version,
+    prune_versions,
+    write_atomic
+)
+
+# 共有ディレクトリ（環境変数で上書き可能、/dev/shmがない環境では一時ディレクトリ）
+SHARED_DIR = os.environ.get('NBA_SHARED_DIR') or os.path.join(
+    '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir(), 'nba-rating-visualizer')
+
+# 公開するファイルとNBADataManagerの属性
+FRAMES = {
+    'team_ratings': 'team_ratings_cache',
+    'player_ratings': 'player_ratings_cache',
+    'player_stints': 'player_stints_cache',
+}
+
+# 公開後も残す版の数（参照中のワーカーがある版を削除しないよう、公開中の版以外にも残す）
+KEEP_SHARED_VERSIONS = 2
+
+# データの更新を確認する間隔（秒、--watch）
+WATCH_INTERVAL_SECONDS = 30
+
+
+def season_path(season, shared_dir=None):
+    return os.path.join(shared_dir or SHARED_DIR, season)
+
+
+def publish(manager, shared_dir=None):
+    """データマネージャーの処理済みの表を共有ディレクトリに書き出して公開
+
+    Returns:
+        公開した版のディレクトリ（同じ版が公開済みの場合は書き出さずにそのディレクトリ）
+    """
+    path = season_path(manager.season, shared_dir)
+    version = data_version(manager)
+    target = os.path.join(path, version)
+    if current_version(path) == version and os.path.isdir(target):
+        return target
+
+    staging = os.path.join(path, f"{STAGING_PREFIX}{uuid.uuid4().hex[:12]}")
+    os.makedirs(staging)
+    try:
+        rows = {}
+        for name, attr in FRAMES.items():
+            df = getattr(manager, attr)
+            write_snapshot(df, os.path.join(staging, f"{name}.feather"))
+            rows[name] = len(df)
+        manifest = {
+            'season': manager.season,
+            'version': version,
+            'last_updated': manager.get_last_updated(),
+            'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            'rows': rows,
+        }
+        write_atomic(os.path.join(staging, MANIFEST_FILE), json.dumps(manifest, ensure_ascii=False, indent=2))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if os.path.exists(target):
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    write_atomic(os.path.join(path, CURRENT_FILE), version + '\n')
+    # 参照中のワーカーがある古い版も、Linuxではファイルの削除後もマップした領域はそのまま読める
+    prune_versions(path, KEEP_SHARED_VERSIONS)
+    return target
+
+
+def resolve(season, shared_dir=None):
+    """公開中の版のディレクトリと版のID（未公開の場合はNoneとNone）"""
+    path = season_path(season, shared_dir)
+    version = current_version(path)
+    if version is None:
+        return None, None
+    return os.path.join(path, version), version
+
+
+def read_manifest(version_dir):
+    with open(os.path.join(version_dir, MANIFEST_FILE), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def attach(version_dir):
+    """公開された版の表をメモリマップで参照する（数値列・文字列の列は読み取り専用でマップされた領域を共有）
+
+    Returns:
+        NBADataManagerの属性名 → DataFrame
+    """
+    return {attr: read_snapshot(os.path.join(version_dir, f"{name}.feather"), arrow_strings=True)
+            for name, attr in FRAMES.items()}
+
+
+def publish_seasons(data_dir, shared_dir=None, seasons=None, source='snapshot', published=None):
+    """保存済みのシーズンのデータを読み込んで公開（publishedのシグネチャから変わっていないシーズンは読み込まない）
+
+    Args:
+        published: シーズン → 公開済みのデータのシグネチャ（更新される）
+
+    Returns:
+        シーズン → 公開した版のディレクトリ（今回公開したシーズンのみ）
+    """
+    from data_sources import create_source
+    from nba_data_static import NBADataManager
+
+    published = {} if published is None else published
+    paths = {}
+    for season in seasons or available_seasons(data_dir) or [DEFAULT_SEASON]:
+        data_source = create_source(source, season, season_dir(data_dir, season))
+        if season in published and data_source.signature() == published[season]:
+            continue
+        manager = NBADataManager(season=season, data_dir=data_source.data_dir, raise_errors=True,
+                                 source=data_source)
+        paths[season] = publish(manager, shared_dir)
+        published[season] = manager.signature
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ワーカープロセス間で共有する処理済みデータの公開")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    publish_parser = subparsers.add_parser('publish', help="保存済みのデータを読み込んで共有ディレクトリに公開")
+    publish_parser.add_argument('--data-dir', default='data', help="データディレクトリ")
+    publish_parser.add_argument('--season', action='append', dest='seasons',
+                                help="公開するシーズン（複数指定可。既定: データが保存されている全シーズン）")
+    publish_parser.add_argument('--shared-dir', default=SHARED_DIR, help="共有ディレクトリ")
+    publish_parser.add_argument('--watch', action='store_true', help="データの更新を監視し、更新時に公開し直す")
+    publish_parser.add_argument('--interval', type=float, default=WATCH_INTERVAL_SECONDS,
+                                help="データの更新を確認する間隔（秒、--watch）")
+    args = parser.parse_args()
+
+    published = {}
+    while True:
+        try:
+            for season, path in publish_seasons(args.data_dir, args.shared_dir, args.seasons,
+                                                published=published).items():
+                print(f"✓ {season}: 版 {os.path.basename(path)} を公開しました（{path}）", flush=True)
+        except Exception as e:
+            if not args.watch:
+                raise
+            # 書き込み途中などで読み込めない場合は公開中の版を維持し、次回再試行する
+            print(f"✗ データの公開に失敗しました（公開中の版を継続使用）: {e}", flush=True)
+        if not args.watch:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+列指向スナップショット（Feather v2 / Arrow IPC形式）の読み書き
+fetch_data.pyがCSVと同時に書き出し、NBADataManagerがメモリマップでゼロコピー読み込みする
+メモリ上で保持する型（compact_types）もスナップショットと同じにする
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+# スナップショットのファイル名（CSVと同じディレクトリに配置）
+TEAM_SNAPSHOT = 'team_ratings.feather'
+PLAYER_SNAPSHOT = 'player_ratings.feather'
+
+RATING_COLUMNS = ['OFF_RATING', 'DEF_RATING', 'NET_RATING']
+CATEGORY_COLUMNS = ['TEAM_ID', 'ROW_TYPE']
+NAME_COLUMNS = ['PLAYER_NAME', 'TEAM_NAME']
+
+
+def is_available():
+    """pyarrowが利用可能か"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _intern_strings(series):
+    """文字列の列の同じ値を1つの文字列オブジェクトで共有する（sys.intern）"""
+    codes, uniques = pd.factorize(series)
+    interned = np.array([sys.intern(value) if isinstance(value, str) else value for value in uniques] + [np.nan],
+                        dtype=object)
+    # 欠損値（codesが-1）は末尾のnanになる
+    return pd.Series(interned[codes], index=series.index, name=series.name)
+
+
+def compact_types(df):
+    """メモリ上で保持する型に変換（変換が不要な列はそのまま、元のDataFrameは変更しない）
+
+    TEAM_ID・ROW_TYPEはカテゴリ、レーティングはfloat32、GPは欠損がなければint16（あればfloat32）、
+    選手名・チーム名は同じ名前の文字列を共有する（移籍選手の複数の行・シーズン合計とチームごとの表の間）。
+    """
+    columns = {}
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            columns[col] = df[col].astype('category')
+    for col in RATING_COLUMNS:
+        if col in df.columns and df[col].dtype != 'float32':
+            columns[col] = df[col].astype('float32')
+    if 'GP' in df.columns and df['GP'].dtype != 'int16':
+        columns['GP'] = df['GP'].astype('int16' if df['GP'].notna().all() else 'float32')
+    for col in NAME_COLUMNS:
+        if col in df.columns and df[col].dtype == object:
+            columns[col] = _intern_strings(df[col])
+    return df.assign(**columns) if columns else df
+
+
+def to_snapshot_types(df):
+    """スナップショット用の型に変換（compact_typesと同じ型）"""
+    if 'GP' in df.columns:
+        # 試合数のない行（League Averageなど）はどの画面にも表示されないため除外
+        df = df.dropna(subset=['GP'])
+    return compact_types(df).reset_index(drop=True)
+
+
+def write_snapshot(df, path):
+    """DataFrameを型付きのスナップショットとして保存"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    table = pa.Table.from_pandas(to_snapshot_types(df), preserve_index=False)
+    # メモリマップでゼロコピー参照できるよう非圧縮で書き出し、完成後に置き換える
+    tmp_path = f"{path}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, arrow_strings=False):
+    """スナップショットをメモリマップで読み込む
+
+    数値列はマップされた領域をそのまま参照する（読み取り専用の配列になる）。
+    arrow_strings=Trueの場合は文字列の列もPythonの文字列に変換せず、マップされた領域を参照する
+    pyarrowの文字列型（string[pyarrow]）にする。
+    """
+    import pyarrow as pa
+
+    source = pa.memory_map(path, 'r')
+    table = pa.ipc.open_file(source).read_all()
+    types_mapper = {pa.string(): pd.StringDtype('pyarrow')}.get if arrow_strings else None
+    return table.to_pandas(split_blocks=True, types_mapper=types_mapper)
+
+
+def snapshot_path_if_fresh(csv_path, snapshot_path):
+    """対応するCSVより新しいスナップショットが存在すればそのパスを返す"""
+    try:
+        snapshot_mtime = os.stat(snapshot_path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        csv_mtime = os.stat(csv_path).st_mtime_ns
+    except FileNotFoundError:
+        return snapshot_path
+    # CSVだけが手動で更新された場合は古いスナップショットを使わない
+    return snapshot_path if snapshot_mtime >= csv_mtime else None
+
+
+def load_frame(csv_path, snapshot_path):
+    """スナップショットがあればメモリマップで、なければCSVから読み込む"""
+    if is_available():
+        path = snapshot_path_if_fresh(csv_path, snapshot_path)
+        if path:
+            return read_snapshot(path)
+    return pd.read_csv(csv_path)
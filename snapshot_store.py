@@ -0,0 +1,313 @@
+"""
+シーズンデータの版管理（バージョンごとのディレクトリとcurrentポインタ）
+fetch_data.pyは新しい版を作業用ディレクトリに作成し、マニフェスト（行数・スキーマ・チェックサム）を
+検証してから、ポインタファイル（CURRENT）を置き換えて公開する。
+
+    data/seasons/<シーズン>/
+        CURRENT                     # 公開中の版のID（置き換えは1回のrenameで行う）
+        versions/<版ID>/            # team_ratings.csv、player_ratings.csv、*.feather、last_updated.txt、manifest.json
+        history/                    # 差分の履歴（history_store.py）
+
+読み込み側はCURRENTだけを読んで版の変更を検知するため、書き込み途中のファイルや
+新旧の混在したデータを読むことはなく、1回の公開で再読み込みも1回になる。
+CURRENTがない場合（版管理の導入前のデータ）はシーズンのディレクトリ直下のファイルを読み込む。
+データから作成する出力（static_export.pyのエクスポート、shared_dataset.pyの共有データ）も同じCURRENTと
+マニフェストで版を公開し、版のID（data_version）と古い版の削除（prune_versions）はここで共通化する。
+"""
+import hashlib
+import json
+import os
+import shutil
+import uuid
+
+import pandas as pd
+
+import snapshot
+
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+MANIFEST_FILE = 'manifest.json'
+STAGING_PREFIX = '.staging-'
+
+# 版に含めるファイル（スナップショットはpyarrowがある場合のみ）
+DATA_FILES = ('team_ratings.csv', 'player_ratings.csv', 'last_updated.txt')
+SNAPSHOT_FILES = (snapshot.TEAM_SNAPSHOT, snapshot.PLAYER_SNAPSHOT)
+
+# 公開後も残す版の数（読み込み中の版を削除しないよう、公開中の版以外にも残す）
+KEEP_VERSIONS = 3
+
+# 各ファイルに必要な列と、数値でなければならない列
+REQUIRED_COLUMNS = {
+    'team_ratings': ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING'],
+    'player_ratings': ['PLAYER_NAME', 'TEAM_ID', 'OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP'],
+}
+NUMERIC_COLUMNS = ['OFF_RATING', 'DEF_RATING', 'NET_RATING', 'GP', 'MIN']
+
+# 前の版から行数がこの割合未満に減った場合は取得の失敗（ページの途中までしかない等）とみなす
+MIN_ROW_RATIO = 0.5
+
+
+class SnapshotValidationError(Exception):
+    """作成した版が検証に失敗した場合のエラー"""
+
+    def __init__(self, errors):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def current_version(season_path):
+    """公開中の版のID（版管理されていない場合はNone）"""
+    try:
+        with open(os.path.join(season_path, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_dir(season_path, version):
+    return os.path.join(season_path, VERSIONS_DIR, version)
+
+
+def resolve_dir(season_path):
+    """公開中のデータのディレクトリと版のIDを返す（版管理されていない場合はシーズンのディレクトリとNone）"""
+    version = current_version(season_path)
+    if version is None:
+        return season_path, None
+    return version_dir(season_path, version), version
+
+
+def read_manifest(path):
+    """版のディレクトリのマニフェストを読み込む（ない場合はNone）"""
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def create_staging(season_path, base_dir=None):
+    """新しい版の作業用ディレクトリを作成し、base_dirのデータファイルをコピーする
+
+    今回更新しないファイル（条件付きGETで変更がなかったページなど）は前の版の内容を引き継ぐ。
+    """
+    staging = os.path.join(season_path, VERSIONS_DIR, f"{STAGING_PREFIX}{uuid.uuid4().hex[:12]}")
+    os.makedirs(staging)
+    if base_dir is not None:
+        for filename in DATA_FILES + SNAPSHOT_FILES:
+            path = os.path.join(base_dir, filename)
+            if os.path.exists(path):
+                shutil.copy2(path, staging)
+    return staging
+
+
+def discard_staging(staging):
+    shutil.rmtree(staging, ignore_errors=True)
+
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _describe_frame(df):
+    return {'rows': len(df), 'columns': {col: str(dtype) for col, dtype in df.dtypes.items()}}
+
+
+def _read_file(path):
+    """マニフェスト・検証用にデータファイルを読み込む（テキストファイルはNone）"""
+    if path.endswith('.csv'):
+        return pd.read_csv(path)
+    if path.endswith('.feather'):
+        return snapshot.read_snapshot(path)
+    return None
+
+
+def build_manifest(path, version, season, created_at, previous=None):
+    """版のディレクトリ内の各ファイルの行数・スキーマ・チェックサムを記録したマニフェストを作成"""
+    files = {}
+    for filename in DATA_FILES + SNAPSHOT_FILES:
+        file_path = os.path.join(path, filename)
+        if not os.path.exists(file_path):
+            continue
+        entry = {'sha256': _sha256(file_path), 'bytes': os.path.getsize(file_path)}
+        df = _read_file(file_path)
+        if df is not None:
+            entry.update(_describe_frame(df))
+        files[filename] = entry
+    return {
+        'version': version,
+        'season': season,
+        'created_at': created_at.isoformat(timespec='seconds'),
+        'previous': previous,
+        'files': files,
+    }
+
+
+def validate(path, manifest, previous_manifest=None):
+    """版のディレクトリをマニフェストと照合し、問題点のリストを返す（問題がなければ空）"""
+    errors = []
+    files = manifest.get('files', {})
+    for filename in DATA_FILES:
+        if filename not in files:
+            errors.append(f"{filename}がありません")
+
+    for filename, entry in files.items():
+        file_path = os.path.join(path, filename)
+        if not os.path.exists(file_path):
+            errors.append(f"{filename}がありません")
+            continue
+        if os.path.getsize(file_path) != entry['bytes'] or _sha256(file_path) != entry['sha256']:
+            errors.append(f"{filename}のチェックサムがマニフェストと一致しません")
+            continue
+        try:
+            df = _read_file(file_path)
+        except Exception as e:
+            errors.append(f"{filename}を読み込めません: {e}")
+            continue
+        if df is None:
+            continue
+        if len(df) != entry['rows']:
+            errors.append(f"{filename}の行数がマニフェストと一致しません（{len(df)} != {entry['rows']}）")
+        errors += _validate_frame(filename, df)
+
+    # CSVとスナップショットの内容の対応（スナップショットは試合数のない行を除くため行数はCSV以下）
+    for csv_name, snapshot_name in zip(DATA_FILES[:2], SNAPSHOT_FILES):
+        if csv_name in files and snapshot_name in files:
+            csv_entry, snapshot_entry = files[csv_name], files[snapshot_name]
+            if snapshot_entry['rows'] > csv_entry['rows'] or set(snapshot_entry['columns']) != set(csv_entry['columns']):
+                errors.append(f"{snapshot_name}の内容が{csv_name}と対応していません")
+
+    # 前の版との比較（行数の大幅な減少・列の欠落は取得の失敗とみなす）
+    if previous_manifest:
+        for filename in DATA_FILES[:2]:
+            previous = previous_manifest.get('files', {}).get(filename)
+            current = files.get(filename)
+            if not previous or not current:
+                continue
+            if current['rows'] < previous['rows'] * MIN_ROW_RATIO:
+                errors.append(f"{filename}の行数が前の版から大きく減っています（{previous['rows']} → {current['rows']}）")
+            missing = [col for col in previous['columns'] if col not in current['columns']]
+            if missing:
+                errors.append(f"{filename}から列が消えています: {', '.join(missing)}")
+    return errors
+
+
+def _validate_frame(filename, df):
+    """データファイルの列・値の検証"""
+    errors = []
+    kind = filename.split('.')[0]
+    if df.empty:
+        errors.append(f"{filename}にデータがありません")
+    missing = [col for col in REQUIRED_COLUMNS.get(kind, []) if col not in df.columns]
+    if missing:
+        errors.append(f"{filename}に必要な列がありません: {', '.join(missing)}")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and not pd.api.types.is_numeric_dtype(df[col]):
+            errors.append(f"{filename}の{col}が数値ではありません")
+    if kind == 'team_ratings' and 'TEAM_NAME' in df.columns and df['TEAM_NAME'].duplicated().any():
+        errors.append(f"{filename}のチーム名が重複しています")
+    return errors
+
+
+def write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def publish(season_path, staging, season, created_at, keep=KEEP_VERSIONS):
+    """作業用ディレクトリを検証して新しい版として公開
+
+    マニフェストを作成・検証し、問題がなければ版のディレクトリに移動してCURRENTを置き換える。
+
+    Returns:
+        公開した版のID
+
+    Raises:
+        SnapshotValidationError: 検証に失敗した場合（作業用ディレクトリは削除し、公開中の版は変更しない）
+    """
+    previous_dir, previous_version = resolve_dir(season_path)
+    previous_manifest = read_manifest(previous_dir) if previous_version else None
+
+    # 版のIDは作成日時と内容のハッシュ（同じ時刻に作成しても重複しない）
+    digest = hashlib.sha256()
+    for filename in sorted(os.listdir(staging)):
+        digest.update(filename.encode())
+        digest.update(_sha256(os.path.join(staging, filename)).encode())
+    version = f"{created_at:%Y%m%dT%H%M%S}-{digest.hexdigest()[:8]}"
+
+    manifest = build_manifest(staging, version, season, created_at, previous_version)
+    errors = validate(staging, manifest, previous_manifest)
+    if errors:
+        discard_staging(staging)
+        raise SnapshotValidationError(errors)
+
+    write_atomic(os.path.join(staging, MANIFEST_FILE), json.dumps(manifest, ensure_ascii=False, indent=2))
+    target = version_dir(season_path, version)
+    if os.path.exists(target):
+        # 同じ時刻・同じ内容の版がすでにある場合はそれを公開する
+        discard_staging(staging)
+    else:
+        os.replace(staging, target)
+    write_atomic(os.path.join(season_path, CURRENT_FILE), version + '\n')
+
+    prune(season_path, keep)
+    return version
+
+
+def prune(season_path, keep=KEEP_VERSIONS):
+    """古い版・作業用ディレクトリの残り・版管理の導入前のファイルを削除（公開中の版と新しいものからkeep個は残す）
+
+    取得処理は同時に1つだけ実行する前提のため、公開後に残っている作業用ディレクトリは中断された取得のもの。
+    """
+    current = current_version(season_path)
+    if current is None:
+        return
+    root = os.path.join(season_path, VERSIONS_DIR)
+    names = os.listdir(root)
+    for name in names:
+        if name.startswith(STAGING_PREFIX):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    versions = sorted((name for name in names if not name.startswith(STAGING_PREFIX)), reverse=True)
+    for name in versions[keep:]:
+        if name != current:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+    # 版管理の導入前にシーズンのディレクトリ直下へ保存していたファイルは公開中の版に置き換わっている
+    for filename in DATA_FILES + SNAPSHOT_FILES:
+        path = os.path.join(season_path, filename)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def data_version(manager):
+    """読み込んだデータの版のID（データから作成するエクスポート・共有データの版に使う）
+
+    版管理されていないデータはシグネチャ（ファイルのmtime/サイズなど）のハッシュにする。
+    """
+    version = getattr(manager.source, 'version', None)
+    if version:
+        return version
+    return 'files-' + hashlib.sha256(repr(manager.signature).encode()).hexdigest()[:12]
+
+
+def prune_versions(path, keep):
+    """版のディレクトリを直下に置く出力先（エクスポート・共有データ）の古い版と作業用ディレクトリの残りを削除
+
+    公開中の版と、新しいものからkeep個は残す。
+    """
+    current = current_version(path)
+    names = [name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))]
+    for name in names:
+        if name.startswith(STAGING_PREFIX):
+            shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    versions = sorted((os.path.join(path, name) for name in names if not name.startswith(STAGING_PREFIX)),
+                      key=os.path.getmtime, reverse=True)
+    for version_path in versions[keep:]:
+        if os.path.basename(version_path) != current:
+            shutil.rmtree(version_path, ignore_errors=True)
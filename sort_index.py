@@ -0,0 +1,52 @@
+"""
+並び替え用のソート順インデックス
+列ごとの安定ソート順（昇順・降順）を一度だけ計算して保持し、
+並び替え列の切り替えは計算済みの順序の取り出しだけで行う
+"""
+import numpy as np
+
+
+def _ascending_order(series):
+    """昇順の安定ソート順（欠損値は末尾）と、欠損でない行数を返す"""
+    valid = series.notna().to_numpy()
+    valid_positions = np.flatnonzero(valid)
+    values = series.to_numpy()[valid_positions]
+    if values.dtype == object:
+        # 文字列などは比較可能な型のまま並べる
+        order = valid_positions[np.argsort(values, kind='stable')]
+    else:
+        order = valid_positions[np.argsort(values.astype('float64'), kind='stable')]
+    return np.concatenate([order, np.flatnonzero(~valid)]), len(valid_positions)
+
+
+def _descending_order(series, ascending_order, valid_count):
+    """昇順のソート順から降順の安定ソート順（同じ値の行は元の順序、欠損値は末尾）を作成
+
+    昇順を逆順にすると同じ値の行の順序も逆になるため、同じ値の区間ごとに順序を戻す（ソートし直さない）。
+    """
+    reversed_order = ascending_order[valid_count - 1::-1] if valid_count else ascending_order[:0]
+    values = series.to_numpy()[reversed_order]
+    starts = np.flatnonzero(np.r_[True, values[1:] != values[:-1]]) if valid_count else np.array([], dtype=np.int64)
+    lengths = np.diff(np.r_[starts, valid_count])
+    run_starts = np.repeat(starts, lengths)
+    run_ends = np.repeat(starts + lengths - 1, lengths)
+    # 区間内の位置iを区間の反対側（始点+終点-i）に移す
+    order = reversed_order[run_starts + run_ends - np.arange(valid_count)]
+    return np.concatenate([order, ascending_order[valid_count:]])
+
+
+class SortIndex:
+    """DataFrameの全列について昇順・降順のソート順（行位置の配列）を保持する
+
+    DataFrame.sort_values(kind='stable', na_position='last')と同じ順序（同じ値の行は元の順序、欠損値は末尾）。
+    """
+
+    def __init__(self, df):
+        self._orders = {}
+        for col in df.columns:
+            ascending, valid_count = _ascending_order(df[col])
+            self._orders[col] = (ascending, _descending_order(df[col], ascending, valid_count))
+
+    def order(self, column, ascending=True):
+        """指定列で並べた行位置の配列"""
+        return self._orders[column][0 if ascending else 1]
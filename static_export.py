@@ -0,0 +1,380 @@
+"""
+全画面の表示結果の静的エクスポート（JSON・HTML）
+データの公開後（fetch_data.py --export、または python static_export.py build）に、チームレーティングの全並び順、
+全チームの選手、全選手のランキングを表示用の文字列のまま書き出す。閲覧が多い場合は、Streamlitで閲覧者ごとに
+計算する代わりに、serve()のHTTPハンドラーが書き出したファイルをそのまま返す。
+
+    export/<シーズン>/
+        CURRENT                     # 公開中のエクスポートの版（データの版のID）
+        <版>/
+            manifest.json           # シーズン・データの版・作成日時・ファイルの一覧
+            index.html
+            team_ratings.json       # 表示用の文字列の行と、列ごとの並び順（行位置の配列）
+            team_ratings/<列>-<asc|desc>.html
+            teams/<チームのキー>.json
+            teams/<チームのキー>/<列>-<asc|desc>.html
+            players.json
+            players/<列>-<asc|desc>.html
+
+データと同じく、作業用ディレクトリに書き出してからCURRENTを置き換えて公開する。
+
+使い方:
+    python static_export.py build [--data-dir data] [--season 2025-26] [--output export]
+    python static_export.py serve [--output export] [--port 8000]
+"""
+import argparse
+import html
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from seasons import DEFAULT_SEASON, available_seasons, is_valid_season, season_dir
+from snapshot_store import (
+    CURRENT_FILE,
+    MANIFEST_FILE,
+    STAGING_PREFIX,
+    current_version,
+    data_version,
+    prune_versions,
+    write_atomic
+)
+
+EXPORT_DIR = 'export'
+
+# 公開後も残すエクスポートの版の数（配信中の版を削除しないよう、公開中の版以外にも残す）
+KEEP_EXPORTS = 2
+
+# 画面と同じ最低出場試合数（チーム別選手・全選手レーティング）
+MIN_GAMES = 20
+
+# 一覧ページからのリンク先の並び順（チームはNRtg、選手はWSの降順）
+DEFAULT_SORT = 'NET_RATING-desc.html'
+
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=utf-8',
+    '.json': 'application/json',
+}
+
+# 公開中の版（CURRENT）を確認し直す間隔（秒）
+SERVE_CHECK_INTERVAL = 1.0
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 1.5rem; }}
+table {{ border-collapse: collapse; }}
+th, td {{ padding: 0.25rem 0.6rem; border-bottom: 1px solid #ddd; text-align: right; }}
+nav a {{ margin-right: 0.6rem; }}
+</style>
+</head>
+<body>
+<h1>{title}</h1>
+<p>📅 データ更新日時: {last_updated}</p>
+{body}
+</body>
+</html>
+"""
+
+
+def _sort_links(column_names, labels, current):
+    """並び替え列の切り替えリンク（同じディレクトリのHTMLへの相対リンク）"""
+    links = []
+    for name, label in zip(column_names, labels):
+        for order, mark in (('desc', '▼'), ('asc', '▲')):
+            text = html.escape(f"{label}{mark}")
+            if (name, order) == current:
+                links.append(f"<strong>{text}</strong>")
+            else:
+                links.append(f'<a href="{name}-{order}.html">{text}</a>')
+    return "<nav>" + " ".join(links) + "</nav>"
+
+
+class ExportedTable:
+    """1つの表（DisplayTable）の書き出し（表示用の文字列の行と、全列・昇順/降順の並び順）"""
+
+    def __init__(self, table, column_names):
+        """
+        Args:
+            table: table_format.DisplayTable
+            column_names: 表示列に対応する元の列名（ファイル名に使用）
+        """
+        self.table = table
+        self.column_names = column_names
+        self.labels = table.values.columns.tolist()
+
+    def orders(self):
+        """(元の列名, 'asc'|'desc', 表示列名, 行位置の配列) の一覧"""
+        for name, label in zip(self.column_names, self.labels):
+            for order in ('desc', 'asc'):
+                yield name, order, label, self.table.order(label, ascending=order == 'asc')
+
+    def to_json(self, **fields):
+        """表示用の文字列の行と並び順のJSON（並び順は元の列名 → {'asc': [...], 'desc': [...]}）"""
+        orders = {}
+        for name, order, _, positions in self.orders():
+            orders.setdefault(name, {})[order] = positions.tolist()
+        return json.dumps({
+            **fields,
+            'columns': self.labels,
+            'rows': self.table.text.to_numpy().tolist(),
+            'orders': orders,
+        }, ensure_ascii=False, separators=(',', ':'))
+
+    def write(self, directory, json_path, title, last_updated, **fields):
+        """JSONと、並び順ごとのHTMLを書き出し、書き出したHTMLのパスの一覧を返す"""
+        from table_format import numbered
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json(**fields))
+        os.makedirs(directory, exist_ok=True)
+        written = []
+        for name, order, _, positions in self.orders():
+            page = numbered(self.table.rows(positions)).to_html(border=0, escape=True)
+            body = _sort_links(self.column_names, self.labels, (name, order)) + "\n" + page
+            path = os.path.join(directory, f"{name}-{order}.html")
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(_PAGE_TEMPLATE.format(title=html.escape(title), last_updated=html.escape(last_updated),
+                                              body=body))
+            written.append(path)
+        return written
+
+
+def _column_names(table, labels):
+    """表示列名に対応する元の列名（表示用の列名の辞書の逆引き）"""
+    inverse = {label: name for name, label in labels.items()}
+    return [inverse.get(label, label) for label in table.values.columns]
+
+
+def build_export(manager, output_dir):
+    """データマネージャーの全画面の表を書き出して公開
+
+    Args:
+        manager: nba_data_static.NBADataManager
+        output_dir: エクスポートのディレクトリ（シーズンのデータは output_dir/<シーズン>/）
+
+    Returns:
+        公開したエクスポートのディレクトリ（同じ版が公開済みの場合は書き出さずにそのディレクトリ）
+    """
+    from table_format import PLAYER_COLUMN_LABELS, TEAM_COLUMN_LABELS, DisplayTable
+
+    season_path = os.path.join(output_dir, manager.season)
+    version = data_version(manager)
+    target = os.path.join(season_path, version)
+    if current_version(season_path) == version and os.path.isdir(target):
+        return target
+
+    staging = os.path.join(season_path, f"{STAGING_PREFIX}{uuid.uuid4().hex[:12]}")
+    os.makedirs(staging)
+    try:
+        last_updated = manager.get_last_updated()
+        common = {'season': manager.season, 'version': version}
+        files = []
+
+        team_ratings = DisplayTable(manager.get_team_ratings(), TEAM_COLUMN_LABELS)
+        files += ExportedTable(team_ratings, _column_names(team_ratings, TEAM_COLUMN_LABELS)).write(
+            os.path.join(staging, 'team_ratings'), os.path.join(staging, 'team_ratings.json'),
+            f"{manager.season} チームレーティング一覧", last_updated, **common)
+        files.append(os.path.join(staging, 'team_ratings.json'))
+
+        teams = []
+        os.makedirs(os.path.join(staging, 'teams'))
+        for team in manager._teams:
+            key = manager.get_team_id(team['full_name'])
+            players = DisplayTable(manager.get_player_ratings(team_name=team['full_name'], min_games=MIN_GAMES),
+                                   PLAYER_COLUMN_LABELS)
+            if players.empty:
+                continue
+            json_path = os.path.join(staging, 'teams', f"{key}.json")
+            files += ExportedTable(players, _column_names(players, PLAYER_COLUMN_LABELS)).write(
+                os.path.join(staging, 'teams', key), json_path,
+                f"{manager.season} {team['full_name']}", last_updated, team=key, **common)
+            files.append(json_path)
+            teams.append((key, team['full_name']))
+
+        all_players = DisplayTable(manager.get_player_ratings(min_games=MIN_GAMES), PLAYER_COLUMN_LABELS)
+        files += ExportedTable(all_players, _column_names(all_players, PLAYER_COLUMN_LABELS)).write(
+            os.path.join(staging, 'players'), os.path.join(staging, 'players.json'),
+            f"{manager.season} 全選手レーティング", last_updated, **common)
+        files.append(os.path.join(staging, 'players.json'))
+
+        links = [f'<li><a href="team_ratings/{DEFAULT_SORT}">チームレーティング一覧</a></li>',
+                 f'<li><a href="players/{DEFAULT_SORT}">全選手レーティング</a></li>']
+        links += [f'<li><a href="teams/{key}/{DEFAULT_SORT}">{html.escape(name)}</a></li>' for key, name in teams]
+        index_path = os.path.join(staging, 'index.html')
+        with open(index_path, 'w', encoding='utf-8') as f:
+            f.write(_PAGE_TEMPLATE.format(title=html.escape(f"{manager.season} NBA Rating"),
+                                          last_updated=html.escape(last_updated),
+                                          body="<ul>\n" + "\n".join(links) + "\n</ul>"))
+        files.append(index_path)
+
+        manifest = {
+            **common,
+            'last_updated': last_updated,
+            'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+            'files': sorted(os.path.relpath(path, staging).replace(os.sep, '/') for path in files),
+        }
+        write_atomic(os.path.join(staging, MANIFEST_FILE), json.dumps(manifest, ensure_ascii=False, indent=2))
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    if os.path.exists(target):
+        shutil.rmtree(staging, ignore_errors=True)
+    else:
+        os.replace(staging, target)
+    write_atomic(os.path.join(season_path, CURRENT_FILE), version + '\n')
+    prune_versions(season_path, KEEP_EXPORTS)
+    return target
+
+
+def export_seasons(data_dir, output_dir, seasons=None, source='csv'):
+    """保存済みのシーズンのデータを書き出す（省略時はデータが保存されている全シーズン）
+
+    Returns:
+        シーズン → 公開したエクスポートのディレクトリ
+    """
+    from nba_data_static import NBADataManager
+
+    exported = {}
+    for season in seasons or available_seasons(data_dir) or [DEFAULT_SEASON]:
+        manager = NBADataManager(season=season, data_dir=season_dir(data_dir, season), raise_errors=True,
+                                 source=source)
+        exported[season] = build_export(manager, output_dir)
+    return exported
+
+
+class ExportStore:
+    """配信するファイルの内容をメモリ上に保持する（公開中の版が変わった場合は読み込み直す）"""
+
+    def __init__(self, output_dir, check_interval=SERVE_CHECK_INTERVAL):
+        self.output_dir = output_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._files = {}
+
+    def _version(self, season):
+        """シーズンの公開中の版（一定間隔でのみCURRENTを確認）
+
+        シーズンの形式でない、またはエクスポートのディレクトリにないシーズン（'..'など）はNone。
+        保持するのは実在するシーズンのみのため、任意のパスを要求されても保持する版は増えない。
+        """
+        now = time.monotonic()
+        checked = self._versions.get(season)
+        if checked is None or now - checked[1] > self.check_interval:
+            season_path = os.path.join(self.output_dir, season)
+            if not is_valid_season(season) or not os.path.isdir(season_path):
+                if checked is not None:
+                    # 削除されたシーズンの版・ファイルは保持しない
+                    with self._lock:
+                        self._versions.pop(season, None)
+                        self._files = {key: value for key, value in self._files.items() if key[0] != season}
+                return None
+            version = current_version(season_path)
+            with self._lock:
+                if checked is not None and checked[0] != version:
+                    # 更新前の版のファイルは保持しない
+                    self._files = {key: value for key, value in self._files.items() if key[0] != season}
+                self._versions[season] = (version, now)
+            return version
+        return checked[0]
+
+    def get(self, season, relative_path):
+        """ファイルの内容と版を返す（ない場合は(None, None)）"""
+        version = self._version(season)
+        if version is None:
+            return None, None
+        key = (season, version, relative_path)
+        body = self._files.get(key)
+        if body is None:
+            root = os.path.realpath(os.path.join(self.output_dir, season, version))
+            path = os.path.realpath(os.path.join(root, relative_path))
+            if not path.startswith(root + os.sep) or not os.path.isfile(path):
+                return None, None
+            with open(path, 'rb') as f:
+                body = f.read()
+            with self._lock:
+                self._files[key] = body
+        return body, version
+
+
+def make_server(output_dir=EXPORT_DIR, host='127.0.0.1', port=8000):
+    """書き出したファイルを返すHTTPサーバーを作成（パスは /<シーズン>/<ファイル>）"""
+    import http.server
+    from urllib.parse import unquote, urlsplit
+
+    store = ExportStore(output_dir)
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # keep-aliveの接続でヘッダーと本文を別々に送った際の遅延（Nagleアルゴリズム）を避ける
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            path = unquote(urlsplit(self.path).path).strip('/')
+            season, _, relative_path = path.partition('/')
+            season = season or DEFAULT_SEASON
+            relative_path = relative_path or 'index.html'
+            body, version = store.get(season, relative_path)
+            if body is None:
+                self.send_error(404)
+                return
+            etag = f'"{version}"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type',
+                             CONTENT_TYPES.get(os.path.splitext(relative_path)[1], 'text/plain'))
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'public, max-age=60')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return http.server.ThreadingHTTPServer((host, port), Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="全画面の表示結果の静的エクスポート（JSON・HTML）")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build', help="保存済みのデータから書き出す")
+    build.add_argument('--data-dir', default='data', help="データディレクトリ")
+    build.add_argument('--season', action='append', dest='seasons',
+                       help="書き出すシーズン（複数指定可。既定: データが保存されている全シーズン）")
+    build.add_argument('--output', default=EXPORT_DIR, help="エクスポートのディレクトリ")
+    serve = subparsers.add_parser('serve', help="書き出したファイルをHTTPで返す")
+    serve.add_argument('--output', default=EXPORT_DIR, help="エクスポートのディレクトリ")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        for season, path in export_seasons(args.data_dir, args.output, args.seasons).items():
+            with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+                manifest = json.load(f)
+            print(f"✓ {season}: {len(manifest['files'])}ファイルを書き出しました（{path}）")
+    else:
+        server = make_server(args.output, args.host, args.port)
+        print(f"http://{args.host}:{server.server_address[1]}/ で配信中（Ctrl+Cで終了）")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+表示用テーブルの整形
+数値データは数値のまま保持し、表示用の文字列はデータのバージョンごとに列単位で一括変換して使い回す
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+from profiling import profiled, stage
+from result_cache import results
+from sort_index import SortIndex
+
+# 表示用の列名（Basketball ReferenceのRating指標 / Win Shares指標）
+TEAM_COLUMN_LABELS = {
+    'OFF_RATING': 'ORtg',
+    'DEF_RATING': 'DRtg',
+    'NET_RATING': 'NRtg'
+}
+PLAYER_COLUMN_LABELS = {
+    'OFF_RATING': 'OWS',
+    'DEF_RATING': 'DWS',
+    'NET_RATING': 'WS',
+    'WS_PER_GAME': 'WS/G',
+    'WS_PER_36': 'WS/36',
+    'WS_PCTL': 'WSパーセンタイル',
+    'WS_TEAM_Z': 'チーム内WS(z)'
+}
+
+# 表示する小数点以下の桁数（GP・パーセンタイルは整数表示）
+COLUMN_DECIMALS = {
+    'ORtg': 1, 'DRtg': 1, 'NRtg': 1,
+    'OWS': 1, 'DWS': 1, 'WS': 1,
+    'WS/G': 3, 'WS/36': 3, 'WSパーセンタイル': 0, 'チーム内WS(z)': 2,
+    'GP': 0
+}
+
+
+def _format_number(series, decimals):
+    """数値列を指定桁数の文字列に一括変換（小数点以下は桁数まで0で埋める、欠損値は空文字）"""
+    if decimals:
+        # 丸めた後に0.0を足して-0.0を0.0にする（-0.000と表示しない）
+        values = np.round(series.to_numpy(dtype='float64', na_value=np.nan), decimals) + 0.0
+        text = pd.Series(np.char.mod(f'%.{decimals}f', values), index=series.index, dtype=object)
+    else:
+        text = series.round().astype('Int64').astype(str)
+    return text.where(series.notna(), '')
+
+
+def format_columns(df):
+    """表示用の列名を持つDataFrameの数値列を、表示用文字列に変換したコピーを作成"""
+    text = df.copy()
+    for col, decimals in COLUMN_DECIMALS.items():
+        if col in text.columns:
+            text[col] = _format_number(df[col], decimals)
+    return text
+
+
+class DisplayTable:
+    """表示用の列名を付けた数値データと、同じ行順を持つ表示用文字列・ソート順の組
+
+    並び替えは数値データ（values）から事前計算したソート順（sort_index）で行い、
+    その行位置で表示用文字列（text）を取り出す。
+    """
+
+    def __init__(self, df, labels):
+        with stage('table.format') as s:
+            self.values = df.rename(columns=labels)
+            self.text = format_columns(self.values)
+            s.rows = len(self.values)
+        with stage('table.sort_index'):
+            self.sort_index = SortIndex(self.values)
+
+    @property
+    def empty(self):
+        return self.values.empty
+
+    @profiled('table.sort')
+    def order(self, column, ascending=True):
+        """指定列で並べた行位置の配列"""
+        return self.sort_index.order(column, ascending)
+
+    def rows(self, positions):
+        """指定した行位置の順で表示用文字列を取り出す"""
+        return self.text.take(positions)
+
+
+def numbered(text, start=1):
+    """行番号（No.）をインデックスにした表示用の表
+
+    Args:
+        text: 表示用文字列のDataFrame
+        start: 先頭行の行番号（ページ表示では表示範囲の開始順位）
+    """
+    return text.set_axis(pd.RangeIndex(start, start + len(text), name='No.'))
+
+
+def render_table(text, start=1):
+    """行番号（No.）を付けてst.tableで描画（引数はnumberedと同じ）"""
+    _render(numbered(text, start))
+
+
+def render_cached_table(nba_manager, view, build):
+    """表示用の表をプロセス共有のキャッシュから取得して描画
+
+    同じデータのバージョン・表示条件の表は全セッションで共有し、ない場合のみbuild()で作成する。
+
+    Args:
+        view: ページ名と表示条件（並び替え列・チーム・ページなど）のタプル
+        build: (表示用文字列のDataFrame, 先頭行の行番号) を返す関数
+
+    Returns:
+        描画した場合はTrue（表が空の場合は描画しない）
+    """
+    with stage('table.cache'):
+        table = results.get_or_compute(nba_manager.data_dir, nba_manager.signature, view,
+                                       lambda: numbered(*build()))
+    if table.empty:
+        return False
+    _render(table)
+    return True
+
+
+def _render(table):
+    with stage('table.render') as s:
+        st.table(table)
+        s.rows = len(table)
@@ -0,0 +1,146 @@
+"""
+チームのメタデータ（ID・正式名称・略称）
+fetch_data.pyがnba_apiの静的データから data/teams.csv を生成し、静的データモードではこのファイルを読み込む
+（アプリの起動時にnba_apiをインポートしないため）
+
+チームの表記はデータの取得元によって異なる（Basketball Referenceの略称はBRK・CHO・PHO、nba_apiはBKN・CHA・PHX、
+チーム名にはプレーオフ進出を示す「*」が付く）。TeamIndexはnba_apiの略称をチームのキーとし、
+各表記からキーへの対応を辞書で保持する。
+取得したCSV・履歴はBasketball Referenceの表記のまま保存し（前回のデータとの差分を取得元の表記で比較するため）、
+キーへの変換はNBADataManagerの読み込み時にTeamIndex.normalizeで行う。
+"""
+import csv
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from profiling import profiled
+
+TEAMS_FILE = 'teams.csv'
+TEAM_COLUMNS = ['id', 'full_name', 'abbreviation', 'nickname', 'city']
+
+# Basketball Referenceの略称がnba_apiと異なるチーム（BRefの略称: nba_apiの略称）
+BREF_ABBREVIATIONS = {'BRK': 'BKN', 'CHO': 'CHA', 'PHO': 'PHX'}
+
+# 移転・改称前のチーム（過去シーズンのデータ用、現在のチームの略称に対応付ける）
+FORMER_TEAMS = {
+    'NJN': ('New Jersey Nets', 'BKN'),
+    'SEA': ('Seattle SuperSonics', 'OKC'),
+    'NOH': ('New Orleans Hornets', 'NOP'),
+    'NOK': ('New Orleans/Oklahoma City Hornets', 'NOP'),
+    'CHH': ('Charlotte Hornets', 'CHA'),
+    'CHA': ('Charlotte Bobcats', 'CHA'),
+    'VAN': ('Vancouver Grizzlies', 'MEM'),
+    'WSB': ('Washington Bullets', 'WAS'),
+}
+
+# チーム名の末尾のプレーオフ進出の印など（Basketball Reference）
+_NAME_MARKS = re.compile(r'[\s*]+$')
+
+
+def clean_team_name(name):
+    """チーム名の表記ゆれを除く（末尾の「*」・空白、大文字小文字）"""
+    return _NAME_MARKS.sub('', str(name)).strip().casefold()
+
+
+class TeamIndex:
+    """チームの各表記（nba_api・Basketball Referenceの略称、チーム名、ID）からチームのキーへの対応
+
+    キーはnba_apiの略称（teams.csvのabbreviation）。検索はすべて辞書の参照で行う。
+    """
+
+    def __init__(self, teams):
+        """
+        Args:
+            teams: load_teams()の戻り値（チームの辞書のリスト）
+        """
+        self.teams = {}
+        self._aliases = {}
+        for team in teams:
+            key = team['abbreviation']
+            self.teams[key] = team
+            # Basketball Referenceのチーム名（プレーオフ進出チームは末尾に「*」）も直接登録しておく
+            names = (team['full_name'], f"{team['full_name']}*", clean_team_name(team['full_name']))
+            for alias in (key, team['id'], str(team['id'])) + names:
+                self._aliases[alias] = key
+        for bref, key in BREF_ABBREVIATIONS.items():
+            if key in self.teams:
+                self._aliases[bref] = key
+        for code, (name, key) in FORMER_TEAMS.items():
+            if key in self.teams:
+                self._aliases.setdefault(code, key)
+                self._aliases.setdefault(clean_team_name(name), key)
+
+    def key(self, value):
+        """表記に対応するチームのキー（該当するチームがない場合はNone）"""
+        try:
+            key = self._aliases.get(value)
+        except TypeError:
+            return None
+        if key is None and isinstance(value, str):
+            key = self._aliases.get(clean_team_name(value))
+        return key
+
+    def team(self, value):
+        """表記に対応するチームの辞書（該当するチームがない場合はNone）"""
+        key = self.key(value)
+        return self.teams.get(key) if key else None
+
+    def normalize(self, values):
+        """略称の列をチームのキーに変換（該当するチームがない値（2TMなど）はそのまま）"""
+        codes, uniques = pd.factorize(values)
+        if not len(uniques):
+            return values
+        mapped = np.array([self.key(value) or value for value in uniques], dtype=object)
+        result = pd.Series(mapped[codes], index=values.index, name=values.name)
+        if (codes < 0).any():
+            # 欠損値はそのまま残す
+            result = result.where(codes >= 0, values)
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            # スナップショットのカテゴリ型は維持する
+            result = result.astype('category')
+        return result
+
+
+@profiled('teams.load')
+def load_teams(data_dir):
+    """チームの一覧を読み込む（nba_apiのteams.get_teams()と同じ形式の辞書のリスト）
+
+    ファイルがない場合のみnba_apiから取得する。
+    """
+    path = os.path.join(data_dir, TEAMS_FILE)
+    if not os.path.exists(path):
+        from nba_api.stats.static import teams
+        return teams.get_teams()
+    with open(path, newline='', encoding='utf-8') as f:
+        return [dict(row, id=int(row['id'])) for row in csv.DictReader(f)]
+
+
+def write_teams(data_dir):
+    """nba_apiの静的データからチームの一覧を保存（変更がない場合は書き込まない）
+
+    Returns:
+        保存した場合はTrue、変更がない場合はFalse
+    """
+    from nba_api.stats.static import teams
+
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TEAM_COLUMNS, extrasaction='ignore', lineterminator='\n')
+    writer.writeheader()
+    # 画面のチーム選択の並びを変えないよう、nba_apiの順序のまま保存
+    writer.writerows(teams.get_teams())
+    content = buffer.getvalue()
+
+    path = os.path.join(data_dir, TEAMS_FILE)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
@@ -0,0 +1,132 @@
+"""
+nba_data_static.pyのデータマネージャー（読み込み・共有する表）のテスト
+"""
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pandas as pd
+
+import snapshot_store
+from data_sources import CsvSource
+from nba_data_static import DATA_DIR, NBADataManager, SharedDataManager
+from seasons import DEFAULT_SEASON, data_root, season_dir
+from synthetic import REPO_ROOT, write_dataset
+from team_metadata import TEAMS_FILE, load_teams
+
+
+def test_import_leaves_pandas_options_unchanged():
+    code = "import nba_data_static, pandas; print(pandas.get_option('mode.copy_on_write'))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+    assert output.stdout.strip() == 'False'
+
+
+def test_accessors_return_shallow_copies(tmp_path):
+    write_dataset(tmp_path)
+    manager = NBADataManager(data_dir=str(tmp_path), source='csv', raise_errors=True)
+
+    teams = manager.get_team_ratings()
+    players = manager.get_player_ratings(min_games=20)
+
+    assert teams is not manager.team_ratings_cache
+    assert teams.columns.equals(manager.team_ratings_cache.columns)
+    assert players is not manager.get_player_ratings(min_games=20)
+    assert players.equals(manager.get_player_ratings(min_games=20))
+
+
+def test_teams_are_read_from_the_managers_data_dir(tmp_path):
+    data_dir = season_dir(str(tmp_path), DEFAULT_SEASON)
+    write_dataset(data_dir)
+    teams = pd.read_csv(os.path.join(REPO_ROOT, 'data', TEAMS_FILE))
+    teams.loc[0, 'full_name'] = 'Renamed Hawks'
+    teams.to_csv(tmp_path / TEAMS_FILE, index=False)
+
+    manager = NBADataManager(data_dir=data_dir, source='csv', raise_errors=True)
+
+    assert data_root(data_dir) == str(tmp_path)
+    assert manager._teams[0]['full_name'] == 'Renamed Hawks'
+    assert len(manager._teams) == len(teams)
+
+
+def test_teams_fall_back_to_bundled_list(tmp_path):
+    write_dataset(tmp_path)
+
+    manager = NBADataManager(data_dir=str(tmp_path), source='csv', raise_errors=True)
+
+    assert data_root(str(tmp_path)) == str(tmp_path)
+    assert [team['full_name'] for team in manager._teams] == [team['full_name'] for team in load_teams(DATA_DIR)]
+
+
+class FlakySource(CsvSource):
+    """選手データの読み込みが指定回数だけ失敗する取得元（ファイルは変更しない）"""
+
+    def __init__(self, season, data_dir, failures):
+        super().__init__(season, data_dir)
+        self.failures = failures
+
+    def load_player_ratings(self):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("一時的な読み込みエラー")
+        return super().load_player_ratings()
+
+
+def test_failed_first_load_is_retried(tmp_path):
+    write_dataset(tmp_path)
+    shared = SharedDataManager(data_dir=str(tmp_path), interval=3600,
+                               source=FlakySource(DEFAULT_SEASON, str(tmp_path), failures=1))
+    shared.stop()
+    assert shared.get().player_ratings_cache.empty
+    assert shared.get().signature is None
+
+    # データファイルが変わっていなくても、読み込めていないデータは次回の確認で読み込み直す
+    assert shared.reload_if_changed()
+    manager = shared.get()
+    assert not manager.player_ratings_cache.empty
+    assert manager.signature == manager.source.signature()
+    assert not shared.reload_if_changed()
+
+
+def test_failed_reload_is_logged(tmp_path, caplog):
+    write_dataset(tmp_path)
+    source = FlakySource(DEFAULT_SEASON, str(tmp_path), failures=0)
+    shared = SharedDataManager(data_dir=str(tmp_path), interval=3600, source=source)
+    shared.stop()
+    before = shared.get()
+
+    (tmp_path / 'last_updated.txt').write_text('updated')
+    source.failures = 1
+    assert not shared.reload_if_changed()
+    assert shared.get() is before
+    assert [record.name for record in caplog.records] == ['nba_data']
+    assert "前回のデータを継続使用" in caplog.records[0].getMessage()
+
+    assert shared.reload_if_changed()
+    assert shared.get().get_last_updated() == 'updated'
+
+
+def test_failed_reload_keeps_data_version(tmp_path):
+    def publish(created_at):
+        staging = snapshot_store.create_staging(str(tmp_path))
+        write_dataset(staging, with_snapshot=False)
+        return snapshot_store.publish(str(tmp_path), staging, DEFAULT_SEASON, created_at)
+
+    first = publish(datetime(2026, 10, 18))
+    source = FlakySource(DEFAULT_SEASON, str(tmp_path), failures=0)
+    shared = SharedDataManager(data_dir=str(tmp_path), interval=3600, source=source)
+    shared.stop()
+    before = shared.get()
+    assert snapshot_store.data_version(before) == first
+
+    # 新しい版の読み込みに失敗しても、提供中のデータの版は変わらない
+    second = publish(datetime(2026, 10, 19))
+    source.failures = 1
+    assert not shared.reload_if_changed()
+    assert shared.get() is before
+    assert before.source.version == first
+    assert snapshot_store.data_version(before) == first
+
+    assert shared.reload_if_changed()
+    assert snapshot_store.data_version(shared.get()) == second
@@ -0,0 +1,159 @@
+"""
+data_sources.pyの取得元（csv / snapshot / shared / live）の読み込み・変更検知のテスト
+"""
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import data_sources
+import nba_data_static
+import shared_dataset
+import snapshot_store
+from data_sources import DataSource, LiveApiSource, create_source
+from derived_metrics import WS_PCTL, WS_PER_GAME, WS_TEAM_Z
+from fake_stats import FakeStatsServer
+from live_stats import LiveStatsClient, StatsRequestError
+from nba_data_static import NBADataManager
+from seasons import DEFAULT_SEASON
+from synthetic import write_dataset
+
+
+def test_data_source_is_abstract():
+    class PartialSource(DataSource):
+        def signature(self):
+            return None
+
+    with pytest.raises(TypeError):
+        DataSource(DEFAULT_SEASON, None)
+    with pytest.raises(TypeError):
+        PartialSource(DEFAULT_SEASON, None)
+    with pytest.raises(ValueError):
+        create_source('unknown', DEFAULT_SEASON, None)
+
+
+def test_csv_source_detects_file_changes(tmp_path):
+    team_df, player_df = write_dataset(tmp_path, with_snapshot=False)
+    source = create_source('csv', DEFAULT_SEASON, str(tmp_path))
+
+    signature = source.signature()
+    assert len(source.load_team_ratings()) == len(team_df)
+    assert len(source.load_player_ratings()) == len(player_df)
+    assert source.last_updated() == 'synthetic x1'
+    assert source.signature() == signature
+
+    (tmp_path / 'last_updated.txt').write_text('2026-01-01 00:00:00')
+    assert source.signature() != signature
+    assert source.last_updated() == '2026-01-01 00:00:00'
+
+
+def test_snapshot_source_reads_published_version(tmp_path):
+    staging = snapshot_store.create_staging(str(tmp_path))
+    team_df, player_df = write_dataset(staging, with_snapshot=True)
+    version = snapshot_store.publish(str(tmp_path), staging, DEFAULT_SEASON, datetime.now().astimezone())
+    source = create_source('snapshot', DEFAULT_SEASON, str(tmp_path))
+
+    assert source.signature() == ('version', version)
+    assert len(source.load_team_ratings()) == len(team_df)
+    # スナップショットには試合数のない行（League Averageなど）は含まれない
+    assert len(source.load_player_ratings()) == player_df['GP'].notna().sum()
+    assert source.last_updated() == 'synthetic x1'
+
+    # 読み込み済みの版はcommit()で記録する
+    assert source.version is None
+    source.commit()
+    assert source.version == version
+    assert source.version_dir == snapshot_store.version_dir(str(tmp_path), version)
+
+
+def test_shared_source_attaches_published_version(tmp_path, monkeypatch):
+    monkeypatch.setattr(shared_dataset, 'SHARED_DIR', str(tmp_path / 'shared'))
+    data_dir = str(tmp_path / 'data')
+    write_dataset(data_dir, with_snapshot=True)
+    source = create_source('shared', DEFAULT_SEASON, data_dir)
+
+    assert source.signature() == ('shared', None)
+    with pytest.raises(FileNotFoundError):
+        source.load_frames()
+
+    manager = NBADataManager(data_dir=data_dir, source='snapshot', raise_errors=True)
+    version_dir = shared_dataset.publish(manager)
+    assert source.signature() == ('shared', os.path.basename(version_dir))
+    frames = source.load_frames()
+    assert len(frames['player_ratings_cache']) == len(manager.player_ratings_cache)
+    assert len(source.load_team_ratings()) == len(manager.team_ratings_cache)
+    assert source.last_updated() == manager.get_last_updated()
+
+
+def test_live_source_follows_client_cache(tmp_path):
+    server = FakeStatsServer()
+    client = LiveStatsClient(base_url=server.base_url, ttl=3600)
+    try:
+        source = LiveApiSource(DEFAULT_SEASON, str(tmp_path), client=client)
+
+        signature = source.signature()
+        assert all(isinstance(fetched_at, float) for fetched_at in signature)
+        assert source.signature() == signature
+        assert list(source.load_team_ratings().columns) == ['TEAM_NAME', 'OFF_RATING', 'DEF_RATING', 'NET_RATING']
+        players = source.load_player_ratings()
+        assert 'TEAM_ABBREVIATION' not in players.columns
+        assert players['TEAM_ID'].str.fullmatch(r'[A-Z]{3}').all()
+        assert source.last_updated().endswith('（リアルタイム）')
+        assert server.requests == 2
+    finally:
+        client.close()
+        server.close()
+
+
+def test_live_data_has_no_win_shares_metrics(tmp_path):
+    # stats.nba.comのNET_RATINGはWin Sharesではないため、WS/G・WSパーセンタイルなどは作らない
+    server = FakeStatsServer()
+    client = LiveStatsClient(base_url=server.base_url, ttl=3600)
+    try:
+        manager = NBADataManager(data_dir=str(tmp_path), raise_errors=True,
+                                 source=LiveApiSource(DEFAULT_SEASON, str(tmp_path), client=client))
+
+        assert not manager.player_ratings_cache.empty
+        assert not {WS_PER_GAME, WS_PCTL}.intersection(manager.get_player_ratings(min_games=0).columns)
+        assert WS_TEAM_Z not in manager.player_stints_cache.columns
+        assert manager.get_team_aggregates().empty
+    finally:
+        client.close()
+        server.close()
+
+    write_dataset(tmp_path, with_snapshot=False)
+    manager = NBADataManager(data_dir=str(tmp_path), source='csv', raise_errors=True)
+    assert {WS_PER_GAME, WS_PCTL}.issubset(manager.get_player_ratings(min_games=0).columns)
+    assert not manager.get_team_aggregates().empty
+
+
+def test_live_first_load_shows_error_instead_of_waiting(tmp_path, monkeypatch):
+    # 上流が応答しない場合、最初の読み込みはLIVE_FIRST_FETCH_SECONDSで打ち切ってエラーを表示する
+    monkeypatch.setattr(data_sources, 'LIVE_FIRST_FETCH_SECONDS', 0.1)
+    server = FakeStatsServer()
+    server.delay = 0.5
+    client = LiveStatsClient(base_url=server.base_url, ttl=3600)
+    errors = []
+    monkeypatch.setattr(nba_data_static.st, 'error', errors.append)
+    try:
+        source = LiveApiSource(DEFAULT_SEASON, str(tmp_path), client=client)
+        started = time.monotonic()
+        manager = NBADataManager(data_dir=str(tmp_path), source=source)
+        assert time.monotonic() - started < 0.4
+        assert manager.player_ratings_cache.empty and manager.signature is None
+        assert len(errors) == 1 and "秒以内に取得できませんでした" in errors[0]
+
+        # 裏での取得が完了すると、次の確認で読み込まれる
+        deadline = time.monotonic() + 5
+        signature = None
+        while signature is None and time.monotonic() < deadline:
+            try:
+                signature = source.signature()
+            except StatsRequestError:
+                time.sleep(0.05)
+        assert signature is not None and signature != manager.signature
+        assert not NBADataManager(data_dir=str(tmp_path), source=source, raise_errors=True).player_ratings_cache.empty
+    finally:
+        client.close()
+        server.close()
@@ -0,0 +1,90 @@
+"""
+fetch_data.pyの取得から公開までの流れ（版の公開と差分の履歴の整合）のテスト
+"""
+import glob
+import os
+
+import pandas as pd
+
+import snapshot_store
+from fetch_data import fetch_basketball_reference_data
+from fetch_engine import FetchResult
+from history_store import HISTORY_DIR, KEY_COLUMNS, RECORDED_AT_COLUMN, apply_delta, compute_delta
+from seasons import DEFAULT_SEASON, season_dir
+from synthetic import make_bref_pages
+
+
+class FakeEngine:
+    """指定したHTMLを返すFetchEngineの代わり"""
+
+    def __init__(self, team_page, player_page):
+        self.pages = [team_page, player_page]
+
+    def fetch_all(self, urls):
+        return [FetchResult(url, 200, text, False, {}) for url, text in zip(urls, self.pages)]
+
+    def remember(self, result):
+        pass
+
+    def save_validators(self):
+        pass
+
+
+def history_parts(season_path):
+    return sorted(glob.glob(os.path.join(season_path, HISTORY_DIR, '*', 'date=*', 'part-*.csv')))
+
+
+def replay(season_path, kind):
+    """履歴の差分を記録順に適用した現在ビュー"""
+    view = pd.DataFrame()
+    for path in sorted(glob.glob(os.path.join(season_path, HISTORY_DIR, kind, 'date=*', 'part-*.csv'))):
+        view = apply_delta(view, pd.read_csv(path).drop(columns=[RECORDED_AT_COLUMN]), KEY_COLUMNS[kind])
+    return view
+
+
+def assert_history_matches_published(season_path):
+    version_dir, _ = snapshot_store.resolve_dir(season_path)
+    for kind in KEY_COLUMNS:
+        published = pd.read_csv(os.path.join(version_dir, f"{kind}.csv"))
+        assert compute_delta(replay(season_path, kind), published, KEY_COLUMNS[kind]).empty
+
+
+def fetch(data_dir, team_page, player_page):
+    return fetch_basketball_reference_data(DEFAULT_SEASON, base_url='http://stub', data_dir=data_dir,
+                                           engine=FakeEngine(team_page, player_page))
+
+
+def test_history_replays_to_published_data(tmp_path):
+    team_page, player_page = make_bref_pages()
+    assert fetch(str(tmp_path), team_page, player_page)
+
+    assert_history_matches_published(season_dir(str(tmp_path), DEFAULT_SEASON))
+
+
+def test_rejected_version_leaves_history_unchanged(tmp_path):
+    season_path = season_dir(str(tmp_path), DEFAULT_SEASON)
+    team_page, player_page = make_bref_pages()
+    assert fetch(str(tmp_path), team_page, player_page)
+    parts = history_parts(season_path)
+    version = snapshot_store.current_version(season_path)
+
+    # 途中までしかない選手ページは検証で拒否される（差分は大量の削除になる）
+    truncated = player_page[:len(player_page) // 5] + '</table></body></html>'
+    assert not fetch(str(tmp_path), make_bref_pages(scale=2)[0], truncated)
+
+    assert snapshot_store.current_version(season_path) == version
+    assert history_parts(season_path) == parts
+    assert_history_matches_published(season_path)
+
+
+def test_missing_player_table_leaves_history_unchanged(tmp_path):
+    season_path = season_dir(str(tmp_path), DEFAULT_SEASON)
+    team_page, player_page = make_bref_pages()
+    assert fetch(str(tmp_path), team_page, player_page)
+    parts = history_parts(season_path)
+
+    # チームページ（チームを追加）の保存後に選手ページの処理が失敗しても、チームの差分は履歴に残らない
+    assert not fetch(str(tmp_path), make_bref_pages(scale=2)[0], '<html><body><p>no table</p></body></html>')
+
+    assert history_parts(season_path) == parts
+    assert_history_matches_published(season_path)
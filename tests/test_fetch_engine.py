@@ -0,0 +1,177 @@
+"""
+fetch_engine.pyのHTTP取得エンジン（再試行・条件付きGET・ETag/Last-Modifiedの保存・レート制限）のテスト
+"""
+import http.server
+import threading
+import time
+
+import pytest
+import requests
+
+from fetch_engine import FetchEngine, RateLimiter
+
+ETAG = '"v1"'
+LAST_MODIFIED = 'Sat, 17 Oct 2026 00:00:00 GMT'
+
+
+class StubServer:
+    """パスごとに応答のステータスを順に返すローカルのHTTPサーバー（既定は200でETag付きのページ）"""
+
+    def __init__(self):
+        self.statuses = {}
+        self.requests = []
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append((self.path, time.monotonic(), dict(self.headers)))
+                queue = server.statuses.get(self.path)
+                status = queue.pop(0) if queue else 200
+                if status == 200 and self.headers.get('If-None-Match') == ETAG:
+                    status = 304
+                if status != 200:
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = f"<p>{self.path} Nikola Jokić</p>".encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html')
+                self.send_header('ETag', ETAG)
+                self.send_header('Last-Modified', LAST_MODIFIED)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_address[1]}"
+        threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+    def requests_for(self, path):
+        return [request for request in self.requests if request[0] == path]
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.mark.parametrize('status', [429, 500, 502, 503, 504])
+def test_retries_rate_limit_and_server_errors(server, status):
+    server.statuses['/page'] = [status]
+    engine = FetchEngine(min_interval=0, retries=1)
+    try:
+        result = engine.fetch(f"{server.base_url}/page")
+    finally:
+        engine.close()
+
+    assert result.status == 200 and not result.not_modified
+    assert len(server.requests_for('/page')) == 2
+
+
+def test_gives_up_after_retries(server):
+    server.statuses['/page'] = [503, 503]
+    engine = FetchEngine(min_interval=0, retries=1)
+    try:
+        with pytest.raises(requests.exceptions.RetryError):
+            engine.fetch(f"{server.base_url}/page")
+    finally:
+        engine.close()
+
+    assert len(server.requests_for('/page')) == 2
+
+
+def test_does_not_retry_client_errors(server):
+    server.statuses['/page'] = [404]
+    engine = FetchEngine(min_interval=0, retries=3)
+    try:
+        with pytest.raises(requests.exceptions.HTTPError):
+            engine.fetch(f"{server.base_url}/page")
+    finally:
+        engine.close()
+
+    assert len(server.requests_for('/page')) == 1
+
+
+def test_conditional_get_after_remember(server):
+    url = f"{server.base_url}/page"
+    engine = FetchEngine(min_interval=0)
+    try:
+        first = engine.fetch(url)
+        # 処理の完了を記録するまでは条件付きGETにしない
+        assert not engine.fetch(url).not_modified
+        engine.remember(first)
+        second = engine.fetch(url)
+    finally:
+        engine.close()
+
+    assert first.text == '<p>/page Nikola Jokić</p>'
+    assert first.validators == {'etag': ETAG, 'last_modified': LAST_MODIFIED}
+    assert second.status == 304 and second.not_modified and second.text is None
+    assert second.validators == first.validators
+    headers = server.requests_for('/page')[-1][2]
+    assert headers['If-None-Match'] == ETAG
+    assert headers['If-Modified-Since'] == LAST_MODIFIED
+
+
+def test_validators_persist_between_runs(server, tmp_path):
+    url = f"{server.base_url}/page"
+    path = str(tmp_path / 'validators.json')
+    engine = FetchEngine(min_interval=0, validators_path=path)
+    try:
+        engine.remember(engine.fetch(url))
+        engine.save_validators()
+    finally:
+        engine.close()
+
+    engine = FetchEngine(min_interval=0, validators_path=path)
+    try:
+        assert engine.fetch(url).not_modified
+    finally:
+        engine.close()
+
+    # 壊れたファイルは無視して通常のGETを行う
+    (tmp_path / 'validators.json').write_text('{')
+    engine = FetchEngine(min_interval=0, validators_path=path)
+    try:
+        assert not engine.fetch(url).not_modified
+    finally:
+        engine.close()
+
+
+def test_rate_limiter_spaces_requests_per_host():
+    limiter = RateLimiter(0.1)
+    start = time.monotonic()
+    times = []
+    for _ in range(4):
+        limiter.wait('a.example')
+        times.append(time.monotonic() - start)
+    limiter.wait('b.example')
+    other_host = time.monotonic() - start
+
+    assert all(later - earlier >= 0.09 for earlier, later in zip(times, times[1:]))
+    assert other_host - times[-1] < 0.05
+
+
+def test_fetch_all_respects_rate_limit(server):
+    engine = FetchEngine(max_workers=4, min_interval=0.1)
+    paths = [f"/page{i}" for i in range(4)]
+    try:
+        results = engine.fetch_all([f"{server.base_url}{path}" for path in paths])
+    finally:
+        engine.close()
+
+    assert [result.text for result in results] == [f"<p>{path} Nikola Jokić</p>" for path in paths]
+    arrivals = sorted(arrived for _, arrived, _ in server.requests)
+    assert all(later - earlier >= 0.08 for earlier, later in zip(arrivals, arrivals[1:]))
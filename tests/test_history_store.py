@@ -0,0 +1,42 @@
+"""
+history_store.pyの差分の履歴（ファイルの追記・記録順の読み込み）のテスト
+"""
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from history_store import OP_COLUMN, RECORDED_AT_COLUMN, append_delta, has_history, load_history
+
+
+def delta(*names):
+    return pd.DataFrame({'TEAM_NAME': list(names), 'NET_RATING': [1.0] * len(names), OP_COLUMN: 'upsert'})
+
+
+def test_append_delta_never_overwrites(tmp_path):
+    recorded_at = datetime(2026, 10, 18, 12, 0, 0, 123456)
+
+    paths = [append_delta(tmp_path, 'team_ratings', delta(name), recorded_at) for name in ['A', 'B', 'C']]
+
+    assert [os.path.basename(path) for path in paths] == [
+        'part-120000123456.csv', 'part-120000123456_001.csv', 'part-120000123456_002.csv']
+    assert load_history(tmp_path, 'team_ratings')['TEAM_NAME'].tolist() == ['A', 'B', 'C']
+
+
+def test_history_is_loaded_in_recording_order(tmp_path):
+    times = [datetime(2026, 10, 18, 12, 0, 0, 900000), datetime(2026, 10, 18, 12, 0, 1, 100),
+             datetime(2026, 10, 19, 9, 30, 0)]
+    assert not has_history(tmp_path, 'team_ratings')
+
+    for name, recorded_at in zip(['A', 'B', 'C'], times):
+        append_delta(tmp_path, 'team_ratings', delta(name), recorded_at)
+    # 以前の形式（秒まで）のファイルも記録順に並ぶ
+    legacy = tmp_path / 'history' / 'team_ratings' / 'date=2026-10-18' / 'part-115959.csv'
+    delta('Z').assign(**{RECORDED_AT_COLUMN: '2026-10-18T11:59:59'}).to_csv(legacy, index=False)
+
+    assert has_history(tmp_path, 'team_ratings')
+    assert not has_history(tmp_path, 'player_ratings')
+    history = load_history(tmp_path, 'team_ratings')
+    assert history['TEAM_NAME'].tolist() == ['Z', 'A', 'B', 'C']
+    assert history[RECORDED_AT_COLUMN].tolist()[1:] == [t.isoformat(timespec='seconds') for t in times]
+    assert load_history(tmp_path, 'team_ratings', since='2026-10-19')['TEAM_NAME'].tolist() == ['C']
@@ -0,0 +1,65 @@
+"""
+html_tables.pyの目的のテーブルの抽出（コメント内のテーブル・見出し行の除外・idの指定）のテスト
+"""
+from html_tables import extract_table
+
+TABLE = """<table id="{table_id}">
+<thead>
+<tr class="over_header"><th></th><th colspan="2">Win Shares</th></tr>
+<tr><th>Player</th><th>OWS</th><th>DWS</th></tr>
+</thead>
+<tbody>
+<tr><td>Nikola Jokić</td><td>10.1</td><td>3.2</td></tr>
+<tr class="thead"><th>Player</th><th>OWS</th><th>DWS</th></tr>
+<tr><td>Shai Gilgeous-Alexander</td><td>9.8</td><td></td></tr>
+</tbody>
+</table>"""
+
+
+def page(*tables):
+    return f"<html><body><table id=\"other\"><tr><th>X</th></tr><tr><td>1</td></tr></table>{''.join(tables)}</body></html>"
+
+
+def assert_players(df):
+    assert df.columns.tolist() == ['Player', 'OWS', 'DWS']
+    assert df['Player'].tolist() == ['Nikola Jokić', 'Shai Gilgeous-Alexander']
+    assert df['OWS'].tolist() == ['10.1', '9.8']
+    assert df['DWS'].tolist() == ['3.2', None]
+
+
+def test_header_rows_are_skipped():
+    assert_players(extract_table(page(TABLE.format(table_id='advanced')), 'advanced'))
+
+
+def test_table_hidden_in_comment():
+    for table in [TABLE.format(table_id='advanced'), TABLE.replace('"{table_id}"', "'advanced'"),
+                  TABLE.replace('id="{table_id}"', 'class="stats_table" id=advanced')]:
+        html = page(f'<div id="all_advanced"><!--\n{table}\n--></div>')
+        assert_players(extract_table(html, 'advanced'))
+
+    # Basketball Referenceのチームのテーブル（引用符が一重のid）
+    table = TABLE.replace('"{table_id}"', "'advanced-team'")
+    html = page(f"<!-- {table} -->")
+    assert_players(extract_table(html, 'advanced-team'))
+
+
+def test_comment_without_target_table_is_ignored():
+    html = page('<!-- <table id="advanced-team"><tr><th>A</th></tr></table> -->', TABLE.format(table_id='advanced'))
+
+    assert_players(extract_table(html, 'advanced'))
+
+
+def test_missing_table_returns_none():
+    html = page('<!-- <table id="per_game"></table> -->', TABLE.format(table_id='totals'))
+
+    assert extract_table(html, 'advanced') is None
+    assert extract_table(html, ('advanced', 'advanced_stats')) is None
+
+
+def test_first_of_several_ids():
+    html = page(TABLE.format(table_id='advanced_stats'))
+
+    assert_players(extract_table(html, ('advanced', 'advanced_stats')))
+    assert extract_table(page(TABLE.format(table_id='advanced'),
+                              TABLE.replace('Jokić', 'Murray').format(table_id='advanced_stats')),
+                         ('advanced_stats', 'advanced'))['Player'][0] == 'Nikola Jokić'
@@ -0,0 +1,134 @@
+"""
+live_stats.pyの非同期取得レイヤー（重複リクエストの統合・期限切れデータの応答・再試行・停止）のテスト
+"""
+import concurrent.futures
+import threading
+import time
+
+import pytest
+
+import live_stats
+from fake_stats import FakeStatsServer
+from live_stats import LiveStatsClient, backoff_delay
+
+ENDPOINT = 'leaguedashteamstats'
+PARAMETERS = {'Season': '2025-26'}
+
+
+@pytest.fixture
+def server():
+    server = FakeStatsServer()
+    yield server
+    server.close()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("条件が満たされませんでした")
+        time.sleep(0.01)
+
+
+def test_concurrent_requests_are_coalesced(server):
+    server.delay = 0.3
+    client = LiveStatsClient(base_url=server.base_url)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(8) as pool:
+            frames = list(pool.map(lambda _: client.get_frame(ENDPOINT, PARAMETERS), range(8)))
+    finally:
+        client.close()
+
+    assert server.requests == 1
+    assert client.stats['upstream_requests'] == 1
+    assert client.stats['coalesced'] == 7
+    assert all(frame is frames[0] for frame in frames)
+
+
+def test_stale_value_is_served_while_refresh_fails(server):
+    client = LiveStatsClient(base_url=server.base_url, ttl=0, max_attempts=2, backoff_base=0.01)
+    try:
+        first = client.get_frame(ENDPOINT, PARAMETERS)
+        server.version = 1
+        server.fail_next = 2
+
+        # 期限切れのため前回のデータを即座に返し、裏の再取得は失敗する
+        assert client.get_frame(ENDPOINT, PARAMETERS) is first
+        wait_until(lambda: client.stats['failures'] == 1 and not client._inflight)
+        assert isinstance(client.last_errors[(ENDPOINT, tuple(PARAMETERS.items()), 0)], Exception)
+
+        # 上流が回復するまでは前回のデータを返し、次の再取得で新しいデータに置き換わる
+        assert client.get_frame(ENDPOINT, PARAMETERS) is first
+        wait_until(lambda: client.get_frame(ENDPOINT, PARAMETERS)['VERSION'].eq(1).all())
+        assert (ENDPOINT, tuple(PARAMETERS.items()), 0) not in client.last_errors
+    finally:
+        client.close()
+
+
+def test_error_without_cache_raises(server):
+    server.fail_next = 2
+    client = LiveStatsClient(base_url=server.base_url, max_attempts=2, backoff_base=0.01)
+    try:
+        with pytest.raises(live_stats.StatsRequestError):
+            client.get_frame(ENDPOINT, PARAMETERS)
+    finally:
+        client.close()
+
+    assert server.requests == 2
+
+
+def test_backoff_delay_bounds(monkeypatch):
+    for attempt in range(8):
+        upper = min(16.0, 1.0 * 2 ** attempt)
+        delays = [backoff_delay(attempt, 1.0, 16.0) for _ in range(200)]
+        assert all(0 <= delay <= upper for delay in delays)
+
+    # ジッターの上限は指数的に増え、capで頭打ちになる
+    monkeypatch.setattr(live_stats.random, 'uniform', lambda low, high: high)
+    assert [backoff_delay(attempt, 0.5, 4.0) for attempt in range(6)] == [0.5, 1.0, 2.0, 4.0, 4.0, 4.0]
+
+
+def test_close_cancels_inflight_tasks(server):
+    server.fail_next = 100
+    # 失敗後のバックオフ中に停止する
+    client = LiveStatsClient(base_url=server.base_url, backoff_base=60, backoff_max=60)
+    errors = []
+
+    def request():
+        try:
+            client.get_frame(ENDPOINT, PARAMETERS)
+        except BaseException as e:
+            errors.append(e)
+
+    waiter = threading.Thread(target=request)
+    waiter.start()
+    wait_until(lambda: server.requests >= 1 and client._inflight)
+    task = next(iter(client._inflight.values()))
+
+    start = time.monotonic()
+    client.close()
+    waiter.join(timeout=5)
+
+    assert time.monotonic() - start < 5
+    assert task.cancelled()
+    assert not client._inflight
+    assert not client._thread.is_alive()
+    assert not waiter.is_alive()
+    assert len(errors) == 1 and isinstance(errors[0], concurrent.futures.CancelledError)
+
+
+def test_first_fetch_timeout_continues_in_background(server):
+    server.delay = 0.5
+    client = LiveStatsClient(base_url=server.base_url)
+    try:
+        started = time.monotonic()
+        with pytest.raises(live_stats.StatsRequestError, match="0.1秒以内に取得できませんでした"):
+            client.get_frame(ENDPOINT, PARAMETERS, timeout=0.1)
+        assert time.monotonic() - started < 0.4
+
+        # 取得は裏で続き、完了後はキャッシュから返す
+        wait_until(lambda: client.fetched_at(ENDPOINT, PARAMETERS) is not None)
+        assert not client.get_frame(ENDPOINT, PARAMETERS, timeout=0.1).empty
+        assert server.requests == 1
+    finally:
+        client.close()
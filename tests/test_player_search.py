@@ -0,0 +1,74 @@
+"""
+player_search.pyの選手名検索（部分一致・前方一致・あいまい検索・アクセントの除去・並び順）のテスト
+"""
+from nba_data_static import NBADataManager
+from player_search import PlayerSearchIndex, normalize_name
+from synthetic import write_dataset
+
+NAMES = ['Nikola Jokić', 'Nikola Vučević', 'Jamal Murray', 'Luka Dončić', 'Dennis Schröder', 'Nick Richards']
+
+
+def search(query, mode='substring', names=NAMES):
+    return [names[i] for i in PlayerSearchIndex(names).search(query, mode=mode)]
+
+
+def test_normalize_name():
+    assert normalize_name('  Nikola   JOKIĆ ') == 'nikola jokic'
+    assert normalize_name('Kristaps Porziņģis') == 'kristaps porzingis'
+    assert normalize_name('Jusuf Nurkić') == normalize_name('jusuf nurkic')
+    assert normalize_name(None) == ''
+
+
+def test_accents_are_folded():
+    for mode in ['substring', 'prefix', 'fuzzy']:
+        assert search('jokic', mode)[0] == 'Nikola Jokić'
+        assert search('jokić', mode)[0] == 'Nikola Jokić'
+    assert search('schroder') == ['Dennis Schröder']
+
+
+def test_substring_ranking():
+    # 完全一致 → 名前の先頭からの一致 → 語頭の一致 → その他の順（同順位は元の順序）
+    names = ['Grant Williams', 'Zion Williamson', 'Williams Reed', 'Kenwilliams Cole', 'Williams']
+    assert search('williams', names=names) == ['Williams', 'Williams Reed', 'Grant Williams', 'Zion Williamson',
+                                               'Kenwilliams Cole']
+    assert search('nikola') == ['Nikola Jokić', 'Nikola Vučević']
+    assert search('nikola jokic') == ['Nikola Jokić']
+    # n-gramを作れない短いクエリ
+    assert search('ni') == ['Nikola Jokić', 'Nikola Vučević', 'Nick Richards', 'Dennis Schröder']
+    assert search('') == []
+
+
+def test_prefix_matches_any_name_token():
+    assert search('mur', 'prefix') == ['Jamal Murray']
+    assert search('ric', 'prefix') == ['Nick Richards']
+    # 語の途中からは一致しない
+    assert search('urray', 'prefix') == []
+    assert search('nikola v', 'prefix') == ['Nikola Vučević']
+
+
+def test_fuzzy_tolerates_typos():
+    assert search('jokec', 'fuzzy')[0] == 'Nikola Jokić'
+    assert search('nikola jokkic', 'fuzzy')[0] == 'Nikola Jokić'
+    assert search('murry', 'fuzzy') == ['Jamal Murray']
+    assert search('jokec') == []
+    assert search('xyzzy', 'fuzzy') == []
+
+
+def test_positions_and_limit():
+    index = PlayerSearchIndex(NAMES, positions=[10 * i for i in range(len(NAMES))])
+
+    assert index.search('nikola').tolist() == [0, 10]
+    assert index.search('nikola', limit=1).tolist() == [0]
+    assert len(index) == len(NAMES)
+
+
+def test_manager_search_removes_duplicates(tmp_path):
+    write_dataset(tmp_path, with_snapshot=False)
+    manager = NBADataManager(data_dir=str(tmp_path), source='csv', raise_errors=True)
+    name = manager.get_player_ratings(min_games=1)['PLAYER_NAME'].iloc[0]
+
+    results = manager.search_players([name, name.upper(), '', name.split()[-1]])
+
+    assert results['PLAYER_NAME'].tolist().count(name) == 1
+    assert results['PLAYER_NAME'].iloc[0] == name
+    assert manager.search_players(['']).empty
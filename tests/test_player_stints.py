@@ -0,0 +1,59 @@
+"""
+player_stints.pyの移籍選手の行の分類（合計行とチームごとの行の対応付け）のテスト
+"""
+import pandas as pd
+
+from player_stints import ROW_TYPE_COLUMN, classify_rows, split_player_rows
+
+
+def row_types(rows, **columns):
+    df = pd.DataFrame(rows, columns=['PLAYER_NAME', 'TEAM_ID'])
+    for name, values in columns.items():
+        df[name] = values
+    return classify_rows(df)[ROW_TYPE_COLUMN].tolist()
+
+
+def test_total_row_followed_by_stints():
+    rows = [
+        ('James Harden', '2TM'), ('James Harden', 'LAC'), ('James Harden', 'CLE'),
+        ('DeMar DeRozan', 'SAC'),
+        ('Dennis Schröder', '3TM'), ('Dennis Schröder', 'BRK'), ('Dennis Schröder', 'GSW'),
+        ('Dennis Schröder', 'DET'),
+    ]
+
+    assert row_types(rows) == ['total', 'stint', 'stint', 'single', 'total', 'stint', 'stint', 'stint']
+
+
+def test_same_name_players_are_not_merged():
+    # 同名の別の選手（1チームのみ）は、離れた位置にあっても隣接していても移籍選手の行にしない
+    rows = [
+        ('Marcus Williams', 'SAC'),
+        ('Marcus Williams', '2TM'), ('Marcus Williams', 'LAL'), ('Marcus Williams', 'HOU'),
+        ('Marcus Williams', 'UTA'),
+        ('Chris Paul', 'SAS'),
+    ]
+
+    assert row_types(rows) == ['single', 'total', 'stint', 'stint', 'single', 'single']
+
+
+def test_player_id_groups_rows():
+    rows = [
+        ('Marcus Williams', 'SAC'),
+        ('Marcus Williams', 'LAL'), ('Chris Paul', 'SAS'), ('Marcus Williams', '2TM'),
+        ('Marcus Williams', 'HOU'),
+    ]
+    ids = ['willima01', 'willima02', 'paulch01', 'willima02', 'willima02']
+
+    assert row_types(rows, PLAYER_ID=ids) == ['single', 'stint', 'single', 'total', 'stint']
+
+
+def test_split_player_rows():
+    df = pd.DataFrame({
+        'PLAYER_NAME': ['A', 'B', 'B', 'B', 'C'],
+        'TEAM_ID': ['LAL', '2TM', 'BOS', 'NYK', 'BOS'],
+    })
+
+    season_totals, team_stints = split_player_rows(df)
+
+    assert season_totals['TEAM_ID'].tolist() == ['LAL', '2TM', 'BOS']
+    assert team_stints['TEAM_ID'].tolist() == ['LAL', 'BOS', 'NYK', 'BOS']
@@ -0,0 +1,126 @@
+"""
+profiling.pyの処理時間の計測（入れ子の段階・再実行の終了・Prometheusのテキスト形式）のテスト
+"""
+import time
+
+import pandas as pd
+import pytest
+
+import profiling
+from profiling import Registry, finish_run, profiled, stage, start_run
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    """計測を有効にし、累計は新しいRegistryに記録する（/metricsは公開しない）"""
+    monkeypatch.setattr(profiling, 'ENABLED', True)
+    monkeypatch.setattr(profiling, 'registry', Registry())
+    monkeypatch.setattr(profiling, '_server_started', True)
+    monkeypatch.setattr(profiling, '_server', None)
+    monkeypatch.setattr(profiling._local, 'run', None, raising=False)
+    return profiling.registry
+
+
+def test_disabled_stage_records_nothing(monkeypatch):
+    monkeypatch.setattr(profiling, 'ENABLED', False)
+
+    with stage('disabled') as s:
+        s.rows = 10
+
+    assert start_run() is None
+    assert 'disabled' not in profiling.registry.prometheus_text()
+
+
+def test_nested_stage_timing(enabled):
+    run = start_run()
+    with stage('outer') as outer:
+        with stage('inner') as inner:
+            time.sleep(0.02)
+            inner.rows = 5
+        with stage('inner'):
+            pass
+        outer.rows = 3
+    finish_run(run)
+
+    names = [(name, rows, depth) for name, _, rows, depth in run.stages]
+    assert names == [('outer', 3, 0), ('inner', 5, 1), ('inner', None, 1)]
+    outer_seconds, first_inner, second_inner = (seconds for _, seconds, _, _ in run.stages)
+    assert first_inner >= 0.02
+    assert outer_seconds >= first_inner + second_inner
+    assert run.seconds >= outer_seconds
+    assert run.depth == 0
+
+
+def test_interrupted_run_is_finished(enabled):
+    # Streamlitの再実行の中断（例外）でfinallyから終了した場合、次の段階は前の再実行に記録されない
+    run = start_run()
+    with pytest.raises(RuntimeError):
+        try:
+            with stage('page'):
+                raise RuntimeError("rerun")
+        finally:
+            finish_run(run)
+
+    with stage('after'):
+        pass
+
+    assert [entry[0] for entry in run.stages] == ['page']
+    assert profiling._local.run is None
+    assert enabled.runs == 1
+
+
+def test_main_finishes_run_when_rerun_is_interrupted(enabled, monkeypatch):
+    # main.pyのインポートで有効にするコピーオンライトは他のテストに持ち越さない
+    with pd.option_context('mode.copy_on_write', False):
+        import main
+
+    def interrupt():
+        with stage('page.setup'):
+            raise RuntimeError("rerun")
+
+    monkeypatch.setattr(main, 'setup_page', interrupt)
+    with pytest.raises(RuntimeError):
+        main.main()
+
+    assert profiling._local.run is None
+    assert enabled.runs == 1
+    assert 'nba_stage_seconds_count{stage="page.setup"} 1' in enabled.prometheus_text()
+
+
+def test_profiled_records_rows(enabled):
+    @profiled('manager.rows')
+    def rows():
+        return pd.DataFrame({'a': [1, 2]})
+
+    rows()
+    rows()
+
+    assert 'nba_stage_rows_total{stage="manager.rows"} 4' in enabled.prometheus_text()
+
+
+def test_prometheus_text(enabled):
+    enabled.record('b.stage', 0.003, rows=7)
+    enabled.record('a.stage', 0.2)
+    enabled.record('a.stage', 10.0, rows=1)
+    enabled.record_run(0.5)
+    enabled.add_collector(lambda: ['# TYPE extra gauge', 'extra 1'])
+
+    lines = enabled.prometheus_text().splitlines()
+
+    assert 'nba_rerun_seconds_count 1' in lines
+    assert 'nba_rerun_seconds_sum 0.500000' in lines
+    # ヒストグラムは累積（区切り以下の回数）で、+Infは全回数
+    assert 'nba_stage_seconds_bucket{stage="a.stage",le="0.1"} 0' in lines
+    assert 'nba_stage_seconds_bucket{stage="a.stage",le="0.25"} 1' in lines
+    assert 'nba_stage_seconds_bucket{stage="a.stage",le="5.0"} 1' in lines
+    assert 'nba_stage_seconds_bucket{stage="a.stage",le="+Inf"} 2' in lines
+    assert 'nba_stage_seconds_sum{stage="a.stage"} 10.200000' in lines
+    assert 'nba_stage_seconds_count{stage="b.stage"} 1' in lines
+    assert 'nba_stage_seconds_bucket{stage="b.stage",le="0.001"} 0' in lines
+    assert 'nba_stage_seconds_bucket{stage="b.stage",le="0.005"} 1' in lines
+    assert 'nba_stage_rows_total{stage="a.stage"} 1' in lines
+    assert 'nba_stage_rows_total{stage="b.stage"} 7' in lines
+    # 段階は名前順
+    assert lines.index('nba_stage_seconds_count{stage="a.stage"} 2') < lines.index(
+        'nba_stage_seconds_count{stage="b.stage"} 1')
+    assert lines[-2:] == ['# TYPE extra gauge', 'extra 1']
@@ -0,0 +1,112 @@
+"""
+result_cache.pyの表示用の表のキャッシュ（LRUによる解放・データ更新時の解放・統計情報）のテスト
+"""
+import numpy as np
+import pandas as pd
+
+from result_cache import ResultCache, _size_of
+
+
+def table(n):
+    return pd.DataFrame({'value': np.arange(n, dtype='float64')})
+
+
+def fill(cache, views, version='v1', make=lambda view: table(10)):
+    for view in views:
+        cache.get_or_compute('data', version, view, lambda: make(view))
+
+
+def cached_views(cache):
+    return [key[2] for key in cache._entries]
+
+
+def test_hit_returns_cached_value():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return table(10)
+
+    first = cache.get_or_compute('data', 'v1', ('players', 20), compute)
+    second = cache.get_or_compute('data', 'v1', ('players', 20), compute)
+
+    assert second is first
+    assert len(calls) == 1
+    # データのバージョン・表示条件・データディレクトリが違えば別の表
+    cache.get_or_compute('data', 'v2', ('players', 20), compute)
+    cache.get_or_compute('data', 'v1', ('players', 10), compute)
+    cache.get_or_compute('other', 'v1', ('players', 20), compute)
+    assert len(calls) == 4
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 4
+
+
+def test_lru_eviction_by_entry_count():
+    cache = ResultCache(max_entries=3)
+    fill(cache, ['a', 'b', 'c'])
+    # 参照した表は最も新しく使われた表になる
+    fill(cache, ['a'])
+
+    fill(cache, ['d'])
+
+    assert cached_views(cache) == ['c', 'a', 'd']
+    assert cache.stats()['evictions'] == 1
+
+
+def test_lru_eviction_by_bytes():
+    size = _size_of(table(100))
+    cache = ResultCache(max_bytes=size * 2)
+
+    fill(cache, ['a', 'b', 'c'], make=lambda view: table(100))
+
+    assert cached_views(cache) == ['b', 'c']
+    assert cache.bytes == size * 2
+    assert cache.stats()['evictions'] == 1
+
+    # 上限を超える表は保持しない（保持中の表も解放しない）
+    cache.get_or_compute('data', 'v1', 'large', lambda: table(1000))
+    assert cached_views(cache) == ['b', 'c']
+
+
+def test_nothing_is_cached_without_version():
+    cache = ResultCache()
+
+    first = cache.get_or_compute('data', None, 'a', lambda: table(10))
+    second = cache.get_or_compute('data', None, 'a', lambda: table(10))
+
+    assert second is not first
+    assert cache.stats()['entries'] == 0 and cache.bytes == 0
+
+
+def test_invalidate_keeps_version():
+    cache = ResultCache()
+    fill(cache, ['a', 'b'], version='v1')
+    fill(cache, ['a'], version='v2')
+    cache.get_or_compute('other', 'v1', 'a', lambda: table(10))
+
+    assert cache.invalidate('data', keep_version='v2') == 2
+
+    assert [key[:2] for key in cache._entries] == [('data', 'v2'), ('other', 'v1')]
+    assert cache.bytes == sum(size for _, size in cache._entries.values())
+    assert cache.invalidate('data') == 1
+    assert cache.stats()['invalidations'] == 3
+
+
+def test_stats_and_prometheus_lines():
+    cache = ResultCache(max_entries=1)
+    fill(cache, ['a', 'a', 'b'])
+    cache.invalidate('data')
+
+    stats = cache.stats()
+    lines = cache.prometheus_lines()
+
+    assert stats == {'entries': 0, 'bytes': 0, 'max_entries': 1, 'max_bytes': cache.max_bytes,
+                     'hits': 1, 'misses': 2, 'evictions': 1, 'invalidations': 1}
+    for line in ['nba_result_cache_requests_total{result="hit"} 1',
+                 'nba_result_cache_requests_total{result="miss"} 2',
+                 'nba_result_cache_evictions_total 1',
+                 'nba_result_cache_invalidations_total 1',
+                 'nba_result_cache_bytes 0',
+                 'nba_result_cache_entries 0']:
+        assert line in lines
+    assert all(line.startswith(('# HELP nba_', '# TYPE nba_', 'nba_')) for line in lines)
@@ -0,0 +1,84 @@
+"""
+nba_data_static.SeasonStoreのLRU（保持シーズン数・データ量の上限による解放と統計情報）のテスト
+"""
+import pytest
+
+from nba_data_static import SeasonStore
+from seasons import season_dir
+from synthetic import write_dataset
+
+SEASONS = ['2023-24', '2024-25', '2025-26']
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for seed, season in enumerate(SEASONS):
+        write_dataset(season_dir(str(tmp_path), season), seed=seed)
+    return str(tmp_path)
+
+
+def make_store(data_dir, **kwargs):
+    return SeasonStore(data_dir, interval=3600, source='snapshot', **kwargs)
+
+
+def close(store):
+    for shared in store._entries.values():
+        shared.stop()
+
+
+def test_evicts_least_recently_used_by_season_count(data_dir):
+    store = make_store(data_dir, max_seasons=2, max_bytes=float('inf'))
+    try:
+        first = store.get('2023-24')
+        store.get('2024-25')
+        assert store.get('2023-24') is first
+        evicted = store._entries['2024-25']
+        store.get('2025-26')
+
+        stats = store.stats()
+        assert stats['resident_seasons'] == ['2023-24', '2025-26']
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1)
+        assert evicted._stop_event.is_set()
+
+        # 解放したシーズンは次の要求で読み込み直す
+        assert store.get('2024-25') is not None
+        stats = store.stats()
+        assert stats['resident_seasons'] == ['2025-26', '2024-25']
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 4, 2)
+    finally:
+        close(store)
+
+
+def test_evicts_least_recently_used_by_bytes(data_dir):
+    probe = make_store(data_dir)
+    try:
+        season_bytes = probe.get('2023-24').memory_usage()
+    finally:
+        close(probe)
+
+    # 2シーズン分には足りない上限
+    store = make_store(data_dir, max_seasons=len(SEASONS), max_bytes=season_bytes * 1.5)
+    try:
+        store.get('2023-24')
+        store.get('2024-25')
+        stats = store.stats()
+        assert stats['resident_seasons'] == ['2024-25']
+        assert stats['resident_bytes'] <= stats['max_bytes']
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (0, 2, 1)
+    finally:
+        close(store)
+
+
+def test_keeps_latest_season_over_byte_limit(data_dir):
+    store = make_store(data_dir, max_bytes=1)
+    try:
+        manager = store.get('2025-26')
+        assert store.get('2025-26') is manager
+        store.get('2024-25')
+
+        stats = store.stats()
+        assert stats['resident_seasons'] == ['2024-25']
+        assert stats['resident_bytes'] > stats['max_bytes']
+        assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 2, 1)
+    finally:
+        close(store)
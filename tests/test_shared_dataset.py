@@ -0,0 +1,116 @@
+"""
+shared_dataset.pyの共有データの公開・参照・版の切り替えと、worker_pool.pyのロードバランサーのテスト
+"""
+import http.server
+import os
+import socket
+import threading
+import urllib.request
+from datetime import datetime, timedelta
+
+import shared_dataset
+import snapshot_store
+from data_sources import create_source
+from nba_data_static import NBADataManager
+from seasons import DEFAULT_SEASON
+from synthetic import write_dataset
+from worker_pool import LoadBalancer, start_in_thread
+
+CREATED_AT = datetime(2026, 10, 18, 16, 22)
+
+
+def publish_data(data_dir, day, scale=1):
+    """データの新しい版を公開し、読み込んだデータマネージャーを返す"""
+    staging = snapshot_store.create_staging(str(data_dir))
+    write_dataset(staging, scale=scale)
+    snapshot_store.publish(str(data_dir), staging, DEFAULT_SEASON, CREATED_AT + timedelta(days=day))
+    return NBADataManager(data_dir=str(data_dir), source='snapshot', raise_errors=True)
+
+
+def test_publish_and_attach(tmp_path):
+    shared_dir = str(tmp_path / 'shared')
+    manager = publish_data(tmp_path / 'data', 0)
+
+    version_dir = shared_dataset.publish(manager, shared_dir)
+
+    assert shared_dataset.resolve(DEFAULT_SEASON, shared_dir) == (version_dir, manager.source.version)
+    manifest = shared_dataset.read_manifest(version_dir)
+    assert manifest['version'] == manager.source.version
+    assert manifest['last_updated'] == manager.get_last_updated()
+    frames = shared_dataset.attach(version_dir)
+    assert set(frames) == set(shared_dataset.FRAMES.values())
+    for name, attr in shared_dataset.FRAMES.items():
+        df, expected = frames[attr], getattr(manager, attr)
+        assert manifest['rows'][name] == len(df) == len(expected)
+        assert df.columns.tolist() == expected.columns.tolist()
+        assert df['OFF_RATING'].tolist() == expected['OFF_RATING'].tolist()
+    # 同じ版は書き出し直さない
+    assert shared_dataset.publish(manager, shared_dir) == version_dir
+
+
+def test_readers_follow_new_versions_and_old_versions_are_pruned(tmp_path, monkeypatch):
+    shared_dir = tmp_path / 'shared'
+    monkeypatch.setattr(shared_dataset, 'SHARED_DIR', str(shared_dir))
+    data_dir = tmp_path / 'data'
+    first = shared_dataset.publish(publish_data(data_dir, 0))
+    reader = NBADataManager(data_dir=str(data_dir), source=create_source('shared', DEFAULT_SEASON, str(data_dir)),
+                            raise_errors=True)
+    rows = len(reader.player_ratings_cache)
+
+    # 新しい版を公開すると、ワーカーは変更を検知して新しい版を参照する
+    second = shared_dataset.publish(publish_data(data_dir, 1, scale=2))
+    assert reader.source.signature() != reader.signature
+    reader = NBADataManager(data_dir=str(data_dir), source=reader.source, raise_errors=True)
+    assert reader.source.version_dir == second
+    assert len(reader.player_ratings_cache) > rows
+
+    # 公開中の版以外はKEEP_SHARED_VERSIONS個まで残す
+    third = shared_dataset.publish(publish_data(data_dir, 2))
+    season_path = shared_dir / DEFAULT_SEASON
+    assert sorted(os.listdir(season_path)) == sorted([snapshot_store.CURRENT_FILE] +
+                                                     [os.path.basename(path) for path in (second, third)])
+    assert shared_dataset.KEEP_SHARED_VERSIONS == 2
+    assert not os.path.exists(first)
+    assert snapshot_store.current_version(str(season_path)) == os.path.basename(third)
+
+
+def test_balancer_prefers_least_connections():
+    balancer = LoadBalancer([('127.0.0.1', 1), ('127.0.0.1', 2), ('127.0.0.1', 3)])
+
+    balancer.active = [2, 0, 1]
+    assert balancer._candidates() == [1, 2, 0]
+
+    # 接続数が同じワーカーの間では順番に振り分ける
+    balancer.active = [0, 0, 0]
+    assert [balancer._candidates()[0] for _ in range(4)] == [1, 2, 0, 1]
+
+
+def test_balancer_skips_backend_that_is_down():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Length', '2')
+            self.end_headers()
+            self.wfile.write(b'up')
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    # 待ち受けていないポート（停止したワーカー）
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        down = sock.getsockname()
+    balancer = LoadBalancer([down, server.server_address])
+    port, stop = start_in_thread(balancer)
+    try:
+        for _ in range(4):
+            assert urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read() == b'up'
+        stats = balancer.stats()
+        assert stats['connections'] == [0, 4]
+        assert stats['failures'] == 0
+    finally:
+        stop()
+        server.shutdown()
+        server.server_close()
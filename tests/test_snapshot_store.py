@@ -0,0 +1,135 @@
+"""
+snapshot_store.pyの版の検証・公開・古い版の削除のテスト
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from snapshot_store import (CURRENT_FILE, KEEP_VERSIONS, MIN_ROW_RATIO, STAGING_PREFIX, VERSIONS_DIR,
+                            SnapshotValidationError, build_manifest, create_staging, current_version,
+                            data_version, prune_versions, publish, validate)
+from synthetic import write_dataset
+
+SEASON = '2025-26'
+CREATED_AT = datetime(2026, 10, 18, 16, 22)
+
+
+def publish_dataset(season_path, created_at=CREATED_AT, edit=None):
+    """合成データの版を作成し、editでCSVを書き換えてから公開する"""
+    staging = create_staging(str(season_path))
+    write_dataset(staging, with_snapshot=False)
+    if edit is not None:
+        edit(staging)
+    return publish(str(season_path), staging, SEASON, created_at)
+
+
+def edit_csv(filename, change):
+    def edit(staging):
+        path = os.path.join(staging, filename)
+        pd.read_csv(path).pipe(change).to_csv(path, index=False)
+    return edit
+
+
+def write_version(path):
+    write_dataset(path, with_snapshot=False)
+    return str(path), 'v1'
+
+
+def manifest_errors(path, edit, previous=None):
+    """データを書き換えてからマニフェストを作成し、検証結果を返す"""
+    write_dataset(path, with_snapshot=False)
+    edit(str(path))
+    manifest = build_manifest(str(path), 'v2', SEASON, CREATED_AT)
+    return validate(str(path), manifest, previous)
+
+
+def test_valid_dataset_has_no_errors(tmp_path):
+    assert manifest_errors(tmp_path, lambda path: None) == []
+
+
+def test_validate_rejects_missing_required_column(tmp_path):
+    errors = manifest_errors(tmp_path, edit_csv('team_ratings.csv', lambda df: df.drop(columns='DEF_RATING')))
+
+    assert errors == ["team_ratings.csvに必要な列がありません: DEF_RATING"]
+
+
+def test_validate_rejects_non_numeric_rating(tmp_path):
+    def change(df):
+        df['OFF_RATING'] = df['OFF_RATING'].astype(str)
+        df.loc[0, 'OFF_RATING'] = '-'
+        return df
+
+    errors = manifest_errors(tmp_path, edit_csv('player_ratings.csv', change))
+
+    assert errors == ["player_ratings.csvのOFF_RATINGが数値ではありません"]
+
+
+def test_validate_rejects_row_loss(tmp_path):
+    previous = build_manifest(*write_version(tmp_path / 'previous'), SEASON, CREATED_AT)
+    rows = previous['files']['player_ratings.csv']['rows']
+    keep = int(rows * MIN_ROW_RATIO) - 1
+
+    errors = manifest_errors(tmp_path / 'current', edit_csv('player_ratings.csv', lambda df: df.head(keep)), previous)
+
+    assert errors == [f"player_ratings.csvの行数が前の版から大きく減っています（{rows} → {keep}）"]
+    assert manifest_errors(tmp_path / 'kept', edit_csv('player_ratings.csv', lambda df: df.head(keep + 1)),
+                           previous) == []
+
+
+def test_validate_rejects_column_loss(tmp_path):
+    # 前の版にあった必須ではない列が消えた場合
+    previous_dir, version = write_version(tmp_path / 'previous')
+    edit_csv('player_ratings.csv', lambda df: df.assign(MIN=30.0))(previous_dir)
+    previous = build_manifest(previous_dir, version, SEASON, CREATED_AT)
+
+    errors = manifest_errors(tmp_path / 'current', lambda path: None, previous)
+
+    assert errors == ["player_ratings.csvから列が消えています: MIN"]
+
+
+def test_rejected_publish_keeps_current(tmp_path):
+    version = publish_dataset(tmp_path)
+
+    with pytest.raises(SnapshotValidationError) as error:
+        publish_dataset(tmp_path, CREATED_AT + timedelta(days=1),
+                        edit_csv('player_ratings.csv', lambda df: df.head(1)))
+
+    assert "player_ratings.csvの行数が前の版から大きく減っています" in str(error.value)
+    assert current_version(str(tmp_path)) == version
+    assert os.listdir(tmp_path / VERSIONS_DIR) == [version]
+
+
+def test_publish_prunes_to_keep_versions(tmp_path):
+    # 版管理の導入前のファイルは最初の公開で置き換わる
+    write_dataset(tmp_path, with_snapshot=False)
+    versions = [publish_dataset(tmp_path, CREATED_AT + timedelta(days=day)) for day in range(KEEP_VERSIONS + 2)]
+
+    assert current_version(str(tmp_path)) == versions[-1]
+    assert sorted(os.listdir(tmp_path / VERSIONS_DIR)) == versions[-KEEP_VERSIONS:]
+    assert sorted(os.listdir(tmp_path)) == [CURRENT_FILE, VERSIONS_DIR]
+
+
+def test_data_version():
+    versioned = SimpleNamespace(source=SimpleNamespace(version='20261018T000000-abcdef12'), signature=None)
+    files = SimpleNamespace(source=SimpleNamespace(), signature=(('team_ratings.csv', 1, 2),))
+
+    assert data_version(versioned) == '20261018T000000-abcdef12'
+    assert data_version(files).startswith('files-')
+    assert data_version(files) == data_version(SimpleNamespace(source=None, signature=files.signature))
+
+
+def test_prune_versions_keeps_current_and_newest(tmp_path):
+    for name in ['v1', 'v2', 'v3', 'v4']:
+        (tmp_path / name).mkdir()
+        # 作成順をmtimeで判定するため間隔を空ける
+        time.sleep(0.01)
+    (tmp_path / f"{STAGING_PREFIX}abc").mkdir()
+    (tmp_path / CURRENT_FILE).write_text('v1\n')
+
+    prune_versions(str(tmp_path), keep=2)
+
+    assert sorted(os.listdir(tmp_path)) == [CURRENT_FILE, 'v1', 'v3', 'v4']
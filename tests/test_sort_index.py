@@ -0,0 +1,61 @@
+"""
+sort_index.pyのソート順（欠損値の位置・同じ値の行の順序・pandasのsort_valuesとの一致）のテスト
+"""
+import numpy as np
+import pandas as pd
+
+from sort_index import SortIndex
+
+DF = pd.DataFrame({
+    'WS': [1.5, np.nan, 3.0, 1.5, -2.0, np.nan, 3.0, 1.5],
+    'GP': pd.array([10, 20, None, 10, 30, 20, 10, None], dtype='Int64'),
+    'PLAYER_NAME': ['b', 'a', None, 'c', 'a', 'b', 'a', 'c'],
+    'TEAM_ID': pd.Categorical(['DEN', 'BOS', 'DEN', None, 'BOS', 'LAL', 'DEN', 'BOS']),
+})
+
+
+def expected(df, column, ascending):
+    return df.sort_values(column, ascending=ascending, na_position='last', kind='stable').index.tolist()
+
+
+def test_orders_match_sort_values():
+    index = SortIndex(DF)
+
+    for column in DF.columns:
+        for ascending in [True, False]:
+            assert index.order(column, ascending).tolist() == expected(DF, column, ascending), (column, ascending)
+
+
+def test_nan_is_last_in_both_directions():
+    index = SortIndex(DF)
+
+    assert index.order('WS').tolist()[-2:] == [1, 5]
+    assert index.order('WS', ascending=False).tolist()[-2:] == [1, 5]
+    assert index.order('GP', ascending=False).tolist()[-2:] == [2, 7]
+
+
+def test_ties_keep_original_order():
+    index = SortIndex(DF)
+
+    assert index.order('WS').tolist() == [4, 0, 3, 7, 2, 6, 1, 5]
+    assert index.order('WS', ascending=False).tolist() == [2, 6, 0, 3, 7, 4, 1, 5]
+
+
+def test_random_data_matches_sort_values():
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 20, 500).astype('float64')
+    values[rng.random(500) < 0.1] = np.nan
+    df = pd.DataFrame({'value': values, 'name': rng.choice(['x', 'y', 'z'], 500)})
+    index = SortIndex(df)
+
+    for column in df.columns:
+        for ascending in [True, False]:
+            assert index.order(column, ascending).tolist() == expected(df, column, ascending)
+
+
+def test_empty_and_all_missing_columns():
+    df = pd.DataFrame({'a': [np.nan, np.nan], 'b': [1.0, 2.0]})
+    index = SortIndex(df)
+
+    assert index.order('a', ascending=False).tolist() == [0, 1]
+    assert SortIndex(df.iloc[:0]).order('b', ascending=False).tolist() == []
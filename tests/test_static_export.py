@@ -0,0 +1,133 @@
+"""
+static_export.pyの書き出し（並び順ごとのファイル）と配信（ExportStore・HTTPサーバー）のテスト
+"""
+import json
+import os
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from nba_data_static import NBADataManager
+from snapshot_store import CURRENT_FILE, MANIFEST_FILE, current_version
+from static_export import DEFAULT_SORT, ExportStore, build_export, make_server
+from synthetic import write_dataset
+
+SEASON = '2025-26'
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    version_dir = tmp_path / SEASON / 'v1'
+    version_dir.mkdir(parents=True)
+    (version_dir / 'index.html').write_text('<p>index</p>')
+    (tmp_path / SEASON / CURRENT_FILE).write_text('v1\n')
+    (tmp_path / 'secret.txt').write_text('secret')
+    return tmp_path
+
+
+def start_server(output_dir):
+    server = make_server(str(output_dir), port=0)
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def read_text(path):
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+
+def test_store_serves_only_existing_seasons(output_dir):
+    store = ExportStore(str(output_dir), check_interval=0)
+
+    assert store.get(SEASON, 'index.html') == (b'<p>index</p>', 'v1')
+    for season in ['..', '.', 'secret.txt', '2024-25', '2025-26/..', 'x' * 200]:
+        assert store.get(season, 'index.html') == (None, None)
+        assert store.get(season, 'secret.txt') == (None, None)
+    assert store.get(SEASON, '../../secret.txt') == (None, None)
+    assert list(store._versions) == [SEASON]
+
+
+def test_store_forgets_removed_season(output_dir):
+    store = ExportStore(str(output_dir), check_interval=0)
+    store.get(SEASON, 'index.html')
+
+    shutil.rmtree(output_dir / SEASON)
+
+    assert store.get(SEASON, 'index.html') == (None, None)
+    assert store._versions == {} and store._files == {}
+
+
+def test_server_returns_404_outside_seasons(output_dir):
+    server, base_url = start_server(output_dir)
+    try:
+        assert urllib.request.urlopen(f"{base_url}/{SEASON}/index.html", timeout=5).read() == b'<p>index</p>'
+        for path in ['/../secret.txt', '/%2E%2E/secret.txt', '/..%2Fsecret.txt', '/2024-25/index.html']:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base_url}{path}", timeout=5)
+            assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_build_export_writes_one_file_per_sort_order(tmp_path):
+    write_dataset(tmp_path / 'data', with_snapshot=False)
+    manager = NBADataManager(season=SEASON, data_dir=str(tmp_path / 'data'), source='csv', raise_errors=True)
+
+    target = build_export(manager, str(tmp_path / 'export'))
+
+    assert current_version(str(tmp_path / 'export' / SEASON)) == os.path.basename(target)
+    team_columns = manager.get_team_ratings().columns.tolist()
+    team_json = json.loads(read_text(os.path.join(target, 'team_ratings.json')))
+    assert sorted(team_json['orders']) == sorted(team_columns)
+    assert sorted(os.listdir(os.path.join(target, 'team_ratings'))) == sorted(
+        f"{col}-{order}.html" for col in team_columns for order in ('asc', 'desc'))
+    # 並び順は表示用の表と同じ（JSONの行位置とHTMLの行の順序）
+    teams = manager.get_team_ratings()
+    expected = teams.sort_values('NET_RATING', ascending=False, kind='stable').index.tolist()
+    assert team_json['orders']['NET_RATING']['desc'] == expected
+    assert len(team_json['rows']) == len(teams)
+    html_page = read_text(os.path.join(target, 'team_ratings', DEFAULT_SORT))
+    names = [teams['TEAM_NAME'][i] for i in expected]
+    assert [html_page.index(name) for name in names] == sorted(html_page.index(name) for name in names)
+
+    player_columns = manager.get_player_ratings(min_games=20).columns.tolist()
+    assert sorted(os.listdir(os.path.join(target, 'players'))) == sorted(
+        f"{col}-{order}.html" for col in player_columns for order in ('asc', 'desc'))
+    team_files = os.listdir(os.path.join(target, 'teams'))
+    team_keys = [name[:-len('.json')] for name in team_files if name.endswith('.json')]
+    assert team_keys
+    for key in team_keys:
+        assert len(os.listdir(os.path.join(target, 'teams', key))) == 2 * len(player_columns)
+
+    manifest = json.loads(read_text(os.path.join(target, MANIFEST_FILE)))
+    written = sorted(os.path.relpath(os.path.join(root, name), target).replace(os.sep, '/')
+                     for root, _, names in os.walk(target) for name in names if name != MANIFEST_FILE)
+    assert manifest['files'] == written
+    # 同じ版は書き出し直さない
+    assert build_export(manager, str(tmp_path / 'export')) == target
+
+
+def test_server_returns_etag_and_304(output_dir):
+    server, base_url = start_server(output_dir)
+    try:
+        response = urllib.request.urlopen(f"{base_url}/{SEASON}/index.html", timeout=5)
+        assert response.status == 200
+        assert response.headers['ETag'] == '"v1"'
+        assert response.headers['Content-Type'].startswith('text/html')
+
+        request = urllib.request.Request(f"{base_url}/{SEASON}/index.html", headers={'If-None-Match': '"v1"'})
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 304
+        assert error.value.headers['ETag'] == '"v1"'
+
+        # 別の版のETagには本文を返す
+        request = urllib.request.Request(f"{base_url}/{SEASON}/index.html", headers={'If-None-Match': '"v0"'})
+        assert urllib.request.urlopen(request, timeout=5).read() == b'<p>index</p>'
+    finally:
+        server.shutdown()
+        server.server_close()
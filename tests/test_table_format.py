@@ -0,0 +1,41 @@
+"""
+table_format.pyの表示用文字列への変換のテスト
+"""
+import numpy as np
+import pandas as pd
+
+from table_format import format_columns
+
+
+def test_decimals_are_padded():
+    df = pd.DataFrame({'OWS': [1.0, -0.25, 12.0], 'WS/36': [0.1, -0.05, 0.0]})
+
+    text = format_columns(df)
+
+    assert text['OWS'].tolist() == ['1.0', '-0.2', '12.0']
+    assert text['WS/36'].tolist() == ['0.100', '-0.050', '0.000']
+
+
+def test_missing_values_and_integers():
+    df = pd.DataFrame({'WS/36': [np.nan, -0.0001], 'GP': [np.nan, 12.0]})
+
+    text = format_columns(df)
+
+    assert text['WS/36'].tolist() == ['', '0.000']
+    assert text['GP'].tolist() == ['', '12']
+
+
+def test_float32_values():
+    df = pd.DataFrame({'WS': np.array([0.3, 10.05], dtype='float32')})
+
+    assert format_columns(df)['WS'].tolist() == ['0.3', '10.1']
+
+
+def test_derived_metric_decimals():
+    df = pd.DataFrame({'WS/G': [0.1, 0.0456], 'チーム内WS(z)': [1.5, -0.004], 'WSパーセンタイル': [99.6, 0.2]})
+
+    text = format_columns(df)
+
+    assert text['WS/G'].tolist() == ['0.100', '0.046']
+    assert text['チーム内WS(z)'].tolist() == ['1.50', '0.00']
+    assert text['WSパーセンタイル'].tolist() == ['100', '0']
@@ -0,0 +1,68 @@
+"""
+team_metadata.pyのチームの表記（略称・チーム名・ID・移転前のチーム）からチームのキーへの対応のテスト
+"""
+import pandas as pd
+
+from nba_data_static import DATA_DIR
+from team_metadata import BREF_ABBREVIATIONS, FORMER_TEAMS, TeamIndex, clean_team_name, load_teams
+
+TEAMS = load_teams(DATA_DIR)
+
+
+def test_every_team_resolves_by_abbreviation_name_and_id():
+    index = TeamIndex(TEAMS)
+
+    assert len(index.teams) == 30
+    for team in TEAMS:
+        key = team['abbreviation']
+        for value in [key, team['full_name'], team['id'], str(team['id'])]:
+            assert index.key(value) == key
+        assert index.team(team['full_name']) is team
+
+
+def test_basketball_reference_abbreviations():
+    index = TeamIndex(TEAMS)
+
+    assert BREF_ABBREVIATIONS == {'BRK': 'BKN', 'CHO': 'CHA', 'PHO': 'PHX'}
+    assert [index.key(code) for code in ['BRK', 'CHO', 'PHO']] == ['BKN', 'CHA', 'PHX']
+
+
+def test_team_names_with_playoff_mark_and_case():
+    index = TeamIndex(TEAMS)
+
+    assert clean_team_name(' Denver Nuggets* ') == 'denver nuggets'
+    for name in ['Denver Nuggets*', 'Denver Nuggets *', 'denver nuggets', 'DENVER NUGGETS', ' Denver Nuggets ']:
+        assert index.key(name) == 'DEN'
+
+
+def test_former_teams():
+    index = TeamIndex(TEAMS)
+
+    for code, (name, key) in FORMER_TEAMS.items():
+        assert index.key(code) == key
+        assert index.key(name) == key
+        assert index.key(f"{name}*") == key
+    assert index.key('SEA') == 'OKC'
+    assert index.key('Seattle SuperSonics') == 'OKC'
+
+
+def test_unknown_values():
+    index = TeamIndex(TEAMS)
+
+    for value in ['2TM', 'TOT', '', None, float('nan'), ['BOS']]:
+        assert index.key(value) is None
+        assert index.team(value) is None
+
+
+def test_normalize_series():
+    index = TeamIndex(TEAMS)
+    values = pd.Series(['BRK', 'CHO', '2TM', None, 'PHO', 'BRK'], index=[5, 4, 3, 2, 1, 0], name='TEAM_ID')
+
+    result = index.normalize(values)
+
+    assert result.tolist() == ['BKN', 'CHA', '2TM', None, 'PHX', 'BKN']
+    assert result.index.equals(values.index) and result.name == 'TEAM_ID'
+    categories = index.normalize(values.astype('category'))
+    assert isinstance(categories.dtype, pd.CategoricalDtype)
+    assert categories.dropna().tolist() == ['BKN', 'CHA', '2TM', 'PHX', 'BKN']
+    assert categories.isna().tolist() == values.isna().tolist()
@@ -0,0 +1,237 @@
+"""
+複数のStreamlitワーカープロセスとローカルのロードバランサーによる起動モード（横方向のスケール用）
+1つのStreamlitプロセスはGILにより実質1コアしか使えないため、同じマシンで複数のプロセスを起動する。
+
+- ローダー: shared_dataset.pyでデータを一度だけ読み込んで共有メモリに公開し、データの更新を監視して新しい版を公開
+- ワーカー: NBA_DATA_SOURCE=shared で起動したStreamlit（--workers個、ポートは --port+1 から）。
+  公開された版をメモリマップで参照するため、ワーカーを増やしてもデータの解析・メモリは増えない
+- ロードバランサー: --port で受けたTCP接続を、接続数の最も少ないワーカーへそのまま中継する。
+  StreamlitのセッションはWebSocketの1接続に対応するため、同じセッションは同じワーカーに留まる
+
+ワーカー・ローダーが終了した場合は再起動する。
+
+使い方:
+    python worker_pool.py [--workers 4] [--port 8501] [--host 0.0.0.0] [--data-dir data]
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import shared_dataset
+from profiling import METRICS_PORT
+from seasons import DEFAULT_SEASON, available_seasons
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 中継時に一度に読み込むバイト数
+CHUNK_SIZE = 64 * 1024
+
+# ワーカー・ローダーの終了を確認する間隔（秒）
+SUPERVISE_INTERVAL_SECONDS = 2
+
+# 最初の版の公開を待つ時間（秒）
+PUBLISH_TIMEOUT_SECONDS = 120
+
+
+async def _pipe(reader, writer):
+    """片方向の中継（読み込み側が閉じたら書き込み側の送信も閉じる）"""
+    try:
+        while True:
+            data = await reader.read(CHUNK_SIZE)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except (ConnectionError, OSError):
+        writer.close()
+
+
+class LoadBalancer:
+    """接続数の最も少ないワーカーへTCP接続を中継するロードバランサー
+
+    接続数が同じワーカーの間では順番に振り分け、接続できないワーカー（再起動中など）は飛ばす。
+    """
+
+    def __init__(self, backends):
+        """
+        Args:
+            backends: ワーカーの (ホスト, ポート) のリスト
+        """
+        self.backends = list(backends)
+        self.active = [0] * len(self.backends)
+        self.connections = [0] * len(self.backends)
+        self.failures = 0
+        self._next = 0
+
+    def _candidates(self):
+        """接続を試す順のワーカーの番号（接続数の少ない順、同数の場合は前回の次から順番）"""
+        start = self._next
+        self._next = (self._next + 1) % len(self.backends)
+        order = [(start + i) % len(self.backends) for i in range(len(self.backends))]
+        return sorted(order, key=lambda index: self.active[index])
+
+    async def handle(self, client_reader, client_writer):
+        for index in self._candidates():
+            try:
+                backend_reader, backend_writer = await asyncio.open_connection(*self.backends[index])
+                break
+            except OSError:
+                continue
+        else:
+            self.failures += 1
+            client_writer.close()
+            return
+
+        self.active[index] += 1
+        self.connections[index] += 1
+        try:
+            await asyncio.gather(_pipe(client_reader, backend_writer), _pipe(backend_reader, client_writer))
+        finally:
+            self.active[index] -= 1
+            backend_writer.close()
+            client_writer.close()
+
+    async def start(self, host, port):
+        """待ち受けを開始（port=0の場合は空いているポート）"""
+        return await asyncio.start_server(self.handle, host, port)
+
+    def stats(self):
+        """ワーカーごとの接続中・累計の接続数と、どのワーカーにも接続できなかった回数"""
+        return {
+            'backends': [f"{host}:{port}" for host, port in self.backends],
+            'active': list(self.active),
+            'connections': list(self.connections),
+            'failures': self.failures,
+        }
+
+
+def start_in_thread(balancer, host='127.0.0.1', port=0):
+    """別スレッドのイベントループで待ち受けを開始し、(ポート, 停止する関数) を返す"""
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(balancer.start(host, port))
+    threading.Thread(target=loop.run_forever, name='nba-load-balancer', daemon=True).start()
+
+    async def shutdown():
+        server.close()
+        # 中継中の接続を閉じる
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop():
+        asyncio.run_coroutine_threadsafe(shutdown(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+
+    return server.sockets[0].getsockname()[1], stop
+
+
+class WorkerPool:
+    """ローダーとStreamlitワーカーのプロセスを起動・監視する"""
+
+    def __init__(self, workers, base_port, data_dir='data', shared_dir=None):
+        self.workers = workers
+        self.ports = [base_port + i + 1 for i in range(workers)]
+        self.data_dir = os.path.abspath(data_dir)
+        self.shared_dir = os.path.abspath(shared_dir or shared_dataset.SHARED_DIR)
+        self.env = dict(os.environ, NBA_DATA_SOURCE='shared', NBA_SHARED_DIR=self.shared_dir,
+                        NBA_DATA_DIR=self.data_dir)
+        self.loader = None
+        self.processes = {}
+        self.restarts = 0
+
+    def _start_loader(self):
+        return subprocess.Popen([sys.executable, 'shared_dataset.py', 'publish', '--watch',
+                                 '--data-dir', self.data_dir, '--shared-dir', self.shared_dir],
+                                env=self.env, cwd=APP_DIR)
+
+    def _start_worker(self, port):
+        # 計測を有効にした場合の/metricsはワーカーごとに別のポートで公開する
+        env = dict(self.env, NBA_PROFILE_PORT=str(METRICS_PORT + self.ports.index(port)))
+        return subprocess.Popen([sys.executable, '-m', 'streamlit', 'run', 'main.py',
+                                 '--server.port', str(port), '--server.address', '127.0.0.1',
+                                 '--server.headless', 'true'], env=env, cwd=APP_DIR)
+
+    def wait_published(self, timeout=PUBLISH_TIMEOUT_SECONDS):
+        """全シーズンの最初の版が公開されるまで待つ（公開されなかった場合はFalse）"""
+        seasons = available_seasons(self.data_dir) or [DEFAULT_SEASON]
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if all(shared_dataset.resolve(season, self.shared_dir)[0] for season in seasons):
+                return True
+            if self.loader.poll() is not None:
+                return False
+            time.sleep(0.2)
+        return False
+
+    def start(self):
+        """ローダーを起動して最初の版の公開を待ち、ワーカーを起動"""
+        self.loader = self._start_loader()
+        if not self.wait_published():
+            self.stop()
+            raise RuntimeError("共有ディレクトリにデータを公開できませんでした")
+        for port in self.ports:
+            self.processes[port] = self._start_worker(port)
+
+    def supervise(self):
+        """終了したローダー・ワーカーを再起動"""
+        if self.loader.poll() is not None:
+            print(f"✗ ローダーが終了しました（終了コード{self.loader.returncode}）。再起動します", flush=True)
+            self.loader = self._start_loader()
+            self.restarts += 1
+        for port, process in self.processes.items():
+            if process.poll() is not None:
+                print(f"✗ ワーカー（ポート{port}）が終了しました（終了コード{process.returncode}）。再起動します",
+                      flush=True)
+                self.processes[port] = self._start_worker(port)
+                self.restarts += 1
+
+    def stop(self):
+        for process in [self.loader, *self.processes.values()]:
+            if process is not None and process.poll() is None:
+                process.terminate()
+        for process in [self.loader, *self.processes.values()]:
+            if process is not None:
+                process.wait()
+
+
+async def _serve(pool, host, port):
+    balancer = LoadBalancer([('127.0.0.1', worker_port) for worker_port in pool.ports])
+    server = await balancer.start(host, port)
+    print(f"http://{host}:{port}/ で{pool.workers}個のワーカーに振り分け中（Ctrl+Cで終了）", flush=True)
+    async with server:
+        while True:
+            await asyncio.sleep(SUPERVISE_INTERVAL_SECONDS)
+            pool.supervise()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="複数のStreamlitワーカーとロードバランサーで起動")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="ワーカー数（既定: CPU数）")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8501, help="ロードバランサーのポート（ワーカーはこの次から）")
+    parser.add_argument('--data-dir', default='data', help="データディレクトリ")
+    parser.add_argument('--shared-dir', default=shared_dataset.SHARED_DIR, help="共有ディレクトリ")
+    args = parser.parse_args()
+
+    pool = WorkerPool(args.workers, args.port, args.data_dir, args.shared_dir)
+    # 終了の要求（SIGTERM）でもワーカー・ローダーを停止してから終了する
+    signal.signal(signal.SIGTERM, lambda *args: sys.exit(0))
+    pool.start()
+    try:
+        asyncio.run(_serve(pool, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+
+
+if __name__ == '__main__':
+    main()